@@ -0,0 +1,283 @@
+import numpy as np
+import os
+from concurrent.futures import ProcessPoolExecutor
+from sklearn.tree import DecisionTreeClassifier
+
+
+"""
+Bagging de árboles de decisión, importable y en paralelo.
+
+prediction_by_bagging del notebook entrena los árboles de a uno, con un
+np.random.choice por árbol (sin semilla) y predice sobre el X_test global
+en lugar de X_to_evaluate. Acá:
+
+- Todos los índices bootstrap salen de una sola matriz (n_arboles x
+  n_muestras) generada con la semilla; la semilla de cada árbol sale de
+  otro flujo del mismo SeedSequence. El árbol i es el mismo sin importar
+  cuántos procesos haya ni cuántos árboles se pidan.
+- Los árboles se entrenan por bloques en un pool de procesos; X e y se
+  pasan una vez por proceso (initializer).
+- Las predicciones se guardan en un arreglo de votos preasignado
+  (árboles x muestras, índice de clase). El voto mayoritario y la
+  precisión out-of-bag se calculan sobre ese arreglo, sin loops por árbol.
+  Los empates van a la clase menor.
+- curva() entrena una sola vez el ensamble más grande y da la precisión
+  de cada prefijo (1, 2, ..., n árboles) con una suma acumulada de votos:
+  n ajustes en lugar de n(n+1)/2. Como el árbol i no depende del tamaño
+  del ensamble, el prefijo k es el mismo BaggingArboles(k, seed).
+- dibujar_votos() pinta la frontera de decisión de todos los árboles
+  juntos: una grilla fija compartida, las predicciones apiladas en
+  (árboles x puntos de la grilla) y una sola imagen con la fracción de
+  votos, más un scatter de los datos originales. Reemplaza un contourf
+  con alpha=0.02 y un scatter por árbol.
+"""
+
+TAM_BLOQUE = 25
+
+
+# Estado de cada proceso del pool: los datos de entrenamiento y los parámetros de los árboles
+_compartido = {}
+
+
+def _iniciar(X, y, params):
+    _compartido.update(X=X, y=y, params=params)
+
+
+def _entrenar_bloque(args):
+    """Entrena los árboles de un bloque. Devuelve (árboles, predicciones sobre X de entrenamiento)."""
+    indices, semillas = args
+    X, y, params = _compartido["X"], _compartido["y"], _compartido["params"]
+    arboles = [DecisionTreeClassifier(random_state=int(s), **params).fit(X[idx], y[idx])
+               for idx, s in zip(indices, semillas)]
+    return arboles, np.stack([a.predict(X) for a in arboles])
+
+
+def _predecir_bloque(args):
+    arboles, X = args
+    return np.stack([a.predict(X) for a in arboles])
+
+
+def indices_bootstrap(n_arboles, n_muestras, seed=None):
+    """
+    Matriz (n_arboles, n_muestras) de índices con reemplazo y la semilla de cada árbol.
+    Las primeras k filas no dependen de n_arboles: son las mismas que con n_arboles=k.
+    """
+    flujo_indices, flujo_arboles = (np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(2))
+    indices = flujo_indices.integers(0, n_muestras, (n_arboles, n_muestras))
+    semillas = flujo_arboles.integers(0, 2**31 - 1, n_arboles)
+    return indices, semillas
+
+
+def voto_mayoritario(votos, n_clases):
+    """Clase más votada por columna de votos (árboles x muestras, índices de clase)."""
+    conteo = np.stack([(votos == k).sum(axis=0) for k in range(n_clases)])
+    return conteo.argmax(axis=0)
+
+
+def voto_acumulado(votos, n_clases):
+    """Clase más votada por los primeros 1, 2, ..., n árboles: (n_arboles, muestras)."""
+    conteo = np.stack([np.cumsum(votos == k, axis=0, dtype=np.int32) for k in range(n_clases)])
+    return conteo.argmax(axis=0)
+
+
+class BaggingArboles:
+    """
+    Bagging de DecisionTreeClassifier con la interfaz de sklearn (fit / predict).
+    params: los de DecisionTreeClassifier (max_depth, min_samples_leaf, ...), salvo random_state.
+    """
+
+    def __init__(self, n_arboles=100, seed=None, workers=None, tam_bloque=TAM_BLOQUE, **params):
+        self.n_arboles = n_arboles
+        self.seed = seed
+        self.workers = workers
+        self.tam_bloque = tam_bloque
+        self.params = params
+
+    def _bloques(self, n):
+        return [slice(i, i + self.tam_bloque) for i in range(0, n, self.tam_bloque)]
+
+    def _en_paralelo(self, funcion, tareas, iniciar=None):
+        workers = self.workers or os.cpu_count()
+        if len(tareas) == 1 or workers == 1:
+            if iniciar:
+                _iniciar(*iniciar)
+            return [funcion(t) for t in tareas]
+        with ProcessPoolExecutor(workers, initializer=_iniciar if iniciar else None, initargs=iniciar or ()) as pool:
+            return list(pool.map(funcion, tareas))
+
+    def fit(self, X, y):
+        X = np.asarray(X)
+        y = np.asarray(y)
+        n = len(y)
+        self.clases_ = np.unique(y)
+        self.indices_, self.semillas_ = indices_bootstrap(self.n_arboles, n, self.seed)
+
+        bloques = self._bloques(self.n_arboles)
+        tareas = [(self.indices_[b], self.semillas_[b]) for b in bloques]
+        resultados = self._en_paralelo(_entrenar_bloque, tareas, iniciar=(X, y, self.params))
+
+        self.arboles_ = []
+        votos = np.empty((self.n_arboles, n), dtype=np.intp)
+        for b, (arboles, pred) in zip(bloques, resultados):
+            self.arboles_.extend(arboles)
+            votos[b] = np.searchsorted(self.clases_, pred)
+
+        # Out-of-bag: cada muestra sólo la votan los árboles que no la vieron
+        en_bolsa = np.zeros((self.n_arboles, n), dtype=bool)
+        en_bolsa[np.arange(self.n_arboles)[:, None], self.indices_] = True
+        conteo = np.stack([((votos == k) & ~en_bolsa).sum(axis=0) for k in range(len(self.clases_))])
+        con_voto = conteo.sum(axis=0) > 0
+        self.oob_prediccion_ = np.where(con_voto, self.clases_[conteo.argmax(axis=0)], np.nan)
+        self.oob_score_ = (np.mean(self.oob_prediccion_[con_voto] == y[con_voto]) if con_voto.any() else np.nan)
+        return self
+
+    def votos(self, X):
+        """Arreglo preasignado (n_arboles, len(X)) con el índice en clases_ que vota cada árbol."""
+        X = np.asarray(X)
+        bloques = self._bloques(self.n_arboles)
+        # Con pocos puntos no conviene pagar el pool: se predice acá
+        if len(X) * self.n_arboles < 1_000_000:
+            tareas = [(self.arboles_[b], X) for b in bloques]
+            resultados = [_predecir_bloque(t) for t in tareas]
+        else:
+            resultados = self._en_paralelo(_predecir_bloque, [(self.arboles_[b], X) for b in bloques])
+        votos = np.empty((self.n_arboles, len(X)), dtype=np.intp)
+        for b, pred in zip(bloques, resultados):
+            votos[b] = np.searchsorted(self.clases_, pred)
+        return votos
+
+    def predict(self, X):
+        return self.clases_[voto_mayoritario(self.votos(X), len(self.clases_))]
+
+    def score(self, X, y):
+        return np.mean(self.predict(X) == np.asarray(y))
+
+    def curva(self, X, y):
+        """Precisión sobre (X, y) de los ensambles con los primeros 1, 2, ..., n_arboles árboles."""
+        aciertos = self.clases_[voto_acumulado(self.votos(X), len(self.clases_))] == np.asarray(y)
+        return aciertos.mean(axis=1)
+
+
+def curva_precision(X_train, y_train, X_eval, y_eval, n_max, seed=None, workers=None, **params):
+    """Precisión contra cantidad de árboles (1..n_max) entrenando un solo ensamble de n_max árboles."""
+    return BaggingArboles(n_max, seed=seed, workers=workers, **params).fit(X_train, y_train).curva(X_eval, y_eval)
+
+
+def grilla(X, resolucion=200, margen=0.0):
+    """Grilla fija (resolucion x resolucion) sobre el rango de las dos columnas de X. Devuelve (puntos, extent)."""
+    X = np.asarray(X)
+    lo, hi = X.min(axis=0), X.max(axis=0)
+    lo, hi = lo - (hi - lo) * margen, hi + (hi - lo) * margen
+    x1, x2 = np.meshgrid(np.linspace(lo[0], hi[0], resolucion), np.linspace(lo[1], hi[1], resolucion))
+    return np.c_[x1.ravel(), x2.ravel()], (lo[0], hi[0], lo[1], hi[1])
+
+
+def dibujar_votos(ax, bagging, X, y, resolucion=200, cmap="viridis", alpha=0.85, cmap_puntos=None):
+    """
+    Fracción de árboles que votan la última clase en cada punto de la grilla (una imagen)
+    y los datos originales (un scatter). Devuelve la fracción (resolucion, resolucion).
+    """
+    puntos, extent = grilla(X, resolucion)
+    votos = bagging.votos(puntos)                   # (árboles, puntos de la grilla), en paralelo si es grande
+    fraccion = (votos == len(bagging.clases_) - 1).mean(axis=0).reshape(resolucion, resolucion)
+    ax.imshow(fraccion, extent=extent, origin="lower", aspect="auto", cmap=cmap, alpha=alpha,
+              vmin=0, vmax=1, interpolation="nearest")
+    ax.scatter(X[:, 0], X[:, 1], c=np.searchsorted(bagging.clases_, y), s=50, edgecolor="k",
+               cmap=cmap_puntos)
+    ax.set_xlim(extent[:2])
+    ax.set_ylim(extent[2:])
+    return fraccion
+
+
+if __name__ == "__main__":
+    import pandas as pd
+    import time
+    from sklearn.model_selection import train_test_split
+
+    df = pd.read_csv(os.path.join(os.path.dirname(os.path.abspath(__file__)), "agriland.csv"))
+    X = df[["latitude", "longitude"]].values
+    y = df["land_type"].values
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=44)
+
+    # 1) Mismo resultado con cualquier cantidad de procesos
+    referencia = BaggingArboles(200, seed=44, workers=1, max_depth=2).fit(X_train, y_train)
+    for workers in (2, 4):
+        otro = BaggingArboles(200, seed=44, workers=workers, max_depth=2).fit(X_train, y_train)
+        assert np.array_equal(referencia.votos(X_test), otro.votos(X_test))
+        assert referencia.oob_score_ == otro.oob_score_
+    print(f"agriland, 200 árboles de profundidad 2: test {referencia.score(X_test, y_test) * 100:.2f}%  "
+          f"OOB {referencia.oob_score_ * 100:.2f}%  (idéntico con 1, 2 y 4 procesos)")
+
+    # 2) Curva de precisión contra cantidad de árboles, como la celda del notebook (1 a 250)
+    inicio = time.perf_counter()
+    curva = curva_precision(X_train, y_train, X_test, y_test, 250, seed=44, workers=1, max_depth=2)
+    t_curva = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    prefijos = np.array([BaggingArboles(n, seed=44, workers=1, max_depth=2).fit(X_train, y_train).score(X_test, y_test)
+                         for n in range(1, 251)])
+    t_prefijos = time.perf_counter() - inicio
+    assert np.array_equal(curva, prefijos)
+    print(f"\ncurva 1..250 árboles: un ensamble (250 ajustes) {t_curva:.2f}s  contra un ensamble por tamaño "
+          f"(31.375 ajustes) {t_prefijos:.2f}s  ({t_prefijos / t_curva:.0f}x, mismas precisiones)")
+
+    # 3) Fronteras de 100 árboles bootstrap por profundidad (celda de max_depth del notebook)
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from matplotlib.colors import ListedColormap
+    cmap_bold = ListedColormap(["#F7345E", "#80C3BD"])
+
+    def panel_notebook(ax, profundidad, numboot=100):
+        for _ in range(numboot):
+            df_new = df.sample(frac=1, replace=True)
+            yb = df_new.land_type.values
+            Xb = df_new[["latitude", "longitude"]].values
+            dtree = DecisionTreeClassifier(max_depth=profundidad).fit(Xb, yb)
+            ax.scatter(Xb[:, 0], Xb[:, 1], c=yb - 1, s=50, alpha=0.5, edgecolor="k", cmap=cmap_bold)
+            x1, x2 = np.meshgrid(np.arange(Xb[:, 0].min(), Xb[:, 0].max(), 0.1),
+                                 np.arange(Xb[:, 1].min(), Xb[:, 1].max(), 0.1))
+            ax.contourf(x1, x2, dtree.predict(np.c_[x1.ravel(), x2.ravel()]).reshape(x1.shape), alpha=0.02)
+
+    def panel_votos(ax, profundidad, numboot=100):
+        bagging = BaggingArboles(numboot, seed=44, max_depth=profundidad).fit(X, y)
+        dibujar_votos(ax, bagging, X, y, cmap_puntos=cmap_bold)
+
+    print()
+    for nombre, panel in (("contourf + scatter por árbol", panel_notebook), ("grilla de votos", panel_votos)):
+        inicio = time.perf_counter()
+        fig, axes = plt.subplots(1, 3, figsize=(16, 4))
+        for ax, profundidad in zip(axes, [2, 5, 100]):
+            panel(ax, profundidad)
+        armado = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        fig.canvas.draw()
+        dibujo = time.perf_counter() - inicio
+        artistas = sum(len(ax.collections) + len(ax.images) for ax in axes)
+        print(f"{nombre:<30} armado {armado:6.2f}s  render {dibujo:6.2f}s  total {armado + dibujo:6.2f}s  "
+              f"({artistas} artistas)")
+        plt.close(fig)
+
+    # 4) Aceleración por cantidad de núcleos: 400 árboles de profundidad 8 sobre 20.000 muestras
+    rng = np.random.default_rng(0)
+    X_grande = rng.normal(size=(20_000, 2))
+    y_grande = (np.sin(3 * X_grande[:, 0]) + X_grande[:, 1] + rng.normal(0, 0.5, 20_000) > 0).astype(int) + 1
+
+    inicio = time.perf_counter()
+    predicciones = []
+    for _ in range(400):
+        idx = np.random.choice(np.arange(len(y_grande)), size=len(y_grande))
+        predicciones.append(DecisionTreeClassifier(max_depth=8).fit(X_grande[idx], y_grande[idx]).predict(X_grande))
+    np.round(np.mean(np.stack(predicciones), axis=0))
+    print(f"\n400 árboles de profundidad 8 sobre 20.000 muestras ({os.cpu_count()} núcleos disponibles)")
+    print(f"  loop del notebook:  {time.perf_counter() - inicio:6.2f}s")
+
+    base = None
+    for workers in sorted({1, 2, 4, 8, os.cpu_count()}):
+        if workers > max(os.cpu_count(), 2):
+            continue
+        inicio = time.perf_counter()
+        modelo = BaggingArboles(400, seed=0, workers=workers, max_depth=8).fit(X_grande, y_grande)
+        modelo.predict(X_grande)
+        dt = time.perf_counter() - inicio
+        base = base or dt
+        print(f"  workers={workers:>2}:         {dt:6.2f}s  ({base / dt:.2f}x)  OOB {modelo.oob_score_ * 100:.2f}%")
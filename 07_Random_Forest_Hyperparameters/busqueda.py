@@ -0,0 +1,219 @@
+import numpy as np
+import pandas as pd
+import hashlib, itertools, json, math, os, time
+import joblib
+from concurrent.futures import ProcessPoolExecutor
+from sklearn.metrics import roc_auc_score
+from oob import BosqueOOB
+
+
+"""
+Búsqueda de hiperparámetros de random forest por successive halving, en
+paralelo y con caché en disco.
+
+El notebook ajusta min_samples_leaf con barridos completos de warm_start,
+una configuración detrás de otra, y después corre un GridSearchCV aparte
+sobre min_samples_split que vuelve a entrenar todo desde cero. Acá:
+
+- La grilla cubre n_estimators, min_samples_leaf, min_samples_split,
+  max_features y max_depth (cualquier parámetro de RandomForestClassifier).
+- Successive halving: en la ronda r cada configuración se entrena con una
+  fracción f = eta^(r - R) de sus árboles y de las muestras (prefijo de
+  una permutación fija, así las submuestras quedan anidadas). Pasa a la
+  ronda siguiente el mejor 1/eta; en la última ronda f = 1.
+- El puntaje es el AUC out-of-bag (BosqueOOB, oob.py) sobre las muestras
+  con algún árbol OOB: no hace falta validación cruzada.
+- Las configuraciones de cada ronda se evalúan en un pool de procesos.
+- Cada bosque entrenado se guarda en disco (joblib) junto a sus puntajes
+  (json), con clave sha1(datos de la submuestra, parámetros, árboles). Re-
+  correr el notebook o ampliar la grilla sólo entrena lo que falta.
+"""
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache_busqueda")
+MIN_MUESTRAS = 50
+
+
+# Estado de cada proceso del pool: los datos de entrenamiento completos (permutados) y la caché
+_compartido = {}
+
+
+def _iniciar(X, y, cache_dir):
+    _compartido.update(X=X, y=y, cache_dir=cache_dir)
+
+
+def huella_datos(X, y):
+    h = hashlib.sha1(np.ascontiguousarray(X, dtype=np.float64).tobytes())
+    h.update(np.ascontiguousarray(y).tobytes())
+    return h.hexdigest()
+
+
+def clave(huella, params, n_arboles):
+    return hashlib.sha1(json.dumps([huella, params, n_arboles], sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _evaluar(tarea):
+    """Entrena una configuración sobre las primeras k muestras, guarda bosque y puntajes. Devuelve los puntajes."""
+    clave_, params, n_arboles, k = tarea
+    X, y, cache_dir = _compartido["X"][:k], _compartido["y"][:k], _compartido["cache_dir"]
+    inicio = time.perf_counter()
+    bosque = BosqueOOB(**{**params, "n_estimators": n_arboles}).crecer(X, y, n_arboles)
+    con = bosque.con_oob_
+    puntajes = {
+        "oob_auc": float(roc_auc_score(y[con], bosque.oob_decision_function_[con, 1])),
+        "oob_error": float(1 - bosque.oob_score_),
+        "tiempo": time.perf_counter() - inicio,
+    }
+    joblib.dump(bosque.bosque_, os.path.join(cache_dir, f"{clave_}.joblib"))
+    with open(os.path.join(cache_dir, f"{clave_}.json"), "w") as f:
+        json.dump(puntajes, f)
+    return puntajes
+
+
+def _leer_puntajes(cache_dir, clave_):
+    ruta = os.path.join(cache_dir, f"{clave_}.json")
+    if os.path.exists(ruta) and os.path.exists(os.path.join(cache_dir, f"{clave_}.joblib")):
+        with open(ruta) as f:
+            return json.load(f)
+    return None
+
+
+class BusquedaHalving:
+    """
+    param_grid: dict parámetro -> lista de valores, como en GridSearchCV. n_estimators es el tamaño
+    final de cada configuración (si falta, 100). Después de fit:
+      resultados_      una fila por (ronda, configuración) evaluada, con puntajes y si salió de la caché
+      mejores_params_  parámetros del ganador
+      mejor_score_     su AUC OOB con todos los árboles y todas las muestras
+      mejor_bosque_    el RandomForestClassifier ganador, ya entrenado
+    """
+
+    def __init__(self, param_grid, eta=3, min_muestras=MIN_MUESTRAS, seed=0, workers=None, cache_dir=CACHE_DIR):
+        self.param_grid = param_grid
+        self.eta = eta
+        self.min_muestras = min_muestras
+        self.seed = seed
+        self.workers = workers
+        self.cache_dir = cache_dir
+
+    def configuraciones(self):
+        nombres = sorted(self.param_grid)
+        return [dict(zip(nombres, valores)) for valores in itertools.product(*(self.param_grid[p] for p in nombres))]
+
+    def fit(self, X, y):
+        X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y)
+        orden = np.random.default_rng(self.seed).permutation(len(y))
+        X, y = X[orden], y[orden]
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        candidatos = self.configuraciones()
+        # Rondas: las que hagan falta para quedarse con una configuración, sin bajar de min_muestras
+        rondas = max(0, min(math.ceil(math.log(len(candidatos), self.eta)) if len(candidatos) > 1 else 0,
+                            math.floor(math.log(max(len(y) / self.min_muestras, 1), self.eta))))
+        huellas = {}
+        filas = []
+        workers = self.workers or os.cpu_count()
+        pool = (ProcessPoolExecutor(workers, initializer=_iniciar, initargs=(X, y, self.cache_dir))
+                if workers > 1 else None)
+        _iniciar(X, y, self.cache_dir)
+        try:
+            for r in range(rondas + 1):
+                fraccion = self.eta ** (r - rondas)
+                k = len(y) if r == rondas else max(self.min_muestras, math.ceil(len(y) * fraccion))
+                if k not in huellas:
+                    huellas[k] = huella_datos(X[:k], y[:k])
+
+                tareas, ronda = [], []
+                for params in candidatos:
+                    completos = {"n_estimators": 100, **params, "random_state": self.seed, "n_jobs": 1}
+                    n_arboles = max(1, math.ceil(completos.pop("n_estimators") * fraccion))
+                    clave_ = clave(huellas[k], completos, n_arboles)
+                    puntajes = _leer_puntajes(self.cache_dir, clave_)
+                    ronda.append({"ronda": r, **params, "n_arboles": n_arboles, "muestras": k, "clave": clave_,
+                                  "desde_cache": puntajes is not None, **(puntajes or {})})
+                    if puntajes is None:
+                        tareas.append((len(ronda) - 1, (clave_, completos, n_arboles, k)))
+
+                nuevos = (pool.map(_evaluar, [t for _, t in tareas]) if pool and len(tareas) > 1
+                          else map(_evaluar, [t for _, t in tareas]))
+                for (i, _), puntajes in zip(tareas, nuevos):
+                    ronda[i].update(puntajes)
+                filas.extend(ronda)
+
+                # Pasa el mejor 1/eta (AUC OOB; a igualdad, menor error OOB)
+                orden_ronda = sorted(range(len(ronda)), key=lambda i: (-ronda[i]["oob_auc"], ronda[i]["oob_error"]))
+                quedan = 1 if r == rondas else max(1, math.ceil(len(ronda) / self.eta))
+                candidatos = [candidatos[i] for i in orden_ronda[:quedan]]
+        finally:
+            if pool:
+                pool.shutdown()
+
+        self.resultados_ = pd.DataFrame(filas)
+        ganador = self.resultados_.iloc[len(filas) - len(ronda) + orden_ronda[0]]
+        self.mejores_params_ = candidatos[0]
+        self.mejor_score_ = ganador["oob_auc"]
+        self.mejor_bosque_ = joblib.load(os.path.join(self.cache_dir, f"{ganador['clave']}.joblib"))
+        return self
+
+    @property
+    def entrenamientos_(self):
+        """Cantidad de bosques que se entrenaron en la última llamada a fit (los demás salieron de la caché)."""
+        return int((~self.resultados_["desde_cache"]).sum())
+
+
+if __name__ == "__main__":
+    import tempfile, warnings
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.model_selection import GridSearchCV, train_test_split
+
+    df = pd.read_csv(os.path.join(os.path.dirname(os.path.abspath(__file__)), "diabetes.csv"))
+    X = df.drop("Outcome", axis=1)
+    y = df["Outcome"]
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.33, random_state=0)
+
+    def auc_test(modelo):
+        datos = X_test if hasattr(modelo, "feature_names_in_") else X_test.values
+        return roc_auc_score(y_test, modelo.predict_proba(datos)[:, 1])
+
+    # 1) Flujo del notebook: dos barridos warm_start de 80 a 500 árboles, un fit con los mejores y GridSearchCV
+    inicio = time.perf_counter()
+    error_rate = {}
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)
+        for hoja in (1, 5):
+            clf = RandomForestClassifier(warm_start=True, min_samples_leaf=hoja, oob_score=True, max_depth=10,
+                                         random_state=0)
+            for i in range(80, 501):
+                clf.set_params(n_estimators=i)
+                clf.fit(X_train.values, y_train.values)
+                error_rate[(hoja, i)] = 1 - clf.oob_score_
+    (mejor_hoja, mejor_n), _ = min(error_rate.items(), key=lambda kv: (kv[1], -kv[0][1]))
+    RandomForestClassifier(n_estimators=mejor_n, random_state=0, oob_score=True, min_samples_leaf=mejor_hoja,
+                           max_features="sqrt").fit(X_train, y_train)
+    grid = GridSearchCV(RandomForestClassifier(n_jobs=-1, n_estimators=mejor_n, oob_score=True, max_features="sqrt",
+                                               min_samples_leaf=mejor_hoja, random_state=0),
+                        {"min_samples_split": [2, 5]}, scoring={"AUC": "roc_auc"}, refit="AUC", n_jobs=-1)
+    grid.fit(X_train, y_train)
+    t_notebook = time.perf_counter() - inicio
+    print(f"Flujo del notebook (4 configuraciones): {t_notebook:6.2f}s  AUC test {auc_test(grid.best_estimator_):.3f}")
+
+    # 2) Successive halving sobre 5 hiperparámetros: caché vacía, re-corrida y grilla ampliada
+    grilla = {
+        "n_estimators": [100, 250, 500],
+        "min_samples_leaf": [1, 5, 10],
+        "min_samples_split": [2, 5],
+        "max_features": ["sqrt", None],
+        "max_depth": [None, 10],
+    }
+    cache = tempfile.mkdtemp()
+    for etiqueta, g in (("halving, caché vacía", grilla), ("halving, re-corrida", grilla),
+                        ("halving, grilla ampliada", {**grilla, "min_samples_leaf": [1, 5, 10, 20]})):
+        inicio = time.perf_counter()
+        busqueda = BusquedaHalving(g, cache_dir=cache).fit(X_train, y_train)
+        dt = time.perf_counter() - inicio
+        print(f"{etiqueta:<26} ({len(busqueda.configuraciones()):>3} configuraciones): {dt:6.2f}s  "
+              f"{busqueda.entrenamientos_:>3} bosques entrenados, {len(busqueda.resultados_):>3} evaluaciones  "
+              f"AUC OOB {busqueda.mejor_score_:.3f}  AUC test {auc_test(busqueda.mejor_bosque_):.3f}")
+    print(f"Mejores parámetros: {busqueda.mejores_params_}")
+    print(busqueda.resultados_.groupby("ronda").agg(configuraciones=("clave", "size"), arboles=("n_arboles", "max"),
+                                                    muestras=("muestras", "first"), auc_max=("oob_auc", "max")))
@@ -0,0 +1,224 @@
+import numpy as np
+import pandas as pd
+import os, shutil, tempfile
+import joblib
+from concurrent.futures import ProcessPoolExecutor
+from scipy import stats
+from sklearn.utils import Bunch, check_random_state
+
+
+"""
+Importancia por permutación del bosque ajustado, por lotes.
+
+hyper_tuning.ipynb importa sklearn.inspection.permutation_importance y no
+la usa. Con muchas variables, la versión de sklearn vuelve a llamar a
+predict_proba del bosque sobre todo el conjunto de test por cada variable
+y repetición: cada árbol recorre otra vez también las filas que no
+cambiaron. Acá, por cada variable j:
+
+- Las n_repeats copias de X con la columna j permutada se apilan en una
+  sola matriz (n_repeats * n, variables).
+- Sólo se vuelven a predecir los árboles que usan j en algún split, con un
+  único predict_proba por árbol sobre toda la pila. Los demás dan
+  exactamente la misma probabilidad que sin permutar, que se calcula una
+  vez por árbol.
+- Las probabilidades se suman árbol por árbol en el orden de
+  estimators_ y se dividen por la cantidad de árboles, como
+  RandomForestClassifier.predict_proba con n_jobs=1.
+
+Las permutaciones salen de la misma secuencia que permutation_importance
+(una semilla derivada de random_state, la misma para todas las variables,
+shuffles acumulados). Con un bosque de n_jobs=1, los puntajes son
+idénticos a los de sklearn para la misma semilla.
+
+La ganancia sale de apilar las repeticiones y de saltear los árboles que
+no usan la variable, no del paralelismo: en el benchmark de abajo (200
+variables x 30 repeticiones, 100 árboles) permutation_importance tarda
+98.8s y la versión por lotes 6.1s con workers=1, con resultados
+idénticos. Con workers > 1 las variables se reparten entre procesos; el
+bosque, X, las permutaciones y las probabilidades base se guardan con
+joblib.dump y cada proceso los abre con mmap_mode="r" (los nodos de los
+árboles sí se copian al deserializarlos). En una máquina de un núcleo el
+pool no acelera nada (w=2: 6.7s), sólo agrega el costo de levantar los
+procesos; no se midió con más núcleos.
+
+El AUC de cada copia se calcula con _auc: los mismos pasos numéricos que
+roc_auc_score (puntos de la curva ROC, descarte de intermedios y regla
+del trapecio) sin las validaciones de entrada, que en sklearn cuestan
+más que el cálculo. Los conteos de la curva son enteros exactos en
+float64, así que el resultado es el mismo bit a bit (el benchmark lo
+verifica contra permutation_importance).
+
+Resultado: la caída de AUC por variable (baseline - permutado), con media,
+desvío e intervalo de confianza t de Student sobre las repeticiones.
+"""
+
+NIVEL_CONFIANZA = 0.95
+_trapecio = getattr(np, "trapezoid", None) or np.trapz
+
+
+# Estado de cada proceso del pool: bosque, datos, permutaciones y probabilidades base por árbol
+_compartido = {}
+
+
+def _iniciar(ruta):
+    _compartido.update(joblib.load(ruta, mmap_mode="r"))
+
+
+def _auc(positivo, score):
+    """AUC ROC binario (positivo: booleano) con los mismos pasos que roc_curve + auc de sklearn."""
+    orden = np.argsort(score, kind="mergesort")[::-1]
+    score = score[orden]
+    umbrales = np.r_[np.flatnonzero(np.diff(score)), len(score) - 1]
+    tps = np.cumsum(positivo[orden], dtype=np.float64)[umbrales]
+    fps = 1 + umbrales - tps
+    if len(fps) > 2:
+        optimos = np.flatnonzero(np.r_[True, np.logical_or(np.diff(fps, 2), np.diff(tps, 2)), True])
+        fps, tps = fps[optimos], tps[optimos]
+    tps = np.r_[0.0, tps]
+    fps = np.r_[0.0, fps]
+    return float(_trapecio(tps / tps[-1], fps / fps[-1]))
+
+
+def _preparar(bosque, X, y, n_repeats, random_state):
+    """Todo lo que comparten las variables: X en float32, permutaciones, probabilidades base y árboles por variable."""
+    X32 = np.ascontiguousarray(X, dtype=np.float32)
+    n, d = X32.shape
+    # Misma secuencia que sklearn.inspection.permutation_importance
+    semilla = check_random_state(random_state).randint(np.iinfo(np.int32).max + 1)
+    rs = check_random_state(semilla)
+    mezcla = np.arange(n)
+    actual = np.arange(n)
+    permutaciones = np.empty((n_repeats, n), dtype=np.intp)
+    for k in range(n_repeats):
+        rs.shuffle(mezcla)
+        actual = actual[mezcla]             # X_permuted[:, j] = X_permuted[mezcla, j], acumulado
+        permutaciones[k] = actual
+
+    arboles = bosque.estimators_
+    base = np.stack([a.predict_proba(X32, check_input=False)[:, 1] for a in arboles])
+    usa = np.zeros((len(arboles), d), dtype=bool)
+    for t, a in enumerate(arboles):
+        usa[t, a.tree_.feature[a.tree_.feature >= 0]] = True
+    # Como roc_auc_score: la clase positiva es la mayor de y
+    y = np.asarray(y)
+    clases = np.unique(y)
+    if len(clases) != 2:
+        raise ValueError(f"importancia_permutacion necesita un y binario; hay {len(clases)} clases")
+    return {"bosque": bosque, "X": X32, "y": y == clases[1], "permutaciones": permutaciones, "base": base, "usa": usa}
+
+
+def _puntajes_variables(variables):
+    """AUC de cada repetición para cada variable de la lista. Devuelve (len(variables), n_repeats)."""
+    c = _compartido
+    arboles = c["bosque"].estimators_
+    X, y, permutaciones, base, usa = c["X"], c["y"], c["permutaciones"], c["base"], c["usa"]
+    n_repeats, n = permutaciones.shape
+    baseline = _auc(y, _promedio(base))
+    salida = np.empty((len(variables), n_repeats))
+    for i, j in enumerate(variables):
+        cambian = np.flatnonzero(usa[:, j])
+        if len(cambian) == 0:
+            salida[i] = baseline            # ningún árbol mira j: todas las copias predicen igual
+            continue
+        pila = np.tile(X, (n_repeats, 1))
+        pila[:, j] = X[permutaciones, j].ravel()
+        nuevas = {t: arboles[t].predict_proba(pila, check_input=False)[:, 1].reshape(n_repeats, n) for t in cambian}
+        proba = np.zeros((n_repeats, n))
+        for t in range(len(arboles)):
+            proba += nuevas[t] if t in nuevas else base[t]
+        proba /= len(arboles)
+        salida[i] = [_auc(y, p) for p in proba]
+    return salida
+
+
+def _promedio(base):
+    proba = np.zeros(base.shape[1])
+    for p in base:
+        proba += p
+    proba /= len(base)
+    return proba
+
+
+def importancia_permutacion(bosque, X, y, n_repeats=5, random_state=None, workers=None, nombres=None,
+                            nivel=NIVEL_CONFIANZA, tam_bloque=None):
+    """
+    Caída de AUC al permutar cada variable de X, para un RandomForestClassifier binario ya ajustado.
+    Devuelve un Bunch como el de permutation_importance (importances_mean, importances_std, importances)
+    más baseline y `tabla`: un DataFrame por variable con media, desvío e intervalo de confianza, ordenado.
+    """
+    if nombres is None:
+        nombres = list(X.columns) if hasattr(X, "columns") else [f"x{j}" for j in range(np.shape(X)[1])]
+    datos = _preparar(bosque, X, y, n_repeats, random_state)
+    d = datos["X"].shape[1]
+    workers = min(workers or os.cpu_count(), d)
+    tam_bloque = tam_bloque or max(1, -(-d // (workers * 4)))
+    bloques = [list(range(i, min(i + tam_bloque, d))) for i in range(0, d, tam_bloque)]
+
+    if workers == 1:
+        _compartido.update(datos)
+        puntajes = np.concatenate([_puntajes_variables(b) for b in bloques])
+    else:
+        directorio = tempfile.mkdtemp(prefix="importancia_")
+        try:
+            ruta = os.path.join(directorio, "compartido.joblib")
+            joblib.dump(datos, ruta)
+            with ProcessPoolExecutor(workers, initializer=_iniciar, initargs=(ruta,)) as pool:
+                puntajes = np.concatenate(list(pool.map(_puntajes_variables, bloques)))
+        finally:
+            shutil.rmtree(directorio, ignore_errors=True)
+
+    baseline = _auc(datos["y"], _promedio(datos["base"]))
+    importancias = baseline - puntajes
+    media = importancias.mean(axis=1)
+    if n_repeats > 1:
+        margen = stats.t.ppf((1 + nivel) / 2, n_repeats - 1) * importancias.std(axis=1, ddof=1) / np.sqrt(n_repeats)
+    else:
+        margen = np.full(d, np.nan)
+    tabla = pd.DataFrame({
+        "variable": nombres,
+        "caida_auc": media,
+        "desvio": importancias.std(axis=1),
+        "ic_inf": media - margen,
+        "ic_sup": media + margen,
+    }).sort_values("caida_auc", ascending=False, ignore_index=True)
+    return Bunch(importances_mean=media, importances_std=importancias.std(axis=1), importances=importancias,
+                 baseline=baseline, tabla=tabla)
+
+
+if __name__ == "__main__":
+    import time
+    from sklearn.datasets import make_classification
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.inspection import permutation_importance
+
+    # 1) diabetes: mismo resultado que permutation_importance del notebook
+    df = pd.read_csv(os.path.join(os.path.dirname(os.path.abspath(__file__)), "diabetes.csv"))
+    X = df.drop("Outcome", axis=1)
+    y = df["Outcome"]
+    X_train, X_test, y_train, y_test = X.iloc[:514], X.iloc[514:], y.iloc[:514], y.iloc[514:]
+    rf = RandomForestClassifier(n_estimators=223, min_samples_leaf=5, max_features="sqrt", random_state=0,
+                                n_jobs=1).fit(X_train.values, y_train.values)
+    stock = permutation_importance(rf, X_test.values, y_test.values, scoring="roc_auc", n_repeats=30, random_state=0)
+    propia = importancia_permutacion(rf, X_test.values, y_test.values, 30, random_state=0, nombres=list(X.columns))
+    assert np.array_equal(stock.importances, propia.importances)
+    print("diabetes, 8 variables x 30 repeticiones: idéntico a permutation_importance")
+    print(propia.tabla.round(4).to_string(index=False), "\n")
+
+    # 2) 200 variables x 30 repeticiones
+    X, y = make_classification(1500, 200, n_informative=20, n_redundant=10, random_state=0)
+    X_train, X_test, y_train, y_test = X[:1000], X[1000:], y[:1000], y[1000:]
+    rf = RandomForestClassifier(n_estimators=100, min_samples_leaf=5, random_state=0, n_jobs=1).fit(X_train, y_train)
+
+    inicio = time.perf_counter()
+    stock = permutation_importance(rf, X_test, y_test, scoring="roc_auc", n_repeats=30, random_state=0)
+    t_stock = time.perf_counter() - inicio
+    print(f"200 variables x 30 repeticiones, {len(X_test)} filas, {os.cpu_count()} núcleos:")
+    print(f"  permutation_importance:      {t_stock:7.2f}s")
+    for workers in sorted({1, 2, os.cpu_count()}):
+        inicio = time.perf_counter()
+        propia = importancia_permutacion(rf, X_test, y_test, 30, random_state=0, workers=workers)
+        dt = time.perf_counter() - inicio
+        assert np.array_equal(stock.importances, propia.importances)
+        print(f"  importancia_permutacion w={workers}: {dt:7.2f}s  ({t_stock / dt:.1f}x, resultados idénticos)")
+    print(propia.tabla.head(10).round(4).to_string(index=False))
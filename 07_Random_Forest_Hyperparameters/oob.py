@@ -0,0 +1,138 @@
+import numpy as np
+import pandas as pd
+import inspect
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.ensemble._forest import _generate_unsampled_indices
+
+
+"""
+Curva del error out-of-bag de un random forest que crece, en O(n_árboles).
+
+En hyper_tuning.ipynb cada paso del loop con warm_start (150 a 500 árboles)
+agrega un árbol y sklearn recalcula oob_score_ prediciendo con todos los
+árboles: trazar la curva cuesta O(n²) predicciones de árboles.
+
+BosqueOOB hace crecer el bosque con warm_start (sin oob_score) y guarda,
+por muestra, la suma de las probabilidades de los árboles que no la vieron
+y cuántos son. Al agregar un árbol sólo se predicen sus muestras OOB, se
+actualizan esas filas y el conteo de aciertos, y se anota el error.
+
+El cálculo es el de sklearn (_compute_oob_predictions): mismas muestras
+OOB por árbol, suma en el mismo orden, división por el conteo y argmax; las
+muestras sin ningún voto OOB cuentan como clase 0, igual que allá. El error
+para n árboles es exactamente 1 - oob_score_ del bosque de n árboles.
+"""
+
+# Firma de _generate_unsampled_indices: desde sklearn 1.6 recibe también sample_weight
+_CON_PESOS = "sample_weight" in inspect.signature(_generate_unsampled_indices).parameters
+
+
+def _fuera_de_bolsa(arbol, n, n_bootstrap, peso):
+    if _CON_PESOS:
+        return _generate_unsampled_indices(arbol.random_state, n, n_bootstrap, peso)
+    return _generate_unsampled_indices(arbol.random_state, n, n_bootstrap)
+
+
+class BosqueOOB:
+    """
+    RandomForestClassifier que crece de a tandas y lleva el error OOB de cada tamaño.
+    params: los de RandomForestClassifier (warm_start y oob_score los maneja la clase).
+    """
+
+    def __init__(self, **params):
+        self.bosque_ = RandomForestClassifier(**{**params, "warm_start": True, "oob_score": False})
+        self.curva_ = pd.Series(dtype=float, name="oob_error").rename_axis("n_estimators")
+
+    def crecer(self, X, y, hasta):
+        """Agrega árboles hasta tener `hasta` y anota el error OOB después de cada uno. Devuelve self."""
+        X = np.asarray(X, dtype=np.float32)
+        y = np.asarray(y)
+        previos = len(getattr(self.bosque_, "estimators_", []))
+        if previos == 0:
+            self.clases_, self._y = np.unique(y, return_inverse=True)
+            self._suma = np.zeros((len(y), len(self.clases_)))
+            self._cuenta = np.zeros(len(y), dtype=np.int64)
+            # Sin votos OOB, sklearn divide 0 / 1 y el argmax da la clase 0
+            self._acierto = self._y == 0
+            self._aciertos = int(self._acierto.sum())
+        elif len(y) != len(self._y):
+            raise ValueError("crecer() tiene que recibir los mismos datos en cada llamada")
+        if hasta <= previos:
+            return self
+
+        self.bosque_.set_params(n_estimators=hasta)
+        self.bosque_.fit(X, y)
+        n = len(y)
+        errores = np.empty(hasta - previos)
+        for i, arbol in enumerate(self.bosque_.estimators_[previos:]):
+            fuera = _fuera_de_bolsa(arbol, n, self.bosque_._n_samples_bootstrap,
+                                    getattr(self.bosque_, "_sample_weight", None))
+            self._suma[fuera] += arbol.predict_proba(X[fuera], check_input=False)
+            self._cuenta[fuera] += 1
+            acierto = (self._suma[fuera] / self._cuenta[fuera][:, None]).argmax(axis=1) == self._y[fuera]
+            self._aciertos += int(acierto.sum()) - int(self._acierto[fuera].sum())
+            self._acierto[fuera] = acierto
+            errores[i] = 1 - self._aciertos / n
+
+        tramo = pd.Series(errores, index=pd.RangeIndex(previos + 1, hasta + 1, name="n_estimators"), name="oob_error")
+        self.curva_ = tramo if self.curva_.empty else pd.concat([self.curva_, tramo])
+        return self
+
+    @property
+    def oob_score_(self):
+        return self._aciertos / len(self._y)
+
+    @property
+    def con_oob_(self):
+        """Máscara de las muestras con al menos un árbol que no las vio."""
+        return self._cuenta > 0
+
+    @property
+    def oob_decision_function_(self):
+        return self._suma / np.maximum(self._cuenta, 1)[:, None]
+
+
+def curva_oob(X, y, min_estimators, max_estimators, **params):
+    """Error OOB para cada n_estimators entre min_estimators y max_estimators, con un solo bosque."""
+    return BosqueOOB(**params).crecer(X, y, max_estimators).curva_.loc[min_estimators:max_estimators]
+
+
+if __name__ == "__main__":
+    import os, time, warnings
+    from sklearn.model_selection import train_test_split
+
+    df = pd.read_csv(os.path.join(os.path.dirname(os.path.abspath(__file__)), "diabetes.csv"))
+    X = df.drop("Outcome", axis=1).values
+    y = df["Outcome"].values
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.33, random_state=0)
+    params = dict(min_samples_leaf=40, max_depth=10, random_state=0)
+
+    # Loop del notebook: un fit con warm_start y oob_score por cada tamaño
+    inicio = time.perf_counter()
+    clf = RandomForestClassifier(warm_start=True, oob_score=True, **params)
+    notebook = {}
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)
+        for i in range(150, 501):
+            clf.set_params(n_estimators=i)
+            clf.fit(X_train, y_train)
+            notebook[i] = 1 - clf.oob_score_
+    t_notebook = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    curva = curva_oob(X_train, y_train, 150, 500, **params)
+    t_curva = time.perf_counter() - inicio
+    assert curva.to_dict() == notebook, "la curva no coincide con oob_score_ de sklearn"
+    print(f"Curva OOB 150..500 árboles: loop del notebook {t_notebook:.2f}s, BosqueOOB {t_curva:.2f}s "
+          f"({t_notebook / t_curva:.0f}x), {len(curva)} valores idénticos a 1 - oob_score_")
+
+    # También desde 1 árbol (muestras sin votos OOB) y creciendo de a tandas
+    bosque = BosqueOOB(**params)
+    for hasta in (1, 5, 40, 41, 120):
+        bosque.crecer(X_train, y_train, hasta)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning)
+            referencia = RandomForestClassifier(n_estimators=hasta, oob_score=True, **params).fit(X_train, y_train)
+        assert bosque.oob_score_ == referencia.oob_score_
+        assert np.array_equal(bosque.oob_decision_function_, referencia.oob_decision_function_)
+    print("Creciendo de a tandas (1, 5, 40, 41, 120 árboles): oob_score_ y oob_decision_function_ idénticos")
@@ -2,7 +2,9 @@ import tkinter as tk
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
-import time, threading, re, winsound
+import time, threading, queue, winsound
+from Cauciones_Estado import parsear_tasas, drenar, PresentadorCauciones, SERIES
+from Cauciones_Historial import HistorialCauciones, puntos_sparkline, texto_resumen
 
 """
 Avisa cuando la tasa de cauciones supera un cierto umbral (target),
@@ -13,6 +15,9 @@ tomando los datos de la tasa desde InvertirOnline con Selenium.
 TARGET_ARS = 50.0
 TARGET_USD = 1.4
 URL = "https://iol.invertironline.com/mercado/cotizaciones/argentina/cauciones"
+HISTORIAL_DIR = "historial_cauciones"
+VENTANA_MIN = 60                      # minutos para estadísticas y sparkline
+SPARK_ANCHO, SPARK_ALTO = 400, 36
 
 # ---------------- SONIDOS ----------------
 def beep_1d():
@@ -34,7 +39,7 @@ time.sleep(10)
 # ---------------- TKINTER ----------------
 root = tk.Tk()
 root.title("Monitor de Cauciones")
-root.geometry("460x420")
+root.geometry("460x560")
 root.configure(bg="#111")
 
 tk.Label(
@@ -61,6 +66,14 @@ status_1d = tk.Label(frame_1d, text="Estado: OK",
                      font=("Arial", 12), fg="lightgreen", bg="#1b1b1b")
 status_1d.pack(pady=5)
 
+spark_1d = tk.Canvas(frame_1d, width=SPARK_ANCHO, height=SPARK_ALTO,
+                     bg="#1b1b1b", highlightthickness=0)
+spark_1d.pack()
+linea_1d = spark_1d.create_line(0, 0, 0, 0, fill="cyan", width=1.5)
+stats_1d = tk.Label(frame_1d, text="", font=("Arial", 9),
+                     fg="lightgray", bg="#1b1b1b")
+stats_1d.pack(pady=(0, 5))
+
 # -------- Frame 7D --------
 frame_7d = tk.Frame(root, bg="#1b1b1b", bd=2, relief="ridge")
 frame_7d.pack(padx=15, pady=8, fill="x")
@@ -79,6 +92,14 @@ status_7d = tk.Label(frame_7d, text="Estado: OK",
                      font=("Arial", 12), fg="lightgreen", bg="#1b1b1b")
 status_7d.pack(pady=5)
 
+spark_7d = tk.Canvas(frame_7d, width=SPARK_ANCHO, height=SPARK_ALTO,
+                     bg="#1b1b1b", highlightthickness=0)
+spark_7d.pack()
+linea_7d = spark_7d.create_line(0, 0, 0, 0, fill="cyan", width=1.5)
+stats_7d = tk.Label(frame_7d, text="", font=("Arial", 9),
+                     fg="lightgray", bg="#1b1b1b")
+stats_7d.pack(pady=(0, 5))
+
 # -------- Estado general --------
 label_status = tk.Label(
     root, text="Esperando datos...",
@@ -87,82 +108,69 @@ label_status = tk.Label(
 )
 label_status.pack(pady=10)
 
-# ---------------- ESTADO PREVIO ----------------
-prev = {
-    "ars_1": None, "usd_1": None,
-    "ars_7": None, "usd_7": None,
-    "stress_1d": False,
-    "stress_7d": False
+# ---------------- ESTADO ----------------
+widgets = {
+    "root": root,
+    "frame_1d": frame_1d, "frame_7d": frame_7d,
+    "label_ars_1": label_ars_1, "label_usd_1": label_usd_1,
+    "label_ars_7": label_ars_7, "label_usd_7": label_usd_7,
+    "status_1d": status_1d, "status_7d": status_7d,
+    "label_status": label_status,
+    "stats_1d": stats_1d, "stats_7d": stats_7d,
 }
+lineas = {"spark_1d": (spark_1d, linea_1d), "spark_7d": (spark_7d, linea_7d)}
+beeps = {"1d": beep_1d, "7d": beep_7d}
 
-def arrow(curr, prev):
-    if prev is None:
-        return ""
-    if curr > prev:
-        return " ↑"
-    if curr < prev:
-        return " ↓"
-    return ""
+presentador = PresentadorCauciones(TARGET_ARS, TARGET_USD)
+cola = queue.Queue()
+historial = HistorialCauciones(HISTORIAL_DIR, SERIES)
 
-# ---------------- LOOP ----------------
+# ---------------- LOOP DE DATOS (hilo) ----------------
 def update_loop():
+    """Sólo lee la página y publica Snapshots; nunca toca widgets."""
     while True:
         driver.refresh()
         time.sleep(6)
 
-        html = driver.page_source
-        tasas = re.findall(r'(\d{1,3}[.,]\d{1,2})\s*%', html)
-        tasas = [float(x.replace(",", ".")) for x in tasas]
-
-        if len(tasas) >= 10:
-            ars_1, usd_1, ars_7, usd_7 = tasas[0], tasas[1], tasas[8], tasas[7]
+        snap = parsear_tasas(driver.page_source)
+        if snap is not None:
+            historial.registrar(snap)   # cada tick queda en disco, aunque la UI lo saltee
+            cola.put(snap)
 
-            label_ars_1.config(text=f"ARS: {ars_1:.2f}" + " " + arrow(ars_1, prev["ars_1"]))
-            label_usd_1.config(text=f"USD: {usd_1:.2f}" + " " + arrow(ars_1, prev["ars_1"]))
-            label_ars_7.config(text=f"ARS: {ars_7:.2f}" + " " + arrow(ars_1, prev["ars_1"]))
-            label_usd_7.config(text=f"USD: {usd_7:.2f}" + " " + arrow(ars_1, prev["ars_1"]))
-
-            stress_1d = ars_1 >= TARGET_ARS or usd_1 >= TARGET_USD
-            stress_7d = ars_7 >= TARGET_ARS or usd_7 >= TARGET_USD
-
-            # ---- 1D ----
-            if stress_1d:
-                status_1d.config(text="⚠️ Estrés de liquidez", fg="red")
-                frame_1d.config(bg="#2b0000")
-                if not prev["stress_1d"]:
-                    beep_1d()
-            else:
-                status_1d.config(text="Estado: OK", fg="lightgreen")
-                frame_1d.config(bg="#1b1b1b")
-
-            # ---- 7D ----
-            if stress_7d:
-                status_7d.config(text="⚠️ Estrés", fg="red")
-                frame_7d.config(bg="#2b0000")
-                if not prev["stress_7d"]:
-                    beep_7d()
-            else:
-                status_7d.config(text="Estado: OK", fg="lightgreen")
-                frame_7d.config(bg="#1b1b1b")
+        time.sleep(20)
 
-            # ---- General ----
-            if stress_1d or stress_7d:
-                root.config(bg="#220000")
-                label_status.config(text="Mercado estresado", fg="red")
+# ---------------- LOOP DE UI (Tk) ----------------
+def procesar_cola():
+    snap = drenar(cola)
+    if snap is not None:
+        cambios, alertas = presentador.aplicar(snap)
+        for nombre, opciones in cambios.items():
+            widgets[nombre].config(**opciones)
+        for plazo in alertas:
+            beeps[plazo]()
+        actualizar_historial(snap.ts)
+    root.after(250, procesar_cola)
+
+def actualizar_historial(ahora):
+    vista = {}
+    for plazo, serie in (("1d", "ars_1"), ("7d", "ars_7")):
+        stats = historial.estadisticas(serie, VENTANA_MIN, ahora)
+        valores = historial.valores(serie, VENTANA_MIN, ahora)
+        vista[f"stats_{plazo}"] = {"text": texto_resumen(stats, VENTANA_MIN)}
+        vista[f"spark_{plazo}"] = {"coords": puntos_sparkline(valores, SPARK_ANCHO, SPARK_ALTO)}
+
+    for nombre, opciones in presentador.filtrar(vista).items():
+        if nombre in lineas:
+            canvas, linea = lineas[nombre]
+            # Con menos de 2 puntos no hay línea: se oculta la anterior en lugar de dejarla
+            if opciones["coords"]:
+                canvas.coords(linea, *opciones["coords"])
+                canvas.itemconfig(linea, state="normal")
             else:
-                root.config(bg="#111")
-                label_status.config(text="Mercado normal", fg="lightgreen")
-
-            # Guardar estado previo
-            prev.update({
-                "ars_1": ars_1, "usd_1": usd_1,
-                "ars_7": ars_7, "usd_7": usd_7,
-                "stress_1d": stress_1d,
-                "stress_7d": stress_7d
-            })
-
-        time.sleep(20)
+                canvas.itemconfig(linea, state="hidden")
+        else:
+            widgets[nombre].config(**opciones)
 
 threading.Thread(target=update_loop, daemon=True).start()
+root.after(250, procesar_cola)
 root.mainloop()
-
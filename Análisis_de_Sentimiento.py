@@ -1,84 +1,67 @@
-import requests
 import pandas as pd
-from nltk.sentiment import SentimentIntensityAnalyzer
 from datetime import datetime, timedelta
 import matplotlib.pyplot as plt
 import seaborn as sns
-import nltk
+from Sentimiento_Fetch import FetcherNewsAPI, cargar_api_key
+from Sentimiento_Cache import AlmacenArticulos, actualizar, puntuar_con_cache
+from Sentimiento_Scoring import PuntuadorVADER
+from Sentimiento_Dedup import colapsar_casi_duplicados
 
 """
 Monitoréa el sentimiento de un activo basado en búsquedas de google, con keywords a elección.
 """
 
 # === CONFIGURACIÓN ===
-API_KEY = "26d19361916f459eac75c6d0abe21104"
+API_KEY = cargar_api_key()          # NEWSAPI_KEY o config.json
 KEYWORDS = ["GOOGL stock", "GOOGL", "Alphabet results", "Alphabet earnings", "GOOGL price"]
 TITULO = "Alphabet Inc (GOOGL)"
 DIAS_RETROCESO = 3
 IDIOMA = "en"
+MAX_PAGINAS = 1                     # páginas de 100 titulares por keyword
+MAX_WORKERS = 8
+PEDIDOS_POR_SEGUNDO = 5
+RUTA_DB = "sentimiento.sqlite"      # titulares y puntajes ya vistos
+UMBRAL_DUPLICADOS = 0.5             # Jaccard (shingles de 4 letras) para considerar dos titulares la misma nota
 
 # === 1. Fechas ===
 fecha_fin = datetime.today().date()
 fecha_inicio = fecha_fin - timedelta(days=DIAS_RETROCESO)
 print(f"📅 Analizando desde {fecha_inicio} hasta {fecha_fin}")
 
-# === 2. Extracción desde NewsAPI ===
-url = "https://newsapi.org/v2/everything"
-articulos_total = []
-
-for kw in KEYWORDS:
-    print(f"📰 Extrayendo titulares para: {kw}...")
-    params = {
-        "q": kw,
-        "from": fecha_inicio.isoformat(),
-        "to": fecha_fin.isoformat(),
-        "language": IDIOMA,
-        "sortBy": "publishedAt",
-        "pageSize": 100,
-        "apiKey": API_KEY
-    }
-
-    response = requests.get(url, params=params)
-    data = response.json()
-
-    if data.get("status") != "ok":
-        print(f"❌ Error con '{kw}':", data.get("message"))
-        continue
-
-    articulos = data.get("articles", [])
-    for art in articulos:
-        art["keyword"] = kw
-
-    print(f"✅ {len(articulos)} titulares extraídos para '{kw}'.")
-    articulos_total.extend(articulos)
-
-print(f"📊 Total de artículos combinados: {len(articulos_total)}")
-print("----"*23)
+# === 2. Extracción desde NewsAPI (sólo lo nuevo) ===
+almacen = AlmacenArticulos(RUTA_DB)
+fetcher = FetcherNewsAPI(API_KEY, max_workers=MAX_WORKERS,
+                         por_segundo=PEDIDOS_POR_SEGUNDO, max_paginas=MAX_PAGINAS)
+
+print(f"📰 Extrayendo titulares nuevos para {len(KEYWORDS)} keywords...")
+nuevos = actualizar(almacen, fetcher, KEYWORDS, fecha_inicio, fecha_fin, IDIOMA)
+fetcher.cerrar()
+
+print(f"✅ {nuevos} titulares nuevos guardados en {RUTA_DB}.")
 
 # === 3. Crear DataFrame y normalizar fechas ===
-df = pd.DataFrame(articulos_total)
+df = almacen.cargar(KEYWORDS, fecha_inicio, fecha_fin)
+print(f"📊 Total de artículos en la ventana: {len(df)}")
+print("----"*23)
 if df.empty:
     print("⚠️ No se encontraron artículos. Revisa las keywords o la API Key.")
     exit()
 
-df = df[["title", "source", "publishedAt", "keyword"]].dropna()
+# Ante titulares repetidos gana la primera keyword de KEYWORDS, como antes
+df = df.dropna().sort_values("keyword", key=lambda s: s.map(KEYWORDS.index), kind="stable")
 df["date"] = pd.to_datetime(df["publishedAt"]).dt.date
-df["media"] = df["source"].apply(lambda x: x.get("name", ""))
-df = df.drop_duplicates(subset="title").reset_index(drop=True)
+df = colapsar_casi_duplicados(df, "title", umbral=UMBRAL_DUPLICADOS)
+print(f"🧹 {len(df)} titulares únicos tras colapsar casi duplicados "
+      f"({int((df['tamano_cluster'] > 1).sum())} notas sindicadas).")
 
 # === 4. Análisis de sentimiento con VADER ===
 print("🧠 Analizando sentimiento con VADER...")
 
-nltk.download('vader_lexicon', quiet=True)
-sia = SentimentIntensityAnalyzer()
-
-def vader_sentiment(text):
-    try:
-        return sia.polarity_scores(text)["compound"]
-    except:
-        return None
-
-df["sentimiento"] = df["title"].apply(vader_sentiment)
+puntuador = PuntuadorVADER()
+df["sentimiento"], puntuados = puntuar_con_cache(almacen, df["title"].tolist(), puntuador.puntuar)
+puntuador.cerrar()
+almacen.cerrar()
+print(f"🧮 {puntuados} titulares puntuados ({len(df) - puntuados} desde la caché).")
 df = df[df["sentimiento"].notna()]
 df["sentimiento"] = df["sentimiento"].round(2)
 df = df[df["sentimiento"] != 0]
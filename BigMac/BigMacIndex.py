@@ -1,6 +1,8 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
+from BigMacPanel import cargar, valuacion
+from Etiquetas import etiquetar
 
 
 """
@@ -8,10 +10,18 @@ Evalúa si el precio del dolar está o no sobrevaluado según el índice BigMac,
 El índice estima el valor de la hamburguesa de McDonnald's, "Big Mac", en distintos países.
 """
 
-df = pd.read_excel("BigMac/BigMac.xlsx")
+# La planilla se parsea una vez y queda en caché Parquet; el cálculo sirve para cualquier país (ver BigMacPanel.py)
+panel = valuacion(cargar("BigMac/BigMac.xlsx"), base="USA").set_index("date")
+arg = panel[panel["iso_a3"] == "ARG"]
+usa = panel[panel["iso_a3"] == "USA"]
 
-df["Dolar_BigMac_Teoric"] = df["Price_ARS"] / df["Price_USA"]
-df["Brecha"] = (df["Dolar_Blue"] *100 / df["Dolar_BigMac_Teoric"]) - 100
+df = pd.DataFrame({
+    "Date": arg.index,
+    "Price_USD": arg["dollar_price"].to_numpy(),
+    "Price_USA": usa["dollar_price"].reindex(arg.index).to_numpy(),
+    "Dolar_BigMac_Teoric": arg["ppp"].to_numpy(),
+    "Brecha": arg["brecha_%"].to_numpy(),
+})
 
 
 plt.style.use("dark_background")
@@ -46,16 +56,8 @@ ax2.plot(df["Date"],
          markeredgewidth=0.5,)
 
 
-for x, y in zip(df.index.values, df['Brecha']):
-    ax2.annotate(
-        f"{y:.2f}",
-        (x, y),
-        textcoords="offset points",
-        xytext=(8, 8),
-        ha='center',
-        fontsize=100,
-        color='white'
-    )
+# Etiquetas sobre las fechas, raleadas según el espacio disponible (ver Etiquetas.py)
+etiquetar(ax2, df["Date"], df["Brecha"], formato="{:.2f}", fontsize=8, color="white")
 
 # Títulos y etiquetas
 ax.set_title("Big Mac Index Argentina", fontsize=16, fontweight="bold", color="white")
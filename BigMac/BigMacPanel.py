@@ -0,0 +1,199 @@
+import numpy as np
+import pandas as pd
+import hashlib, json, os, time
+
+
+"""
+Índice Big Mac para todos los países y fechas, con caché columnar.
+
+BigMacIndex.py leía BigMac.xlsx con read_excel en cada corrida y sólo
+servía para Argentina contra el dólar blue. Acá:
+
+- cargar() acepta la planilla local (Date, Price_ARS, Dolar_Blue, Price_USD,
+  Price_USA) o la base completa de The Economist (big-mac-source-data:
+  name, iso_a3, currency_code, local_price, dollar_ex, date), en CSV o
+  Excel, y la lleva a un formato largo común.
+- Lo parseado se guarda en Parquet. La caché se usa mientras coincidan el
+  mtime y el tamaño del archivo; si cambiaron pero el sha1 del contenido
+  es el mismo (un touch, una copia), se reusa igual.
+- valuacion() calcula de una vez, sobre la matriz fechas x países, el
+  precio en dólares, el tipo de cambio implícito (PPP) y la sobre/sub
+  valuación contra el dólar o contra cualquier otra moneda base.
+"""
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache_bigmac")
+COLUMNAS = ["date", "iso_a3", "name", "currency_code", "local_price", "dollar_ex"]
+# dollar_price es opcional: si la fuente lo trae (Price_USD de la planilla, big-mac-full-index) se respeta,
+# porque puede estar calculado con otro tipo de cambio (oficial) que dollar_ex (blue)
+
+
+# ---------------- CARGA ----------------
+def _leer(ruta):
+    if ruta.lower().endswith((".csv", ".txt")):
+        return pd.read_csv(ruta)
+    return pd.read_excel(ruta)
+
+
+def normalizar(df):
+    """
+    Formato largo: date, iso_a3, name, currency_code, local_price, dollar_ex (moneda local por dólar)
+    y dollar_price (NaN si la fuente no lo trae).
+    """
+    if "Price_ARS" in df.columns:
+        # Planilla local: Argentina al dólar blue y Estados Unidos
+        arg = pd.DataFrame({"date": df["Date"], "iso_a3": "ARG", "name": "Argentina", "currency_code": "ARS",
+                            "local_price": df["Price_ARS"], "dollar_ex": df["Dolar_Blue"],
+                            "dollar_price": df["Price_USD"]})
+        usa = pd.DataFrame({"date": df["Date"], "iso_a3": "USA", "name": "United States", "currency_code": "USD",
+                            "local_price": df["Price_USA"], "dollar_ex": 1.0, "dollar_price": df["Price_USA"]})
+        df = pd.concat([arg, usa], ignore_index=True)
+    else:
+        faltan = set(COLUMNAS) - set(df.columns)
+        if faltan:
+            raise ValueError(f"Faltan columnas en la base Big Mac: {', '.join(sorted(faltan))}")
+        df = df[COLUMNAS + (["dollar_price"] if "dollar_price" in df.columns else [])].copy()
+        if "dollar_price" not in df.columns:
+            df["dollar_price"] = np.nan
+    df = df.astype({"iso_a3": "string", "name": "string", "currency_code": "string",
+                    "local_price": "float64", "dollar_ex": "float64", "dollar_price": "float64"})
+    df["date"] = pd.to_datetime(df["date"])
+    return df.dropna(subset=["local_price", "dollar_ex"]).sort_values(["date", "iso_a3"], ignore_index=True)
+
+
+def _sha1(ruta, bloque=1 << 20):
+    h = hashlib.sha1()
+    with open(ruta, "rb") as f:
+        while datos := f.read(bloque):
+            h.update(datos)
+    return h.hexdigest()
+
+
+def cargar(ruta, cache_dir=CACHE_DIR):
+    """Base Big Mac normalizada, desde la caché Parquet si el archivo fuente no cambió."""
+    st = os.stat(ruta)
+    nombre = hashlib.sha1(os.path.abspath(ruta).encode()).hexdigest()[:12]
+    ruta_cache = os.path.join(cache_dir, f"{nombre}.parquet")
+    ruta_meta = os.path.join(cache_dir, f"{nombre}.json")
+
+    if os.path.exists(ruta_cache) and os.path.exists(ruta_meta):
+        with open(ruta_meta) as f:
+            meta = json.load(f)
+        if meta["mtime_ns"] == st.st_mtime_ns and meta["tamano"] == st.st_size:
+            return pd.read_parquet(ruta_cache)
+        sha = _sha1(ruta)
+        if meta["sha1"] == sha:
+            meta.update(mtime_ns=st.st_mtime_ns, tamano=st.st_size)
+            with open(ruta_meta, "w") as f:
+                json.dump(meta, f)
+            return pd.read_parquet(ruta_cache)
+    else:
+        sha = _sha1(ruta)
+
+    df = normalizar(_leer(ruta))
+    os.makedirs(cache_dir, exist_ok=True)
+    df.to_parquet(ruta_cache, index=False)
+    with open(ruta_meta, "w") as f:
+        json.dump({"fuente": os.path.abspath(ruta), "mtime_ns": st.st_mtime_ns, "tamano": st.st_size, "sha1": sha}, f)
+    return df
+
+
+# ---------------- PANEL ----------------
+def valuacion(df, base="USA"):
+    """
+    Una fila por (fecha, país) con:
+      dollar_price   precio del Big Mac en dólares (el de la fuente, o local_price / dollar_ex)
+      ppp            tipo de cambio implícito contra la base (local_price / local_price_base)
+      tc_base        tipo de cambio de mercado contra la base (dollar_ex / dollar_ex_base)
+      valuacion_%    ppp / tc_base - 1: positivo = moneda sobrevaluada contra la base
+      brecha_%       tc_base / ppp - 1: lo que el script llamaba "Brecha"
+    Fechas en las que la base no tiene dato quedan en NaN.
+    """
+    precio = df.pivot_table(index="date", columns="iso_a3", values="local_price", aggfunc="last")
+    tc = df.pivot_table(index="date", columns="iso_a3", values="dollar_ex", aggfunc="last")
+    fuente = df.pivot_table(index="date", columns="iso_a3", values="dollar_price", aggfunc="last", dropna=False)
+    fuente = fuente.reindex(index=precio.index, columns=precio.columns).to_numpy()
+    if base not in precio.columns:
+        raise ValueError(f"La moneda base {base} no está en la base Big Mac")
+
+    P = precio.to_numpy()
+    E = tc.to_numpy()
+    p_base = P[:, precio.columns.get_loc(base)][:, None]
+    e_base = E[:, tc.columns.get_loc(base)][:, None]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        dolares = np.where(np.isnan(fuente), P / E, fuente)
+        ppp = P / p_base
+        tc_base = E / e_base
+        valuacion_ = (ppp / tc_base - 1) * 100
+        brecha = (tc_base / ppp - 1) * 100
+
+    fechas = np.repeat(precio.index.to_numpy(), len(precio.columns))
+    paises = np.tile(precio.columns.to_numpy(), len(precio.index))
+    panel = pd.DataFrame({
+        "date": fechas,
+        "iso_a3": paises,
+        "local_price": P.ravel(),
+        "dollar_ex": E.ravel(),
+        "dollar_price": dolares.ravel(),
+        "ppp": ppp.ravel(),
+        "tc_base": tc_base.ravel(),
+        "valuacion_%": valuacion_.ravel(),
+        "brecha_%": brecha.ravel(),
+    })
+    panel = panel[~np.isnan(P.ravel())]
+    nombres = df.drop_duplicates("iso_a3", keep="last").set_index("iso_a3")["name"]
+    panel.insert(2, "name", panel["iso_a3"].map(nombres))
+    return panel.reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    # 1) Planilla local: mismo resultado que el cálculo del script
+    local = os.path.join(os.path.dirname(os.path.abspath(__file__)), "BigMac.xlsx")
+    xlsx = pd.read_excel(local)
+    brecha_script = (xlsx["Dolar_Blue"] * 100 / (xlsx["Price_ARS"] / xlsx["Price_USA"])) - 100
+    panel = valuacion(cargar(local))
+    arg = panel[panel["iso_a3"] == "ARG"]
+    print(f"Brecha ARG: máx. diferencia contra el script {np.abs(arg['brecha_%'].to_numpy() - brecha_script.to_numpy()).max():.2e}")
+
+    # 2) Base sintética con el formato de The Economist: 75 países, 2 publicaciones por año desde 1986
+    rng = np.random.default_rng(0)
+    fechas = pd.date_range("1986-01-01", "2025-07-01", freq="6MS")
+    paises = ["USA"] + [f"P{i:02d}" for i in range(74)]
+    filas = len(fechas) * len(paises)
+    inflacion = np.cumsum(rng.normal(0.03, 0.05, (len(fechas), len(paises))), axis=0)
+    sintetica = pd.DataFrame({
+        "name": np.tile(paises, len(fechas)),
+        "iso_a3": np.tile(paises, len(fechas)),
+        "currency_code": np.tile(paises, len(fechas)),
+        "local_price": (np.exp(inflacion) * rng.uniform(1, 100, len(paises))).ravel(),
+        "dollar_ex": (np.exp(inflacion + rng.normal(0, 0.2, inflacion.shape)) * rng.uniform(1, 100, len(paises))).ravel(),
+        "date": np.repeat(fechas, len(paises)),
+    })
+    sintetica.loc[sintetica["iso_a3"] == "USA", "dollar_ex"] = 1.0
+    directorio = tempfile.mkdtemp()
+    ruta = os.path.join(directorio, "big-mac-source-data.xlsx")
+    sintetica.to_excel(ruta, index=False)
+    cache = os.path.join(directorio, "cache")
+
+    for etiqueta, fuente in (("BigMac.xlsx local", local), (f"Economist sintética ({filas} filas)", ruta)):
+        inicio = time.perf_counter()
+        normalizar(pd.read_excel(fuente))
+        excel = time.perf_counter() - inicio
+        cargar(fuente, cache)                   # arma la caché
+        inicio = time.perf_counter()
+        df = cargar(fuente, cache)
+        tibia = time.perf_counter() - inicio
+        os.utime(fuente)                        # touch: cambia el mtime, no el contenido
+        inicio = time.perf_counter()
+        cargar(fuente, cache)
+        tocado = time.perf_counter() - inicio
+        print(f"{etiqueta:<38} read_excel {excel * 1000:8.1f} ms   caché {tibia * 1000:6.1f} ms   "
+              f"tras touch (sha1) {tocado * 1000:6.1f} ms   ({excel / tibia:.0f}x)")
+
+    # 3) Panel completo contra la moneda base: USA, y EUR simulado con P01
+    for base in ("USA", "P01"):
+        inicio = time.perf_counter()
+        panel = valuacion(df, base=base)
+        print(f"valuacion(base={base}): {len(panel)} filas en {(time.perf_counter() - inicio) * 1000:.1f} ms")
+    print(panel[panel["date"] == panel["date"].max()].head().to_string(index=False, float_format="%.2f"))
@@ -0,0 +1,185 @@
+import numpy as np
+import matplotlib.dates as mdates
+from matplotlib.artist import Artist
+from matplotlib.text import Text
+from matplotlib.transforms import offset_copy
+
+
+"""
+Etiquetas de valores para gráficos de series de tiempo, que no crecen con la historia.
+
+BigMacIndex.py hacía un ax2.annotate por fila (con fontsize=100 y
+df.index.values como x sobre un eje de fechas). Con historias largas o
+varios países el render y el archivo crecen sin límite y los textos se
+pisan. EtiquetasSerie es un único artista que, en cada dibujo:
+
+1. Pasa los puntos a píxeles con la transformación actual del eje (así
+   responde a zoom y tamaño de figura).
+2. Si entran todas las etiquetas, dibuja todas. Si no, se queda con los
+   extremos locales más marcados y el último punto, sin superponerse,
+   a lo sumo una por ancho de etiqueta.
+3. Dibuja esa cantidad acotada de textos en una sola pasada, reusando
+   los objetos Text.
+
+El costo depende del ancho del eje en píxeles, no de la cantidad de puntos.
+"""
+
+
+def _a_numeros(x):
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64) or x.dtype == object:
+        return mdates.date2num(x)
+    return x.astype(float)
+
+
+def seleccionar(px, y, ancho_px, prominencia=None):
+    """
+    Índices a etiquetar dadas las posiciones en píxeles (px crecientes) y el ancho de una etiqueta.
+    Siempre incluye el último punto; el resto son extremos locales, de a uno por ancho de etiqueta.
+    """
+    n = len(px)
+    if n == 0:
+        return np.empty(0, dtype=int)
+    if n == 1 or np.diff(px).min() >= ancho_px:
+        return np.arange(n)
+
+    # Extremos locales y cuánto sobresalen respecto de sus vecinos
+    if prominencia is None:
+        prominencia = np.zeros(n)
+        medio = y[1:-1] - (y[:-2] + y[2:]) / 2
+        extremo = ((y[1:-1] >= y[:-2]) & (y[1:-1] >= y[2:])) | ((y[1:-1] <= y[:-2]) & (y[1:-1] <= y[2:]))
+        prominencia[1:-1] = np.where(extremo, np.abs(medio), -1.0)
+        prominencia[0] = -1.0
+    candidatos = np.flatnonzero(prominencia >= 0)
+
+    # El mejor candidato de cada franja de un ancho de etiqueta
+    franja = np.floor((px[candidatos] - px[0]) / ancho_px).astype(np.int64)
+    orden = np.lexsort((-prominencia[candidatos], franja))
+    _, primero = np.unique(franja[orden], return_index=True)
+    elegidos = candidatos[orden[primero]]
+
+    # Franjas vecinas todavía pueden pisarse: se recorre de derecha a izquierda desde el último punto (son pocas)
+    salida = [n - 1]
+    for i in elegidos[::-1]:
+        if i != n - 1 and px[salida[-1]] - px[i] >= ancho_px:
+            salida.append(i)
+    return np.array(salida[::-1], dtype=int)
+
+
+class EtiquetasSerie(Artist):
+    """Un artista con las etiquetas de una serie; la selección se recalcula en cada draw."""
+
+    def __init__(self, ax, x, y, formato="{:.2f}", fontsize=8, color="white", offset=(8, 8), ha="center", **kwargs):
+        super().__init__()
+        self.ax = ax
+        self.x = _a_numeros(x)
+        self.y = np.asarray(y, dtype=float)
+        orden = np.argsort(self.x, kind="stable")
+        self.x, self.y = self.x[orden], self.y[orden]
+        self.formato = formato
+        self.offset = offset
+        self.estilo = dict(fontsize=fontsize, color=color, ha=ha, va="bottom", **kwargs)
+        self._textos = []
+        self.dibujadas = 0
+        self.set_figure(ax.figure)
+        self.set_transform(ax.transData)
+        self.set_clip_on(False)
+
+    def _ancho_px(self, renderer):
+        # Ancho de la etiqueta más larga posible (los números de la serie con el formato elegido)
+        muestra = max((self.formato.format(v) for v in (np.nanmin(self.y), np.nanmax(self.y), self.y[-1])), key=len)
+        return len(muestra) * self.estilo["fontsize"] * 0.6 * renderer.points_to_pixels(1.0) + 4
+
+    def draw(self, renderer):
+        if not self.get_visible() or len(self.x) == 0:
+            return
+        xmin, xmax = self.ax.get_xlim()
+        visibles = np.flatnonzero((self.x >= xmin) & (self.x <= xmax) & ~np.isnan(self.y))
+        if len(visibles) == 0:
+            self.dibujadas = 0
+            return
+        px = self.ax.transData.transform(np.column_stack([self.x[visibles], self.y[visibles]]))[:, 0]
+        idx = visibles[seleccionar(px, self.y[visibles], self._ancho_px(renderer))]
+
+        transformacion = offset_copy(self.ax.transData, fig=self.figure, x=self.offset[0], y=self.offset[1],
+                                     units="points")
+        while len(self._textos) < len(idx):
+            texto = Text(**self.estilo)
+            texto.set_figure(self.figure)
+            self._textos.append(texto)
+        for texto, i in zip(self._textos, idx):
+            texto.set_transform(transformacion)
+            texto.set_position((self.x[i], self.y[i]))
+            texto.set_text(self.formato.format(self.y[i]))
+            texto.draw(renderer)
+        self.dibujadas = len(idx)
+        self.stale = False
+
+
+def etiquetar(ax, x, y, **kwargs):
+    """Agrega las etiquetas de (x, y) al eje. x puede ser fechas. Devuelve el artista."""
+    artista = EtiquetasSerie(ax, x, y, **kwargs)
+    ax.add_artist(artista)
+    return artista
+
+
+if __name__ == "__main__":
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import pandas as pd
+    import itertools, time
+
+    def superpuestas(fig, artista):
+        """Pares de cajas (en píxeles) de las etiquetas dibujadas que se pisan."""
+        renderer = fig.canvas.get_renderer()
+        cajas = [t.get_window_extent(renderer) for t in artista._textos[:artista.dibujadas]]
+        return [(a, b) for a, b in itertools.combinations(cajas, 2) if a.overlaps(b)]
+
+    def render(n, modo, repeticiones=3):
+        """Segundos de un canvas.draw() sólo atribuibles a las etiquetas (con etiquetas - sin etiquetas)."""
+        rng = np.random.default_rng(0)
+        fechas = pd.date_range("1986-01-01", periods=n, freq="D")
+        y = np.cumsum(rng.normal(0, 1, n))
+        tiempos = {}
+        for con in (False, True):
+            fig, ax = plt.subplots(figsize=(14, 6))
+            ax.plot(fechas, y, linewidth=0.5)
+            artista = None
+            if con and modo == "etiquetas":
+                artista = etiquetar(ax, fechas, y)
+            elif con:
+                for xi, yi in zip(fechas, y):
+                    ax.annotate(f"{yi:.2f}", (xi, yi), textcoords="offset points", xytext=(8, 8), ha="center", fontsize=8)
+            fig.canvas.draw()
+            inicio = time.perf_counter()
+            for _ in range(repeticiones):
+                fig.canvas.draw()
+            tiempos[con] = (time.perf_counter() - inicio) / repeticiones
+            dibujadas = artista.dibujadas if artista is not None else n
+            if artista is not None:
+                assert not superpuestas(fig, artista), f"etiquetas superpuestas con {n} puntos"
+            plt.close(fig)
+        return max(tiempos[True] - tiempos[False], 0.0), dibujadas
+
+    print(f"{'puntos':>7} {'annotate por fila':>18} {'EtiquetasSerie':>15} {'etiquetas':>10}")
+    tiempos = {}
+    for n in (50, 500, 5_000, 50_000):
+        viejo = f"{render(n, 'annotate', 1)[0] * 1000:14.1f} ms" if n <= 5_000 else f"{'-':>17}"
+        t, dibujadas = render(n, "etiquetas")
+        tiempos[n] = t
+        print(f"{n:>7} {viejo} {t * 1000:12.1f} ms {dibujadas:>10}")
+
+    # Espaciado irregular: tres días seguidos y después un punto por año
+    fechas = pd.to_datetime(["2000-01-03", "2000-01-04", "2000-01-05"] + [f"{2010 + i}-01-04" for i in range(5)])
+    fig, ax = plt.subplots(figsize=(14, 6))
+    ax.plot(fechas, [1, 3, 1, 2, 5, 2, 6, 4])
+    artista = etiquetar(ax, fechas, [1, 3, 1, 2, 5, 2, 6, 4])
+    fig.canvas.draw()
+    assert not superpuestas(fig, artista), "etiquetas superpuestas con espaciado irregular"
+    plt.close(fig)
+    print("Cajas de las etiquetas dibujadas disjuntas (también con espaciado irregular): OK")
+
+    # El render de las etiquetas no debe crecer con la historia
+    assert tiempos[50_000] <= max(tiempos[50], 0.005) * 10, "el render de etiquetas creció con la cantidad de puntos"
+    print("Render de etiquetas acotado entre 50 y 50.000 puntos: OK")
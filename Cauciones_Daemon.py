@@ -0,0 +1,201 @@
+import argparse, json, logging, signal, sys, time, urllib.request
+from Cauciones_Estado import parsear_tasas, MaquinaEstres, SERIES
+
+
+"""
+Modo daemon (sin GUI) del monitor de cauciones, pensado para servidores Linux.
+
+No importa tkinter, selenium ni winsound: sólo la librería estándar y la
+lógica de Cauciones_Estado. La página se lee por HTTP y las alertas por
+flanco de estrés (1D / 7D) se envían a uno o más sinks intercambiables:
+
+    python Cauciones_Daemon.py --log --archivo alertas.jsonl --webhook http://127.0.0.1:8080/alertas
+
+Selenium (--fuente selenium) y el historial en disco (--historial DIR) se
+importan sólo si se piden.
+"""
+
+# ---------------- CONFIG ----------------
+TARGET_ARS = 50.0
+TARGET_USD = 1.4
+URL = "https://iol.invertironline.com/mercado/cotizaciones/argentina/cauciones"
+INTERVALO = 26          # segundos entre lecturas (6 de carga + 20 de espera en la GUI)
+TIMEOUT = 10
+
+log = logging.getLogger("cauciones")
+
+
+# ---------------- FUENTES ----------------
+class FuenteHTTP:
+    """Baja el HTML con urllib; arranca al instante."""
+
+    def __init__(self, url, timeout=TIMEOUT):
+        self.url = url
+        self.timeout = timeout
+
+    def leer(self):
+        pedido = urllib.request.Request(self.url, headers={"User-Agent": "Mozilla/5.0"})
+        with urllib.request.urlopen(pedido, timeout=self.timeout) as resp:
+            return resp.read().decode("utf-8", errors="replace")
+
+
+class FuenteSelenium:
+    """Chrome headless como en Alarma_Cauciones.py, para cuando la página necesita JavaScript."""
+
+    def __init__(self, url, espera=6):
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+        from webdriver_manager.chrome import ChromeDriverManager
+
+        options = webdriver.ChromeOptions()
+        options.add_argument("--headless")
+        self.driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+        self.driver.get(url)
+        self.espera = espera
+
+    def leer(self):
+        self.driver.refresh()
+        time.sleep(self.espera)
+        return self.driver.page_source
+
+
+# ---------------- SINKS ----------------
+def armar_alerta(plazo, evento, snap):
+    return {
+        "plazo": plazo,
+        "evento": evento,
+        "ts": snap.ts,
+        "tasas": {serie: getattr(snap, serie) for serie in SERIES},
+    }
+
+
+class SinkLog:
+    def enviar(self, alerta):
+        nivel = logging.WARNING if alerta["evento"] == "entra" else logging.INFO
+        texto = "entra en estrés" if alerta["evento"] == "entra" else "vuelve a la normalidad"
+        log.log(nivel, "%s %s: %s", alerta["plazo"].upper(), texto, alerta["tasas"])
+
+
+class SinkArchivo:
+    """Una alerta por línea en formato JSON."""
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+
+    def enviar(self, alerta):
+        with open(self.ruta, "a", encoding="utf-8") as f:
+            f.write(json.dumps(alerta, ensure_ascii=False) + "\n")
+
+
+class SinkWebhook:
+    """POST JSON a un endpoint (por ejemplo un servicio local de notificaciones)."""
+
+    def __init__(self, url, timeout=5):
+        self.url = url
+        self.timeout = timeout
+
+    def enviar(self, alerta):
+        cuerpo = json.dumps(alerta).encode("utf-8")
+        pedido = urllib.request.Request(
+            self.url, data=cuerpo, method="POST",
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(pedido, timeout=self.timeout):
+            pass
+
+
+# ---------------- DAEMON ----------------
+class Daemon:
+
+    def __init__(self, fuente, sinks, target_ars=TARGET_ARS, target_usd=TARGET_USD,
+                 intervalo=INTERVALO, historial=None):
+        self.fuente = fuente
+        self.sinks = sinks
+        self.maquina = MaquinaEstres(target_ars, target_usd)
+        self.intervalo = intervalo
+        self.historial = historial
+        self.activo = True
+
+    def notificar(self, alerta):
+        # Un sink caído no debe frenar a los demás ni al loop
+        for sink in self.sinks:
+            try:
+                sink.enviar(alerta)
+            except Exception as e:
+                log.error("Sink %s falló: %s", type(sink).__name__, e)
+
+    def leer_una_vez(self):
+        snap = parsear_tasas(self.fuente.leer())
+        if snap is None:
+            log.warning("No se encontraron las tasas en la página")
+            return []
+        if self.historial is not None:
+            self.historial.registrar(snap)
+
+        alertas = [armar_alerta(plazo, evento, snap) for plazo, evento in self.maquina.actualizar(snap)]
+        for alerta in alertas:
+            self.notificar(alerta)
+        log.debug("ARS 1D %.2f | USD 1D %.2f | ARS 7D %.2f | USD 7D %.2f", *snap[:4])
+        return alertas
+
+    def correr(self):
+        while self.activo:
+            inicio = time.monotonic()
+            try:
+                self.leer_una_vez()
+            except Exception as e:
+                log.error("Error leyendo %s", e)
+            # Espera en pasos cortos para responder rápido a SIGTERM
+            while self.activo and time.monotonic() - inicio < self.intervalo:
+                time.sleep(min(0.5, self.intervalo))
+
+    def detener(self, *_):
+        self.activo = False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monitor de cauciones sin GUI")
+    parser.add_argument("--url", default=URL)
+    parser.add_argument("--fuente", choices=["http", "selenium"], default="http")
+    parser.add_argument("--intervalo", type=float, default=INTERVALO)
+    parser.add_argument("--target-ars", type=float, default=TARGET_ARS)
+    parser.add_argument("--target-usd", type=float, default=TARGET_USD)
+    parser.add_argument("--log", action="store_true", help="alertas al log (stdout)")
+    parser.add_argument("--archivo", help="alertas en JSON lines a este archivo")
+    parser.add_argument("--webhook", help="alertas por POST JSON a esta URL")
+    parser.add_argument("--historial", help="directorio del historial de ticks")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        stream=sys.stdout,
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(asctime)s %(levelname)s %(message)s",
+    )
+
+    sinks = []
+    if args.log or not (args.archivo or args.webhook):
+        sinks.append(SinkLog())
+    if args.archivo:
+        sinks.append(SinkArchivo(args.archivo))
+    if args.webhook:
+        sinks.append(SinkWebhook(args.webhook))
+
+    historial = None
+    if args.historial:
+        from Cauciones_Historial import HistorialCauciones
+        historial = HistorialCauciones(args.historial, SERIES)
+
+    fuente = FuenteSelenium(args.url) if args.fuente == "selenium" else FuenteHTTP(args.url)
+    daemon = Daemon(fuente, sinks, args.target_ars, args.target_usd, args.intervalo, historial)
+    signal.signal(signal.SIGTERM, daemon.detener)
+    signal.signal(signal.SIGINT, daemon.detener)
+
+    log.info("Monitor de cauciones iniciado (%s, cada %ss)", args.fuente, args.intervalo)
+    daemon.correr()
+    if historial is not None:
+        historial.cerrar()
+
+
+if __name__ == "__main__":
+    main()
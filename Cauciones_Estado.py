@@ -0,0 +1,195 @@
+from collections import namedtuple
+import queue, re, time
+
+
+"""
+Lógica del monitor de cauciones separada de Tkinter y de Selenium.
+
+El hilo de datos arma un Snapshot inmutable y lo deja en una cola.
+El loop de Tk drena la cola con root.after, se queda sólo con el último
+Snapshot y aplica únicamente los cambios que calcula PresentadorCauciones.
+Todo este módulo se puede probar sin display.
+"""
+
+# ---------------- SNAPSHOT ----------------
+Snapshot = namedtuple("Snapshot", ["ars_1", "usd_1", "ars_7", "usd_7", "ts"])
+
+SERIES = ("ars_1", "usd_1", "ars_7", "usd_7")
+
+PATRON_TASA = re.compile(r'(\d{1,3}[.,]\d{1,2})\s*%')
+
+
+def parsear_tasas(html, ts=None):
+    """Devuelve un Snapshot con las tasas de la página, o None si no están todas."""
+    tasas = [float(x.replace(",", ".")) for x in PATRON_TASA.findall(html)]
+    if len(tasas) < 10:
+        return None
+    return Snapshot(tasas[0], tasas[1], tasas[8], tasas[7], time.time() if ts is None else ts)
+
+
+def arrow(curr, prev):
+    if prev is None:
+        return ""
+    if curr > prev:
+        return " ↑"
+    if curr < prev:
+        return " ↓"
+    return ""
+
+
+def evaluar_estres(snap, target_ars, target_usd):
+    stress_1d = snap.ars_1 >= target_ars or snap.usd_1 >= target_usd
+    stress_7d = snap.ars_7 >= target_ars or snap.usd_7 >= target_usd
+    return stress_1d, stress_7d
+
+
+# ---------------- MÁQUINA DE ESTRÉS ----------------
+class MaquinaEstres:
+    """
+    Estado de estrés por plazo con disparo por flanco.
+
+    actualizar() devuelve los eventos del Snapshot: ("1d", "entra") cuando un
+    plazo pasa de normal a estrés y ("1d", "sale") cuando vuelve a la normalidad.
+    Mientras el estado no cambia no se emite nada.
+    """
+
+    PLAZOS = ("1d", "7d")
+
+    def __init__(self, target_ars, target_usd):
+        self.target_ars = target_ars
+        self.target_usd = target_usd
+        self.stress = {plazo: False for plazo in self.PLAZOS}
+
+    def actualizar(self, snap):
+        actual = dict(zip(self.PLAZOS, evaluar_estres(snap, self.target_ars, self.target_usd)))
+        eventos = [
+            (plazo, "entra" if actual[plazo] else "sale")
+            for plazo in self.PLAZOS
+            if actual[plazo] != self.stress[plazo]
+        ]
+        self.stress = actual
+        return eventos
+
+
+# ---------------- COLA ----------------
+def drenar(cola):
+    """
+    Vacía la cola sin bloquear y devuelve el último Snapshot (o None).
+    Si el hilo de datos publicó varios entre dos ticks de Tk, sólo importa el más nuevo.
+    """
+    ultimo = None
+    while True:
+        try:
+            ultimo = cola.get_nowait()
+        except queue.Empty:
+            return ultimo
+
+
+# ---------------- PRESENTADOR ----------------
+class PresentadorCauciones:
+    """
+    Traduce Snapshots a opciones de config() por widget.
+
+    aplicar() devuelve (cambios, alertas):
+        cambios: {nombre_widget: {opcion: valor}} sólo con lo que cambió respecto de lo ya dibujado.
+        alertas: plazos ("1d", "7d") que acaban de entrar en estrés.
+    """
+
+    def __init__(self, target_ars, target_usd):
+        self.target_ars = target_ars
+        self.target_usd = target_usd
+        self.prev = None
+        self.maquina = MaquinaEstres(target_ars, target_usd)
+        self.dibujado = {}
+
+    def vista(self, snap):
+        prev = self.prev
+        stress_1d, stress_7d = evaluar_estres(snap, self.target_ars, self.target_usd)
+
+        # Cada flecha se compara contra su propia serie
+        def etiqueta(prefijo, serie):
+            valor = getattr(snap, serie)
+            anterior = getattr(prev, serie) if prev is not None else None
+            return {"text": f"{prefijo}: {valor:.2f}" + " " + arrow(valor, anterior)}
+
+        vista = {
+            "label_ars_1": etiqueta("ARS", "ars_1"),
+            "label_usd_1": etiqueta("USD", "usd_1"),
+            "label_ars_7": etiqueta("ARS", "ars_7"),
+            "label_usd_7": etiqueta("USD", "usd_7"),
+        }
+
+        # ---- 1D ----
+        if stress_1d:
+            vista["status_1d"] = {"text": "⚠️ Estrés de liquidez", "fg": "red"}
+            vista["frame_1d"] = {"bg": "#2b0000"}
+        else:
+            vista["status_1d"] = {"text": "Estado: OK", "fg": "lightgreen"}
+            vista["frame_1d"] = {"bg": "#1b1b1b"}
+
+        # ---- 7D ----
+        if stress_7d:
+            vista["status_7d"] = {"text": "⚠️ Estrés", "fg": "red"}
+            vista["frame_7d"] = {"bg": "#2b0000"}
+        else:
+            vista["status_7d"] = {"text": "Estado: OK", "fg": "lightgreen"}
+            vista["frame_7d"] = {"bg": "#1b1b1b"}
+
+        # ---- General ----
+        if stress_1d or stress_7d:
+            vista["root"] = {"bg": "#220000"}
+            vista["label_status"] = {"text": "Mercado estresado", "fg": "red"}
+        else:
+            vista["root"] = {"bg": "#111"}
+            vista["label_status"] = {"text": "Mercado normal", "fg": "lightgreen"}
+
+        return vista
+
+    def filtrar(self, vista):
+        """Se queda con las entradas de `vista` que difieren de lo ya dibujado y las marca como dibujadas."""
+        cambios = {
+            nombre: opciones
+            for nombre, opciones in vista.items()
+            if self.dibujado.get(nombre) != opciones
+        }
+        self.dibujado.update(cambios)
+        return cambios
+
+    def aplicar(self, snap):
+        cambios = self.filtrar(self.vista(snap))
+        alertas = [plazo for plazo, evento in self.maquina.actualizar(snap) if evento == "entra"]
+
+        # Guardar estado previo
+        self.prev = snap
+        return cambios, alertas
+
+
+def verificar_maquina_estres():
+    """
+    Recorre una secuencia de snapshots y compara los eventos de MaquinaEstres con los esperados:
+    entrada, salida, sin repetir y plazos independientes. Lanza AssertionError en la primera diferencia.
+    """
+    normal = Snapshot(30.0, 1.0, 32.0, 1.5, 0)
+    pasos = [
+        (normal, []),                                                   # arranca normal: nada
+        (normal._replace(ars_1=45.0), [("1d", "entra")]),
+        (normal._replace(ars_1=46.0), []),                              # sigue en estrés
+        (normal._replace(ars_1=46.0, usd_1=6.0), []),                   # otra causa, mismo estado
+        (normal._replace(ars_1=46.0, usd_7=5.0), [("7d", "entra")]),    # 1d no se repite
+        (normal._replace(usd_7=5.5), [("1d", "sale")]),                 # 7d sigue igual
+        (normal._replace(usd_7=5.5), []),
+        (normal, [("7d", "sale")]),
+        (normal, []),
+        (Snapshot(41.0, 1.0, 1.0, 9.0, 0), [("1d", "entra"), ("7d", "entra")]),
+        (normal, [("1d", "sale"), ("7d", "sale")]),
+    ]
+    maquina = MaquinaEstres(target_ars=40.0, target_usd=5.0)
+    for i, (snap, esperado) in enumerate(pasos):
+        eventos = maquina.actualizar(snap)
+        if eventos != esperado:
+            raise AssertionError(f"MaquinaEstres, paso {i} ({snap}): {eventos} en lugar de {esperado}")
+
+
+if __name__ == "__main__":
+    verificar_maquina_estres()
+    print("MaquinaEstres: flancos de entrada y salida, sin eventos repetidos, plazos independientes")
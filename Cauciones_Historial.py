@@ -0,0 +1,217 @@
+import numpy as np
+import os, threading, time
+
+
+"""
+Historial intradiario de tasas de cauciones.
+
+Cada tasa observada se guarda en un archivo binario append-only por serie
+(registros de ancho fijo: timestamp float64 + valor float64 = 16 bytes) y
+en un ring buffer en memoria con los últimos ticks. Los timestamps se
+escriben además, contiguos, en <nombre>.ts, y la búsqueda binaria corre
+sobre ese arreglo en lugar del campo "ts" de los registros (con salto de
+16 bytes).
+
+- agregar() es O(1): dos writes (16 + 8 bytes) y una escritura en el ring buffer.
+- Las consultas recientes salen del ring buffer sin copiar; las más viejas
+  se leen del archivo con np.memmap y búsqueda binaria sobre <nombre>.ts.
+- La memoria queda acotada por la capacidad del ring buffer, sin importar
+  cuántos años de ticks tenga el archivo.
+"""
+
+REGISTRO = np.dtype([("ts", "<f8"), ("valor", "<f8")])
+CAPACIDAD = 6 * 3600  # 6 horas de ticks de 1 segundo
+
+
+def inicio_del_dia(ts):
+    t = time.localtime(ts)
+    return time.mktime((t.tm_year, t.tm_mon, t.tm_mday, 0, 0, 0, 0, 0, -1))
+
+
+class SerieTicks:
+    """Una serie (por ejemplo "ars_1") persistida en <directorio>/<nombre>.bin."""
+
+    def __init__(self, ruta, capacidad=CAPACIDAD):
+        self.ruta = ruta
+        self.ruta_ts = os.path.splitext(ruta)[0] + ".ts"
+        self.capacidad = capacidad
+
+        # Ring buffer duplicado: cada registro se escribe en i y en i + capacidad,
+        # así los últimos `capacidad` ticks siempre son una vista contigua.
+        # _ts_buf repite los timestamps en un arreglo contiguo para buscar.
+        self._buf = np.zeros(2 * capacidad, dtype=REGISTRO)
+        self._ts_buf = np.zeros(2 * capacidad)
+        self._cabeza = 0
+        self._n = 0
+        self._apertura = (None, None)  # (inicio del día, primer valor del día)
+        self._mapas = (0, None, None)  # (registros, memmap de registros, memmap de timestamps)
+        self._cargar()
+        self._archivo = open(ruta, "ab", buffering=0)
+        self._archivo_ts = open(self.ruta_ts, "ab", buffering=0)
+
+    def _cargar(self):
+        if not os.path.exists(self.ruta):
+            return
+        # Descarta un registro incompleto al final (corte en medio de un write)
+        tam = os.path.getsize(self.ruta)
+        if tam % REGISTRO.itemsize:
+            os.truncate(self.ruta, tam - tam % REGISTRO.itemsize)
+        total = self._total_en_archivo()
+        if total == 0:
+            return
+        datos = np.memmap(self.ruta, dtype=REGISTRO, mode="r")
+        self._sincronizar_ts(datos)
+        cola = np.array(datos[-self.capacidad:])
+        k = len(cola)
+        self._buf[:k] = cola
+        self._buf[self.capacidad:self.capacidad + k] = cola
+        self._ts_buf[:k] = cola["ts"]
+        self._ts_buf[self.capacidad:self.capacidad + k] = cola["ts"]
+        self._n = k
+        self._cabeza = k % self.capacidad
+        # Apertura del día del último tick guardado
+        dia = inicio_del_dia(cola["ts"][-1])
+        i = np.searchsorted(np.memmap(self.ruta_ts, dtype="<f8", mode="r"), dia, side="left")
+        self._apertura = (dia, float(datos["valor"][i]))
+
+    def _sincronizar_ts(self, datos):
+        """Deja <nombre>.ts con un timestamp por registro: recorta lo que sobra y completa desde los registros."""
+        n_ts = os.path.getsize(self.ruta_ts) // 8 if os.path.exists(self.ruta_ts) else 0
+        n_ts = min(n_ts, len(datos))
+        with open(self.ruta_ts, "ab") as f:
+            f.truncate(8 * n_ts)
+            f.write(np.ascontiguousarray(datos["ts"][n_ts:]).tobytes())
+
+    def _archivo_mapeado(self):
+        """Memmaps de registros y timestamps; se vuelven a abrir sólo si el archivo creció."""
+        total = self._total_en_archivo()
+        if total == 0:
+            return None, None
+        if total != self._mapas[0]:
+            ts = np.memmap(self.ruta_ts, dtype="<f8", mode="r")
+            total = min(total, len(ts))
+            self._mapas = (total, np.memmap(self.ruta, dtype=REGISTRO, mode="r")[:total], ts[:total])
+        return self._mapas[1], self._mapas[2]
+
+    def _total_en_archivo(self):
+        return os.path.getsize(self.ruta) // REGISTRO.itemsize
+
+    def agregar(self, ts, valor):
+        registro = np.array((ts, valor), dtype=REGISTRO)
+        self._archivo.write(registro.tobytes())
+        self._archivo_ts.write(registro["ts"].tobytes())
+
+        self._buf[self._cabeza] = registro
+        self._buf[self._cabeza + self.capacidad] = registro
+        self._ts_buf[self._cabeza] = ts
+        self._ts_buf[self._cabeza + self.capacidad] = ts
+        self._cabeza = (self._cabeza + 1) % self.capacidad
+        self._n = min(self._n + 1, self.capacidad)
+
+        dia = inicio_del_dia(ts)
+        if dia != self._apertura[0]:
+            self._apertura = (dia, float(valor))
+
+    def _ventana(self):
+        return slice(0, self._n) if self._n < self.capacidad else slice(self._cabeza, self._cabeza + self.capacidad)
+
+    def recientes(self):
+        """Vista (sin copia) de los ticks del ring buffer, en orden cronológico."""
+        return self._buf[self._ventana()]
+
+    def rango(self, desde, hasta=None):
+        """Ticks con desde <= ts <= hasta (hasta=None: hasta el último)."""
+        recientes = self.recientes()
+        if len(recientes) and desde >= recientes["ts"][0]:
+            datos, ts = recientes, self._ts_buf[self._ventana()]
+        else:
+            datos, ts = self._archivo_mapeado()
+            if datos is None:
+                return recientes[:0]
+        i = np.searchsorted(ts, desde, side="left")
+        j = len(ts) if hasta is None else np.searchsorted(ts, hasta, side="right")
+        return datos[i:j]
+
+    def ultimo(self):
+        recientes = self.recientes()
+        return None if not len(recientes) else float(recientes["valor"][-1])
+
+    def estadisticas(self, minutos, ahora=None):
+        """min/max/media de los últimos `minutos` y variación contra la apertura del día."""
+        ahora = time.time() if ahora is None else ahora
+        valores = self.rango(ahora - 60 * minutos, ahora)["valor"]
+        if not len(valores):
+            return None
+        ultimo = float(valores[-1])
+        apertura = self._apertura[1]
+        return {
+            "min": float(valores.min()),
+            "max": float(valores.max()),
+            "media": float(valores.mean()),
+            "ultimo": ultimo,
+            "apertura": apertura,
+            "vs_apertura": None if apertura is None else ultimo - apertura,
+            "n": len(valores),
+        }
+
+    def cerrar(self):
+        self._archivo.close()
+        self._archivo_ts.close()
+
+
+class HistorialCauciones:
+    """Agrupa una SerieTicks por serie del Snapshot. Es seguro usarlo desde varios hilos."""
+
+    def __init__(self, directorio, series, capacidad=CAPACIDAD):
+        os.makedirs(directorio, exist_ok=True)
+        self.series = {
+            nombre: SerieTicks(os.path.join(directorio, f"{nombre}.bin"), capacidad)
+            for nombre in series
+        }
+        self._lock = threading.Lock()
+
+    def registrar(self, snap):
+        with self._lock:
+            for nombre, serie in self.series.items():
+                serie.agregar(snap.ts, getattr(snap, nombre))
+
+    def estadisticas(self, nombre, minutos, ahora=None):
+        with self._lock:
+            return self.series[nombre].estadisticas(minutos, ahora)
+
+    def valores(self, nombre, minutos, ahora=None):
+        ahora = time.time() if ahora is None else ahora
+        with self._lock:
+            return np.array(self.series[nombre].rango(ahora - 60 * minutos, ahora)["valor"])
+
+    def cerrar(self):
+        with self._lock:
+            for serie in self.series.values():
+                serie.cerrar()
+
+
+# ---------------- SPARKLINE ----------------
+def puntos_sparkline(valores, ancho, alto, margen=2):
+    """
+    Coordenadas planas (x0, y0, x1, y1, ...) para canvas.coords().
+    Si hay más valores que píxeles se toma un valor por columna.
+    """
+    valores = np.asarray(valores, dtype=float)
+    if len(valores) < 2:
+        return ()
+    if len(valores) > ancho:
+        valores = valores[np.linspace(0, len(valores) - 1, int(ancho)).astype(int)]
+    lo, hi = valores.min(), valores.max()
+    escala = (alto - 2 * margen) / (hi - lo) if hi > lo else 0.0
+    xs = np.linspace(margen, ancho - margen, len(valores))
+    ys = alto - margen - (valores - lo) * escala if escala else np.full(len(valores), alto / 2)
+    return tuple(np.column_stack([xs, ys]).ravel().round(1).tolist())
+
+
+def texto_resumen(stats, minutos):
+    if stats is None:
+        return f"{minutos}m: sin datos"
+    texto = f"{minutos}m  min {stats['min']:.2f}  max {stats['max']:.2f}  media {stats['media']:.2f}"
+    if stats["vs_apertura"] is not None:
+        texto += f"  |  vs apertura {stats['vs_apertura']:+.2f}"
+    return texto
@@ -1,6 +1,8 @@
 from scipy.optimize import linprog
 import matplotlib.pyplot as plt
-import yfinance as yf
+from Portafolio_Modelo import ModeloPortafolio
+from Portafolio_Enteros import resolver_enteros
+from Portafolio_Datos import precios_actuales
 
 
 """
@@ -77,11 +79,8 @@ c = [1, 1, 1, 1, 1, 1, 1, 1, 1, 1]
 tickers = ["AAPL", "GOOGL", "TSLA", "AMZN", "^SPX", 
            "BTC", "KO", "DIS", "NVDA", "INTC"]
 
-precios = []
-
-for t in tickers:
-    precio_actual = yf.Ticker(t).info['regularMarketPrice']
-    precios.append(precio_actual)
+# Una sola descarga para todos los tickers, con caché en disco (ver Portafolio_Datos.py)
+precios = precios_actuales(tickers).tolist()
 
 
 # Presupuesto total
@@ -91,28 +90,27 @@ presupuesto = [1000000]
 porcentaje_max = [10, 15, 20, 30, 20, 15, 25, 50, 40, 10]
 porcentaje_min = [0, 5, 0, 15, 5, 10, 5, 10, 30, 5]
 
-A_eq = [precios]           
-b_eq = presupuesto
-A_ub = [[1,0,0,0,0,0,0,0,0,0], [0,1,0,0,0,0,0,0,0,0], [0,0,1,0,0,0,0,0,0,0], [0,0,0,1,0,0,0,0,0,0],
-        [0,0,0,0,1,0,0,0,0,0], [0,0,0,0,0,1,0,0,0,0], [0,0,0,0,0,0,1,0,0,0], [0,0,0,0,0,0,0,1,0,0],
-        [0,0,0,0,0,0,0,0,1,0], [0,0,0,0,0,0,0,0,0,1]]
-b_ub = []
-for i in range(len(porcentaje_max)):
-    a = (porcentaje_max[i] * presupuesto[0]) / (precios[i] * 100)
-    b_ub.append(a)
+# Las bandas por activo son cotas de las variables; grupos, rotación y presupuesto
+# se compilan a matrices dispersas (ver Portafolio_Modelo.py)
+modelo = ModeloPortafolio(tickers, precios, presupuesto[0]).pesos(porcentaje_min, porcentaje_max)
+problema = modelo.compilar(c)
 
 """
 Si A_ub y b_ub son None, no hay restricciones de desigualdad.
 """
 
-mins = []
-for i in range(len(precios)):
-    b = (porcentaje_min[i] * presupuesto[0]) / (precios[i] * 100)
-    mins.append(b)
-
-bounds = [(m, None) for m in mins]
-
-
-
 # Llamar a la función para resolver el problema
-resolver_lp(c, A_eq, b_eq, A_ub, b_ub, bounds, tipo="max", tickers = tickers)
+resolver_lp(problema["c"], problema["A_eq"], problema["b_eq"], problema["A_ub"], problema["b_ub"],
+            problema["bounds"], tipo="max", tickers = tickers)
+
+# Acciones enteras: lote mínimo por activo (1 = acciones sueltas); None para no calcularlo
+LOTES = 1
+if LOTES is not None:
+    enteros = resolver_enteros(modelo, c, lotes=LOTES, tipo="max")
+    if enteros.success:
+        print(f"\n🔢 Acciones enteras ({enteros.metodo}, gap {enteros.gap:.2%}):")
+        for t, q, p in zip(tickers, enteros.x, modelo.porcentajes(enteros.x)):
+            print(f"{t}: {q:.0f} ({p:.2f}%)")
+        print(f"Invertido: {modelo.inversiones(enteros.x).sum():,.2f} de {presupuesto[0]:,}")
+    else:
+        print("\n❌ Sin asignación entera:", enteros.message)
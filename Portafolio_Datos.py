@@ -0,0 +1,60 @@
+import pandas as pd
+import hashlib, os, time
+
+
+"""
+Descarga y caché en disco de precios para los módulos de portafolio.
+
+yf.download se llama una sola vez para todos los tickers juntos y el
+resultado se guarda en CACHE_DIR; mientras la caché tenga menos de
+max_edad_horas se lee de disco sin tocar la red. precios_actuales hace lo
+mismo con el último cierre, en lugar de un yf.Ticker(t).info por ticker.
+"""
+
+CACHE_DIR = "cache_precios"
+
+
+def _ruta_cache(tickers, periodo, intervalo, cache_dir):
+    clave = hashlib.sha1("|".join(sorted(tickers) + [periodo, intervalo]).encode()).hexdigest()[:16]
+    return os.path.join(cache_dir, f"historial_{clave}.pkl")
+
+
+def historial_precios(tickers, periodo="2y", intervalo="1d", cache_dir=CACHE_DIR, max_edad_horas=12):
+    """DataFrame de cierres ajustados (fechas x tickers)."""
+    ruta = _ruta_cache(tickers, periodo, intervalo, cache_dir)
+    if os.path.exists(ruta) and time.time() - os.path.getmtime(ruta) < max_edad_horas * 3600:
+        return pd.read_pickle(ruta)[list(tickers)]
+
+    import yfinance as yf
+    data = yf.download(list(tickers), period=periodo, interval=intervalo,
+                       auto_adjust=True, progress=False, group_by="column")
+    cierres = data["Close"] if isinstance(data.columns, pd.MultiIndex) else data[["Close"]].set_axis(list(tickers), axis=1)
+    cierres = cierres[list(tickers)].dropna(how="all")
+
+    os.makedirs(cache_dir, exist_ok=True)
+    cierres.to_pickle(ruta)
+    return cierres
+
+
+def precios_actuales(tickers, cache_dir=CACHE_DIR, max_edad_minutos=15):
+    """Último cierre de cada ticker (Series), con una sola descarga para todos."""
+    ruta = _ruta_cache(tickers, "ultimo", "1d", cache_dir)
+    if os.path.exists(ruta) and time.time() - os.path.getmtime(ruta) < max_edad_minutos * 60:
+        return pd.read_pickle(ruta)[list(tickers)]
+
+    import yfinance as yf
+    data = yf.download(list(tickers), period="5d", interval="1d",
+                       auto_adjust=False, progress=False, group_by="column")
+    cierres = data["Close"] if isinstance(data.columns, pd.MultiIndex) else data[["Close"]].set_axis(list(tickers), axis=1)
+    precios = cierres[list(tickers)].ffill().iloc[-1]
+    if precios.isna().any():
+        raise ValueError(f"Sin precio para: {', '.join(precios.index[precios.isna()])}")
+
+    os.makedirs(cache_dir, exist_ok=True)
+    precios.to_pickle(ruta)
+    return precios
+
+
+def rendimientos(cierres):
+    """Rendimientos simples diarios; descarta fechas sin dato para algún activo."""
+    return cierres.pct_change().dropna(how="any")
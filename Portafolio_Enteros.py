@@ -0,0 +1,212 @@
+import numpy as np
+import copy, time
+from scipy.optimize import milp, linprog, LinearConstraint, Bounds, OptimizeResult
+
+
+"""
+Asignación en acciones enteras o lotes para el modelo de Portafolio_Modelo.py.
+
+El LP devuelve cantidades fraccionarias (x1 = 12.3456). Redondearlas a mano
+rompe el presupuesto y las bandas. Acá las variables son lotes enteros
+(cantidad = lote * k) y el problema se resuelve como MILP con HiGHS
+(scipy.optimize.milp), con límite de tiempo y gap relativo configurables.
+
+Con acciones enteras casi nunca se puede gastar exactamente el presupuesto:
+la igualdad del LP pasa a ser "gastar como mucho el presupuesto".
+
+Si el tiempo se agota sin solución entera (o con una peor), se usa un
+redondeo greedy sobre la relajación LP: piso de cada cantidad y después se
+agregan lotes, del mejor objetivo por peso al peor, mientras entren en el
+presupuesto, las bandas, los grupos y la rotación.
+"""
+
+LIMITE_TIEMPO = 10.0    # segundos
+GAP_RELATIVO = 1e-4
+
+
+def _lotes(modelo, lotes):
+    lotes = np.broadcast_to(np.asarray(lotes, dtype=float), (modelo.n,)).copy()
+    if np.any(lotes <= 0):
+        raise ValueError("Los lotes tienen que ser positivos")
+    return lotes
+
+
+def _problema_enteros(modelo, c, lotes):
+    """Compila el modelo con presupuesto <= y reescala las columnas de cantidades a lotes."""
+    relajado = copy.copy(modelo)
+    relajado.invertir_todo = False
+    problema = relajado.compilar(c)
+    n_total = len(problema["c"])
+    escala = np.ones(n_total)
+    escala[:modelo.n] = lotes
+
+    c = problema["c"] * escala
+    A_ub = problema["A_ub"].multiply(escala.reshape(1, -1)).tocsr() if problema["A_ub"] is not None else None
+    A_eq = problema["A_eq"].multiply(escala.reshape(1, -1)).tocsr() if problema["A_eq"] is not None else None
+
+    lb = np.array([lo for lo, _ in problema["bounds"]], dtype=float) / escala
+    ub = np.array([np.inf if hi is None else hi for _, hi in problema["bounds"]], dtype=float) / escala
+    lb[:modelo.n] = np.ceil(lb[:modelo.n] - 1e-9)
+    ub[:modelo.n] = np.floor(ub[:modelo.n] + 1e-9)
+    integralidad = np.zeros(n_total)
+    integralidad[:modelo.n] = 1
+    return c, A_ub, problema["b_ub"], A_eq, problema["b_eq"], lb, ub, integralidad
+
+
+def redondeo_greedy(modelo, x_relajado, lotes, c, signo=-1.0):
+    """
+    Lotes enteros factibles a partir de la relajación LP (en lotes).
+    signo: -1 para maximizar c'x, 1 para minimizar (como en resolver_enteros).
+    Devuelve None si el piso de las cotas mínimas ya no entra.
+    """
+    n = modelo.n
+    cotas = modelo.cotas()
+    lo = np.ceil(cotas[:, 0] / lotes - 1e-9)
+    hi = np.floor(cotas[:, 1] / lotes + 1e-9)
+    k = np.clip(np.floor(x_relajado[:n] + 1e-9), lo, hi)
+    costo = modelo.precios * lotes
+    tope = modelo.presupuesto
+
+    # Suma invertida por grupo y tope de cada uno
+    grupos = [(idx, np.inf if maximo is None else maximo * tope / 100, minimo)
+              for _, idx, minimo, maximo in modelo.grupos]
+    pertenece = [[] for _ in range(n)]
+    for g, (idx, _, _) in enumerate(grupos):
+        for i in idx:
+            pertenece[i].append(g)
+    en_grupo = np.array([costo[idx] @ k[idx] for idx, _, _ in grupos])
+
+    if modelo.rotacion_max is not None:
+        tenencias = modelo.tenencias / lotes
+        rotacion_max = modelo.rotacion_max * tope / 100
+
+    def rotacion(k):
+        return costo @ np.abs(k - tenencias)
+
+    def factible(k):
+        if costo @ k > tope + 1e-6 or np.any(en_grupo > np.array([m for _, m, _ in grupos]) + 1e-6):
+            return False
+        if any(minimo is not None and en_grupo[g] < minimo * tope / 100 - 1e-6
+               for g, (_, _, minimo) in enumerate(grupos)):
+            return False
+        return modelo.rotacion_max is None or rotacion(k) <= rotacion_max + 1e-6
+
+    gastado = costo @ k
+    if gastado > tope + 1e-6:
+        return None
+
+    # Mayor mejora del objetivo por peso invertido primero; sólo los que lo mejoran
+    mejora = -signo * c[:n] * lotes
+    orden = [i for i in np.argsort(-mejora / costo) if mejora[i] > 0]
+    for i in orden:
+        while k[i] < hi[i] and gastado + costo[i] <= tope + 1e-6:
+            if any(en_grupo[g] + costo[i] > grupos[g][1] + 1e-6 for g in pertenece[i]):
+                break
+            if modelo.rotacion_max is not None:
+                k[i] += 1
+                if rotacion(k) > rotacion_max + 1e-6:
+                    k[i] -= 1
+                    break
+            else:
+                k[i] += 1
+            gastado += costo[i]
+            for g in pertenece[i]:
+                en_grupo[g] += costo[i]
+    return k if factible(k) else None
+
+
+def resolver_enteros(modelo, c=None, lotes=1, tipo="max", limite_tiempo=LIMITE_TIEMPO, gap=GAP_RELATIVO):
+    """
+    Cantidades enteras (múltiplos de `lotes`) para el modelo. Devuelve un OptimizeResult con
+    x (cantidades), fun, metodo ("milp" o "greedy"), gap (contra la relajación LP) y tiempo.
+    """
+    inicio = time.perf_counter()
+    lotes = _lotes(modelo, lotes)
+    c = np.ones(modelo.n) if c is None else np.asarray(c, dtype=float)
+    cc, A_ub, b_ub, A_eq, b_eq, lb, ub, integralidad = _problema_enteros(modelo, c, lotes)
+    signo = -1.0 if tipo == "max" else 1.0
+
+    restricciones = []
+    if A_ub is not None:
+        restricciones.append(LinearConstraint(A_ub, -np.inf, b_ub))
+    if A_eq is not None:
+        restricciones.append(LinearConstraint(A_eq, b_eq, b_eq))
+    res = milp(signo * cc, constraints=restricciones, integrality=integralidad, bounds=Bounds(lb, ub),
+               options={"time_limit": limite_tiempo, "mip_rel_gap": gap, "disp": False})
+
+    # Cota de la relajación: sirve para el gap del greedy y como punto de partida del redondeo
+    relajada = linprog(signo * cc, A_ub=A_ub, b_ub=b_ub, A_eq=A_eq, b_eq=b_eq,
+                       bounds=list(zip(lb, np.where(np.isinf(ub), None, ub))), method="highs")
+    if not relajada.success:
+        return OptimizeResult(success=False, x=None, fun=None, metodo=None, gap=None,
+                              tiempo=time.perf_counter() - inicio, message=relajada.message)
+    cota = signo * relajada.fun
+
+    k, metodo, valor = None, None, None
+    if res.x is not None:
+        k, metodo, valor = np.round(res.x[:modelo.n]), "milp", signo * res.fun
+    if res.status != 0 or (res.mip_gap or 0) > 0:
+        # Sin óptimo probado dentro del tiempo: probar el redondeo y quedarse con lo mejor
+        k_greedy = redondeo_greedy(modelo, relajada.x, lotes, c, signo)
+        if k_greedy is not None:
+            valor_greedy = cc[:modelo.n] @ k_greedy
+            if k is None or signo * valor_greedy < signo * valor:
+                k, metodo, valor = k_greedy, "greedy", valor_greedy
+
+    if k is None:
+        return OptimizeResult(success=False, x=None, fun=None, metodo=None, gap=None,
+                              tiempo=time.perf_counter() - inicio, message=res.message)
+    return OptimizeResult(
+        success=True,
+        x=k * lotes,
+        fun=float(valor),
+        metodo=metodo,
+        gap=abs(cota - valor) / max(abs(cota), 1e-12),
+        tiempo=time.perf_counter() - inicio,
+        message=res.message,
+    )
+
+
+if __name__ == "__main__":
+    from Portafolio_Modelo import ModeloPortafolio
+
+    # 1) Ejemplo del script: 10 tickers, precios fijos
+    precios = [150, 120, 200, 180, 5000, 60000, 60, 90, 400, 30]
+    presupuesto = 1000000
+    porcentaje_max = [10, 15, 20, 30, 20, 15, 25, 50, 40, 10]
+    porcentaje_min = [0, 5, 0, 15, 5, 10, 5, 10, 30, 5]
+    modelo = ModeloPortafolio(range(10), precios, presupuesto).pesos(porcentaje_min, porcentaje_max)
+    lp = modelo.resolver()
+    res = resolver_enteros(modelo)
+    print(f"LP: {lp.fun:.4f} acciones (fraccionario)   MILP: {res.fun:.0f} acciones, "
+          f"gastado {modelo.inversiones(res.x).sum():,.0f} de {presupuesto:,}, {res.tiempo * 1000:.0f} ms")
+    print("Cantidades:", res.x.astype(int).tolist())
+    print("Porcentajes:", (np.round(modelo.porcentajes(res.x), 2) + 0.0).tolist(), "\n")
+
+    # 2) Escalamiento: lotes de 10 o 100 acciones, 10 sectores con tope de 15%, presupuesto chico
+    #    para que la integralidad pese. Con 1 ms de límite queda el redondeo greedy.
+    rng = np.random.default_rng(1)
+    print(f"{'activos':>8} {'MILP':>8} {'gap':>9}   {'límite 1 ms':>12} {'gap':>9}")
+    for n in (10, 50, 200, 500, 1000, 2000):
+        precios = rng.uniform(5, 500, n)
+        lotes = rng.choice([10, 100], n)
+        modelo = ModeloPortafolio(range(n), precios, 3e5).pesos(np.zeros(n), np.full(n, max(10.0, 200 / n)))
+        sectores = rng.integers(0, 10, n)
+        for g in range(10):
+            modelo.grupo(f"sector {g}", np.flatnonzero(sectores == g), maximo=15.0)
+        c = precios * rng.uniform(0.8, 1.2, n)   # valor esperado de cada acción
+        exacto = resolver_enteros(modelo, c, lotes, limite_tiempo=30.0, gap=0.0)
+        rapido = resolver_enteros(modelo, c, lotes, limite_tiempo=1e-3, gap=0.0)
+        print(f"{n:>8} {exacto.tiempo:>7.2f}s {exacto.gap:>9.2e}   "
+              f"{rapido.metodo:>7} {rapido.tiempo:>4.2f}s {rapido.gap:>9.2e}")
+
+    # 3) tipo="min": el redondeo greedy también tiene que mejorar en la dirección pedida
+    n = 200
+    precios = rng.uniform(5, 500, n)
+    modelo = ModeloPortafolio(range(n), precios, 3e5, invertir_todo=False).pesos(np.zeros(n), np.full(n, 5.0))
+    c = rng.normal(0, 1, n)
+    for tipo in ("max", "min"):
+        exacto = resolver_enteros(modelo, c, 10, tipo=tipo, limite_tiempo=30.0, gap=0.0)
+        rapido = resolver_enteros(modelo, c, 10, tipo=tipo, limite_tiempo=1e-3, gap=0.0)
+        assert rapido.gap < 1e-3, (tipo, rapido.metodo, rapido.gap)
+        print(f"tipo={tipo}: MILP {exacto.fun:,.2f}   {rapido.metodo} con 1 ms {rapido.fun:,.2f} (gap {rapido.gap:.2e})")
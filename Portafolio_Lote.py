@@ -0,0 +1,161 @@
+import numpy as np
+import pandas as pd
+from scipy.optimize import linprog
+from concurrent.futures import ProcessPoolExecutor
+from Portafolio_Modelo import ModeloPortafolio
+
+
+"""
+Resolución en lote de la asignación de Optimización_de_Portafolio.py para
+muchos clientes: mismo universo, distinto presupuesto y distintas bandas.
+
+- Los precios se bajan o leen de la caché una sola vez (Portafolio_Datos).
+- La fila de presupuesto y el objetivo se compilan una vez; cada escenario
+  sólo cambia las cotas de las variables.
+- Con el universo fijo, la solución escala linealmente con el presupuesto
+  (cotas y presupuesto son proporcionales a él). Los escenarios se agrupan
+  por conjunto de bandas: se resuelve un LP por grupo, con presupuesto de
+  referencia, y se reescala para cada cliente.
+- Los grupos se reparten en bloques entre un pool de procesos.
+
+El resultado es una tabla larga (escenario x ticker), sin gráficos.
+"""
+
+PRESUPUESTO_REFERENCIA = 1e6
+TAM_BLOQUE = 100
+
+
+# Estado de cada proceso del pool: lo compartido por todos los escenarios
+_compartido = {}
+
+
+def _iniciar(precios, c, invertir_todo):
+    modelo = ModeloPortafolio(range(len(precios)), precios, PRESUPUESTO_REFERENCIA, invertir_todo)
+    problema = modelo.compilar(c)
+    problema["c"] = -problema["c"]  # se maximiza, como en el script
+    _compartido.update(modelo=modelo, problema=problema)
+
+
+def _resolver_bloque(bandas):
+    """Cantidades para presupuesto de referencia de cada (mínimos, máximos); None si no hay solución."""
+    modelo, problema = _compartido["modelo"], _compartido["problema"]
+    salida = []
+    for minimos, maximos in bandas:
+        modelo.pesos(minimos, maximos)
+        cotas = modelo.cotas()
+        res = linprog(**{**problema, "bounds": [(lo, None if np.isinf(hi) else hi) for lo, hi in cotas]},
+                      method="highs")
+        salida.append((res.x, res.message) if res.success else (None, res.message))
+    return salida
+
+
+def _bandas(valor, n, defecto):
+    if valor is None or (np.isscalar(valor) and pd.isna(valor)):
+        return (defecto,) * n
+    valor = np.broadcast_to(np.asarray(valor, dtype=float), (n,))
+    return tuple(valor.tolist())
+
+
+def resolver_escenarios(escenarios, tickers, precios=None, c=None, invertir_todo=True,
+                        workers=None, tam_bloque=TAM_BLOQUE):
+    """
+    escenarios: DataFrame con "presupuesto", "porcentaje_min" y "porcentaje_max" (listas alineadas
+    con tickers, o un número para todos) y opcionalmente "escenario" como identificador.
+    precios: alineados con tickers; si es None se usan los últimos cierres (Portafolio_Datos).
+
+    Devuelve una fila por (escenario, ticker) con cantidad, inversión, porcentaje y estado.
+    """
+    tickers = list(tickers)
+    n = len(tickers)
+    if precios is None:
+        from Portafolio_Datos import precios_actuales
+        precios = precios_actuales(tickers)
+    precios = np.asarray(precios, dtype=float)
+    c = np.ones(n) if c is None else np.asarray(c, dtype=float)
+
+    ids = escenarios["escenario"].to_numpy() if "escenario" in escenarios else np.arange(len(escenarios))
+    presupuestos = escenarios["presupuesto"].to_numpy(dtype=float)
+    minimos = escenarios["porcentaje_min"] if "porcentaje_min" in escenarios else [None] * len(escenarios)
+    maximos = escenarios["porcentaje_max"] if "porcentaje_max" in escenarios else [None] * len(escenarios)
+
+    # Un LP por conjunto de bandas distinto
+    claves = [(_bandas(lo, n, 0.0), _bandas(hi, n, np.inf)) for lo, hi in zip(minimos, maximos)]
+    unicas = list(dict.fromkeys(claves))
+    grupo = {clave: i for i, clave in enumerate(unicas)}
+    bloques = [unicas[i:i + tam_bloque] for i in range(0, len(unicas), tam_bloque)]
+
+    if len(bloques) == 1 or workers == 1:
+        _iniciar(precios, c, invertir_todo)
+        resultados = [r for bloque in bloques for r in _resolver_bloque(bloque)]
+    else:
+        with ProcessPoolExecutor(workers, initializer=_iniciar, initargs=(precios, c, invertir_todo)) as pool:
+            resultados = [r for parcial in pool.map(_resolver_bloque, bloques) for r in parcial]
+
+    # Reescalado: cantidades(presupuesto) = cantidades(referencia) * presupuesto / referencia
+    base = np.full((len(unicas), n), np.nan)
+    mensajes = []
+    for i, (x, mensaje) in enumerate(resultados):
+        if x is not None:
+            base[i] = x
+        mensajes.append("ok" if x is not None else mensaje)
+    indice = np.array([grupo[clave] for clave in claves], dtype=int)
+    cantidades = base[indice] * (presupuestos / PRESUPUESTO_REFERENCIA)[:, None]
+    inversiones = cantidades * precios
+
+    return pd.DataFrame({
+        "escenario": np.repeat(ids, n),
+        "ticker": np.tile(tickers, len(ids)),
+        "presupuesto": np.repeat(presupuestos, n),
+        "cantidad": cantidades.ravel(),
+        "inversion": inversiones.ravel(),
+        "porcentaje": (inversiones / presupuestos[:, None] * 100).ravel(),
+        "estado": np.repeat(np.array(mensajes, dtype=object)[indice], n),
+    })
+
+
+if __name__ == "__main__":
+    import time
+
+    # 1) Ejemplo del script con tres clientes: mismo resultado que ModeloPortafolio uno por uno
+    tickers = ["AAPL", "GOOGL", "TSLA", "AMZN", "^SPX", "BTC", "KO", "DIS", "NVDA", "INTC"]
+    precios = [150, 120, 200, 180, 5000, 60000, 60, 90, 400, 30]
+    porcentaje_max = [10, 15, 20, 30, 20, 15, 25, 50, 40, 10]
+    porcentaje_min = [0, 5, 0, 15, 5, 10, 5, 10, 30, 5]
+    clientes = pd.DataFrame({
+        "escenario": ["ana", "beto", "carla"],
+        "presupuesto": [1000000, 250000, 1000000],
+        "porcentaje_min": [porcentaje_min, porcentaje_min, 0],
+        "porcentaje_max": [porcentaje_max, porcentaje_max, 20],
+    })
+    tabla = resolver_escenarios(clientes, tickers, precios)
+    for _, fila in clientes.iterrows():
+        modelo = ModeloPortafolio(tickers, precios, fila["presupuesto"]).pesos(
+            _bandas(fila["porcentaje_min"], 10, 0.0), _bandas(fila["porcentaje_max"], 10, np.inf))
+        x = tabla.loc[tabla["escenario"] == fila["escenario"], "cantidad"].to_numpy()
+        print(f"{fila['escenario']}: máx. diferencia contra el modelo {np.abs(modelo.resolver().x - x).max():.2e}")
+    print(tabla.pivot(index="ticker", columns="escenario", values="porcentaje").round(2) + 0.0, "\n")
+
+    # 2) 10.000 escenarios sobre 100 activos
+    rng = np.random.default_rng(0)
+    n, m = 100, 10_000
+    tickers = [f"A{i}" for i in range(n)]
+    precios = rng.uniform(5, 500, n)
+
+    def bandas_aleatorias(k):
+        minimos = rng.uniform(0, 0.5, (k, n))
+        return [lo.tolist() for lo in minimos], [(lo + rng.uniform(1, 4, n)).tolist() for lo in minimos]
+
+    for perfiles in (200, m):
+        # `perfiles` conjuntos de bandas distintos repartidos entre los clientes
+        minimos, maximos = bandas_aleatorias(perfiles)
+        elegido = rng.integers(0, perfiles, m) if perfiles < m else np.arange(m)
+        escenarios = pd.DataFrame({
+            "presupuesto": rng.uniform(1e4, 1e7, m),
+            "porcentaje_min": [minimos[i] for i in elegido],
+            "porcentaje_max": [maximos[i] for i in elegido],
+        })
+        inicio = time.perf_counter()
+        tabla = resolver_escenarios(escenarios, tickers, precios)
+        dt = time.perf_counter() - inicio
+        print(f"{m} escenarios, {perfiles} perfiles de bandas, {n} activos: {dt:.2f}s  "
+              f"({len(tabla)} filas, {(tabla['estado'] != 'ok').sum() // n} sin solución)")
@@ -0,0 +1,171 @@
+import numpy as np
+from scipy import sparse
+from scipy.optimize import linprog
+
+
+"""
+Modelo declarativo para el LP de Optimización_de_Portafolio.py.
+
+Las restricciones se declaran (pesos mínimos/máximos por activo, topes por
+grupo o sector, límite de rotación, presupuesto) y se compilan a matrices
+scipy.sparse para linprog(method="highs").
+
+Las variables son cantidades de cada activo, como en el script original.
+Los pesos mínimos y máximos por activo no generan filas: son cotas de las
+variables. Cada grupo es una fila dispersa y la rotación agrega variables
+auxiliares de compra y venta.
+"""
+
+
+class ModeloPortafolio:
+
+    def __init__(self, tickers, precios, presupuesto, invertir_todo=True):
+        self.tickers = list(tickers)
+        self.precios = np.asarray(precios, dtype=float)
+        self.presupuesto = float(presupuesto)
+        self.invertir_todo = invertir_todo      # True: igualdad; False: gastar como mucho el presupuesto
+        n = len(self.tickers)
+        self.minimos = np.zeros(n)              # en % del presupuesto
+        self.maximos = np.full(n, np.inf)
+        self.grupos = []                        # (nombre, índices, mínimo %, máximo %)
+        self.tenencias = None
+        self.rotacion_max = None                # en % del presupuesto
+        self._indice = {t: i for i, t in enumerate(self.tickers)}
+
+    @property
+    def n(self):
+        return len(self.tickers)
+
+    def _indices(self, miembros):
+        return np.array([self._indice[m] if isinstance(m, str) else int(m) for m in miembros], dtype=int)
+
+    # ---------- Declaración ----------
+    def pesos(self, minimos=None, maximos=None):
+        """Porcentajes mínimos y máximos por activo (listas alineadas con tickers)."""
+        if minimos is not None:
+            self.minimos = np.asarray(minimos, dtype=float)
+        if maximos is not None:
+            self.maximos = np.asarray(maximos, dtype=float)
+        return self
+
+    def grupo(self, nombre, miembros, maximo=None, minimo=None):
+        """Tope (y/o piso) en % del presupuesto para la suma invertida en `miembros`."""
+        self.grupos.append((nombre, self._indices(miembros), minimo, maximo))
+        return self
+
+    def rotacion(self, tenencias, maximo):
+        """Limita sum(|x - tenencias| * precio) a `maximo` % del presupuesto."""
+        self.tenencias = np.asarray(tenencias, dtype=float)
+        self.rotacion_max = maximo
+        return self
+
+    # ---------- Compilación ----------
+    def cotas(self):
+        """Cotas (n x 2) de las cantidades: porcentaje * presupuesto / (precio * 100)."""
+        escala = self.presupuesto / (self.precios * 100)
+        return np.column_stack([self.minimos * escala, self.maximos * escala])
+
+    def compilar(self, c=None):
+        """Diccionario con c, A_ub, b_ub, A_eq, b_eq y bounds listo para linprog."""
+        n = self.n
+        c = np.ones(n) if c is None else np.asarray(c, dtype=float)
+        cotas = self.cotas()
+        filas_ub, b_ub = [], []
+        filas_eq, b_eq = [], []
+
+        # Grupos: una fila con los precios de los miembros
+        for _, idx, minimo, maximo in self.grupos:
+            fila = sparse.csr_matrix((self.precios[idx], (np.zeros(len(idx), dtype=int), idx)), shape=(1, n))
+            if maximo is not None:
+                filas_ub.append(fila)
+                b_ub.append(maximo * self.presupuesto / 100)
+            if minimo is not None:
+                filas_ub.append(-fila)
+                b_ub.append(-minimo * self.presupuesto / 100)
+
+        presupuesto = sparse.csr_matrix(self.precios.reshape(1, -1))
+        if self.invertir_todo:
+            filas_eq.append(presupuesto)
+            b_eq.append(self.presupuesto)
+        else:
+            filas_ub.append(presupuesto)
+            b_ub.append(self.presupuesto)
+
+        if self.rotacion_max is not None:
+            # x - compra + venta = tenencias ; sum(precio * (compra + venta)) <= rotación
+            eye = sparse.identity(n, format="csr")
+            ceros = sparse.csr_matrix((1, 2 * n))
+            filas_ub = [sparse.hstack([f, sparse.csr_matrix((1, 2 * n))]) for f in filas_ub]
+            filas_eq = [sparse.hstack([f, ceros]) for f in filas_eq]
+            filas_eq.append(sparse.hstack([eye, -eye, eye]))
+            b_eq.extend(self.tenencias)
+            filas_ub.append(sparse.hstack([sparse.csr_matrix((1, n)),
+                                           sparse.csr_matrix(np.tile(self.precios, 2).reshape(1, -1))]))
+            b_ub.append(self.rotacion_max * self.presupuesto / 100)
+            c = np.concatenate([c, np.zeros(2 * n)])
+            cotas = np.vstack([cotas, np.column_stack([np.zeros(2 * n), np.full(2 * n, np.inf)])])
+
+        return {
+            "c": c,
+            "A_ub": sparse.vstack(filas_ub, format="csr") if filas_ub else None,
+            "b_ub": np.array(b_ub) if b_ub else None,
+            "A_eq": sparse.vstack(filas_eq, format="csr") if filas_eq else None,
+            "b_eq": np.array(b_eq) if b_eq else None,
+            "bounds": [(lo, None if np.isinf(hi) else hi) for lo, hi in cotas],
+        }
+
+    def resolver(self, c=None, tipo="max"):
+        """Resuelve con HiGHS. Devuelve el OptimizeResult con x recortado a las cantidades."""
+        problema = self.compilar(c)
+        if tipo == "max":
+            problema["c"] = -problema["c"]
+        res = linprog(method="highs", **problema)
+        if res.success:
+            res.x = res.x[:self.n]
+            if tipo == "max":
+                res.fun = -res.fun
+        return res
+
+    def inversiones(self, cantidades):
+        return np.asarray(cantidades) * self.precios
+
+    def porcentajes(self, cantidades):
+        return self.inversiones(cantidades) / self.presupuesto * 100
+
+
+if __name__ == "__main__":
+    import time
+
+    # 1) Mismo resultado que la formulación densa del script (10 tickers, precios fijos)
+    precios = [150, 120, 200, 180, 5000, 60000, 60, 90, 400, 30]
+    presupuesto = 1000000
+    porcentaje_max = [10, 15, 20, 30, 20, 15, 25, 50, 40, 10]
+    porcentaje_min = [0, 5, 0, 15, 5, 10, 5, 10, 30, 5]
+
+    A_ub = np.eye(10).tolist()
+    b_ub = [(porcentaje_max[i] * presupuesto) / (precios[i] * 100) for i in range(10)]
+    bounds = [((porcentaje_min[i] * presupuesto) / (precios[i] * 100), None) for i in range(10)]
+    denso = linprog([-1] * 10, A_eq=[precios], b_eq=[presupuesto], A_ub=A_ub, b_ub=b_ub, bounds=bounds, method="highs")
+
+    modelo = ModeloPortafolio(range(10), precios, presupuesto).pesos(porcentaje_min, porcentaje_max)
+    res = modelo.resolver()
+    print(f"Script: {-denso.fun:.4f}  Modelo: {res.fun:.4f}  "
+          f"máx. diferencia en x: {np.abs(denso.x - res.x).max():.2e}")
+
+    # 2) 5.000 activos y 50 grupos
+    rng = np.random.default_rng(0)
+    n, g = 5000, 50
+    precios = rng.uniform(5, 500, n)
+    minimos = np.zeros(n)
+    maximos = rng.uniform(0.05, 0.5, n)
+    grupos = rng.integers(0, g, n)
+
+    inicio = time.perf_counter()
+    modelo = ModeloPortafolio(range(n), precios, 1e8).pesos(minimos, maximos)
+    for k in range(g):
+        modelo.grupo(f"sector {k}", np.flatnonzero(grupos == k), maximo=4.0)
+    problema = modelo.compilar()
+    armado = time.perf_counter() - inicio
+    res = linprog(method="highs", **{**problema, "c": -problema["c"]})
+    total = time.perf_counter() - inicio
+    print(f"{n} activos, {g} grupos: armado {armado * 1000:.0f} ms, total {total:.2f}s, estado: {res.message}")
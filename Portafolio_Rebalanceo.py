@@ -0,0 +1,187 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.optimize import linprog
+import time
+from Portafolio_Modelo import ModeloPortafolio
+
+
+"""
+Rebalanceo diario de una cartera existente, con arranque en caliente.
+
+resolver_lp arma y resuelve desde cero una cartera nueva. Acá se parte de
+las tenencias actuales y se resuelve el objetivo con costo de transacción
+(proporcional al monto operado) y, si se pide, tope de rotación. El LP es
+el de ModeloPortafolio con rotación: variables [cantidades, compras, ventas],
+x - compra + venta = tenencias. Los costos se descuentan del presupuesto.
+
+De un día al otro sólo cambian precios, tenencias y objetivo: la estructura
+es la misma, así que la base óptima de ayer es casi óptima hoy. Con highspy
+(opcional) se guarda la base de HiGHS y se pasa a la corrida siguiente; el
+simplex arranca desde ahí y hace unas pocas iteraciones. Sin highspy se usa
+linprog en frío.
+
+La salida es sólo la lista de operaciones.
+"""
+
+COSTO_BPS = 10      # costo de transacción, en puntos básicos del monto operado
+MINIMO_OPERACION = 1e-6
+
+
+class Rebalanceador:
+
+    def __init__(self, tickers, minimos=None, maximos=None, costo_bps=COSTO_BPS, rotacion_max=None,
+                 caliente=True):
+        """
+        minimos / maximos: porcentajes por activo, como porcentaje_min / porcentaje_max del script.
+        rotacion_max: tope de compras + ventas en % del valor de la cartera (None = sin tope).
+        """
+        self.tickers = list(tickers)
+        n = len(self.tickers)
+        self.minimos = np.zeros(n) if minimos is None else np.asarray(minimos, dtype=float)
+        self.maximos = np.full(n, np.inf) if maximos is None else np.asarray(maximos, dtype=float)
+        self.costo = costo_bps / 1e4
+        self.rotacion_max = rotacion_max
+        self.base = None
+        self.iteraciones = None
+        self.tiempo = None
+        try:
+            import highspy
+            self._highs = highspy.Highs() if caliente else None
+        except ImportError:
+            self._highs = None
+        if self._highs is not None:
+            self._highs.setOptionValue("output_flag", False)
+            self._highs.setOptionValue("solver", "simplex")
+
+    def _problema(self, tenencias, precios, efectivo, c):
+        presupuesto = float(tenencias @ precios + efectivo)
+        modelo = ModeloPortafolio(self.tickers, precios, presupuesto).pesos(self.minimos, self.maximos)
+        modelo.rotacion(tenencias, np.inf if self.rotacion_max is None else self.rotacion_max)
+        problema = modelo.compilar(c)
+        n = len(self.tickers)
+
+        # Costos: salen del objetivo y del presupuesto (p'x + costo * p'(compra + venta) = presupuesto).
+        # compra y venta son cantidades de acciones: el coeficiente es costo * precio de cada una.
+        costo_por_accion = self.costo * precios
+        costo = np.concatenate([costo_por_accion, costo_por_accion])
+        problema["c"] = -problema["c"]
+        problema["c"][n:] += costo
+        A_eq = problema["A_eq"].tolil()
+        A_eq[0, n:] = costo
+        problema["A_eq"] = A_eq.tocsr()
+        if self.rotacion_max is None:
+            # La fila de rotación es la última de A_ub
+            problema["A_ub"] = problema["A_ub"][:-1] if problema["A_ub"].shape[0] > 1 else None
+            problema["b_ub"] = problema["b_ub"][:-1] if problema["A_ub"] is not None else None
+        return problema
+
+    def _resolver_highs(self, problema):
+        import highspy
+        h = self._highs
+        filas = [m for m in (problema["A_ub"], problema["A_eq"]) if m is not None]
+        A = sparse.vstack(filas, format="csc")
+        m_ub = 0 if problema["A_ub"] is None else problema["A_ub"].shape[0]
+        inf = highspy.kHighsInf
+
+        lp = highspy.HighsLp()
+        lp.num_col_, lp.num_row_ = A.shape[1], A.shape[0]
+        lp.col_cost_ = problema["c"]
+        lp.col_lower_ = np.array([lo for lo, _ in problema["bounds"]], dtype=float)
+        lp.col_upper_ = np.array([inf if hi is None else hi for _, hi in problema["bounds"]], dtype=float)
+        b_ub = np.array([] if m_ub == 0 else problema["b_ub"], dtype=float)
+        lp.row_lower_ = np.concatenate([np.full(m_ub, -inf), problema["b_eq"]])
+        lp.row_upper_ = np.concatenate([b_ub, problema["b_eq"]])
+        lp.a_matrix_.format_ = highspy.MatrixFormat.kColwise
+        lp.a_matrix_.start_ = A.indptr
+        lp.a_matrix_.index_ = A.indices
+        lp.a_matrix_.value_ = A.data
+
+        h.passModel(lp)
+        if self.base is not None:
+            h.setBasis(self.base)
+        h.run()
+        if h.getModelStatus() != highspy.HighsModelStatus.kOptimal:
+            self.base = None
+            raise RuntimeError(f"Rebalanceo: {h.modelStatusToString(h.getModelStatus())}")
+        self.base = h.getBasis()
+        self.iteraciones = h.getInfo().simplex_iteration_count
+        return np.array(h.getSolution().col_value)
+
+    def rebalancear(self, tenencias, precios, efectivo=0.0, c=None):
+        """
+        Operaciones para llevar `tenencias` al óptimo del día con estos precios.
+        c: valor de cada acción para el objetivo (por defecto 1, como en el script).
+        """
+        inicio = time.perf_counter()
+        tenencias = np.asarray(tenencias, dtype=float)
+        precios = np.asarray(precios, dtype=float)
+        problema = self._problema(tenencias, precios, efectivo, c)
+        if self._highs is not None:
+            x = self._resolver_highs(problema)
+        else:
+            res = linprog(method="highs", **problema)
+            if not res.success:
+                raise RuntimeError(f"Rebalanceo: {res.message}")
+            x, self.iteraciones = res.x, res.nit
+        self.tiempo = time.perf_counter() - inicio
+
+        n = len(self.tickers)
+        operado = x[n:2 * n] - x[2 * n:]
+        idx = np.flatnonzero(np.abs(operado) > MINIMO_OPERACION)
+        return pd.DataFrame({
+            "ticker": np.array(self.tickers, dtype=object)[idx],
+            "operacion": np.where(operado[idx] > 0, "compra", "venta"),
+            "cantidad": np.abs(operado[idx]),
+            "precio": precios[idx],
+            "monto": np.abs(operado[idx]) * precios[idx],
+            "costo": np.abs(operado[idx]) * precios[idx] * self.costo,
+        })
+
+
+if __name__ == "__main__":
+    # Cartera de 2.000 activos rebalanceada 20 días seguidos con movimientos chicos de precio
+    rng = np.random.default_rng(0)
+    n, dias = 2000, 20
+    tickers = [f"A{i}" for i in range(n)]
+    precios = rng.uniform(5, 500, n)
+    maximos = rng.uniform(0.05, 0.2, n)
+    alfa = rng.normal(0.0005, 0.002, n)     # retorno esperado diario de cada activo
+
+    def objetivo(precios, alfa):
+        return (1 + alfa) * precios        # valor esperado mañana de cada acción
+
+    # Cartera inicial: el óptimo sin costos a partir de efectivo
+    inicial = Rebalanceador(tickers, maximos=maximos, costo_bps=0, caliente=False)
+    trades = inicial.rebalancear(np.zeros(n), precios, efectivo=1e8, c=objetivo(precios, alfa))
+    posicion = {t: i for i, t in enumerate(tickers)}
+    tenencias = np.zeros(n)
+    tenencias[trades["ticker"].map(posicion).to_numpy()] = trades["cantidad"].to_numpy()
+
+    caliente = Rebalanceador(tickers, maximos=maximos, rotacion_max=5.0)
+    frio = Rebalanceador(tickers, maximos=maximos, rotacion_max=5.0, caliente=False)
+    if caliente._highs is None:
+        print("highspy no está instalado: las dos corridas son en frío")
+
+    print(f"{'día':>4} {'operaciones':>11} {'caliente':>9} {'iter':>5} {'frío':>8} {'iter':>5} {'dif. monto':>10}")
+    t_caliente = t_frio = 0.0
+    for dia in range(1, dias + 1):
+        precios = precios * np.exp(rng.normal(0, 0.01, n))
+        alfa = 0.9 * alfa + 0.1 * rng.normal(0.0005, 0.002, n)
+        c = objetivo(precios, alfa)
+        a = caliente.rebalancear(tenencias, precios, c=c)
+        b = frio.rebalancear(tenencias, precios, c=c)
+        if dia > 1:     # el primer día la corrida en caliente no tiene base previa
+            t_caliente += caliente.tiempo
+            t_frio += frio.tiempo
+        print(f"{dia:>4} {len(a):>11} {caliente.tiempo * 1000:>7.0f}ms {caliente.iteraciones:>5} "
+              f"{frio.tiempo * 1000:>6.0f}ms {frio.iteraciones:>5} {abs(a['monto'].sum() - b['monto'].sum()):>10.2e}")
+        # Se ejecutan las operaciones
+        signo = np.where(a["operacion"] == "compra", 1.0, -1.0)
+        valor = tenencias @ precios
+        tenencias[a["ticker"].map(posicion).to_numpy()] += signo * a["cantidad"].to_numpy()
+        # Los costos se pagan en pesos sobre el monto operado: valor nuevo + costos = valor anterior
+        assert np.isclose(tenencias @ precios + a["costo"].sum(), valor, rtol=1e-9)
+        assert np.allclose(a["costo"], a["monto"] * caliente.costo)
+    print(f"Promedio días 2-{dias}: caliente {t_caliente / (dias - 1) * 1000:.0f} ms, "
+          f"frío {t_frio / (dias - 1) * 1000:.0f} ms ({t_frio / t_caliente:.1f}x)")
@@ -0,0 +1,306 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.linalg import cho_factor, cho_solve, LinAlgError
+from scipy.optimize import linprog
+from concurrent.futures import ProcessPoolExecutor
+
+
+"""
+Optimización con riesgo sobre los mismos tickers y bandas mín/máx del script.
+
+resolver_lp sólo maximiza la cantidad de acciones dentro de las bandas.
+Acá los pesos w (suma 1, mínimo <= w <= máximo) se eligen mirando
+rendimientos y riesgo:
+
+- Covarianza con contracción de Ledoit-Wolf hacia la identidad escalada,
+  calculada con numpy sobre el historial cacheado (Portafolio_Datos).
+- Mínima varianza y media-varianza con un método primal-dual de conjunto
+  activo (cada iteración es un Cholesky sobre los activos libres); si no
+  converge se termina con gradiente proyectado acelerado (FISTA).
+- Frontera eficiente de N puntos: cada punto arranca desde la solución y el
+  conjunto activo del anterior (warm start), así converge en 1-3 iteraciones.
+- Máximo Sharpe: búsqueda de sección áurea sobre la aversión al riesgo.
+- CVaR: LP de Rockafellar-Uryasev sobre los escenarios históricos con HiGHS;
+  la frontera CVaR se reparte en un pool de procesos.
+"""
+
+DIAS_ANIO = 252
+
+
+# ---------------- COVARIANZA ----------------
+def ledoit_wolf(R):
+    """Covarianza contraída (Ledoit-Wolf 2004) de una matriz de rendimientos T x n. Devuelve (cov, contraccion)."""
+    X = np.asarray(R, dtype=float)
+    X = X - X.mean(axis=0)
+    T, n = X.shape
+    S = X.T @ X / T
+    mu = np.trace(S) / n
+    delta = (np.sum(S ** 2) - 2 * mu * np.trace(S) + n * mu ** 2) / n     # ||S - mu I||² / n
+    beta = (np.sum(np.sum(X ** 2, axis=1) ** 2) / T - np.sum(S ** 2)) / (n * T)
+    contraccion = 0.0 if delta == 0 else min(beta, delta) / delta
+    cov = (1 - contraccion) * S
+    cov[np.diag_indices(n)] += contraccion * mu
+    return cov, contraccion
+
+
+# ---------------- PROYECCIÓN ----------------
+def proyectar(v, lo, hi, iteraciones=60):
+    """Proyección euclídea de v sobre {sum(w) = 1, lo <= w <= hi} (bisección sobre el multiplicador)."""
+    a = np.min(v - hi) - 1.0
+    b = np.max(v - lo) + 1.0
+    for _ in range(iteraciones):
+        tau = (a + b) / 2
+        if np.clip(v - tau, lo, hi).sum() > 1:
+            a = tau
+        else:
+            b = tau
+    return np.clip(v - (a + b) / 2, lo, hi)
+
+
+def qp_caja(Q, q, lo, hi, w0=None, max_iter=50):
+    """
+    min 1/2 w'Qw - q'w  s.a. sum(w) = 1, lo <= w <= hi  (conjunto activo primal-dual).
+    Devuelve w, o None si el conjunto activo cicla o el sistema no es definido positivo.
+    """
+    n = len(q)
+    w = np.clip(np.full(n, 1 / n) if w0 is None else w0, lo, hi)
+    en_lo = w <= lo
+    en_hi = (w >= hi) & ~en_lo
+    for _ in range(max_iter):
+        libre = ~(en_lo | en_hi)
+        fijo = np.where(en_lo, lo, hi)
+        w = np.where(libre, 0.0, fijo)
+        F = np.flatnonzero(libre)
+        if len(F) == 0:
+            return w if abs(w.sum() - 1) < 1e-9 else None
+        # Q_FF w_F + nu 1 = q_F - Q_F,fijos w_fijos ;  1'w_F = 1 - sum(w_fijos)
+        rhs = q[F] - Q[F] @ w
+        try:
+            fac = cho_factor(Q[np.ix_(F, F)])
+        except LinAlgError:
+            return None
+        a = cho_solve(fac, rhs)
+        b = cho_solve(fac, np.ones(len(F)))
+        nu = (a.sum() - (1 - w.sum())) / b.sum()
+        w[F] = a - nu * b
+        g = Q @ w - q + nu   # gradiente del lagrangiano
+
+        nuevo_lo = (libre & (w < lo - 1e-12)) | (en_lo & (g >= 0))
+        nuevo_hi = (libre & (w > hi + 1e-12)) | (en_hi & (g <= 0))
+        if np.array_equal(nuevo_lo, en_lo) and np.array_equal(nuevo_hi, en_hi):
+            return w
+        en_lo, en_hi = nuevo_lo, nuevo_hi & ~nuevo_lo
+    return None
+
+
+class OptimizadorRiesgo:
+
+    def __init__(self, tickers, rendimientos=None, minimos=None, maximos=None, anualizar=DIAS_ANIO, periodo="2y"):
+        """
+        rendimientos: DataFrame o matriz T x n de rendimientos diarios; si es None se calculan del
+        historial cacheado de los últimos `periodo` (Portafolio_Datos).
+        minimos / maximos: porcentajes por activo, como porcentaje_min / porcentaje_max del script.
+        """
+        self.tickers = list(tickers)
+        n = len(self.tickers)
+        if rendimientos is None:
+            from Portafolio_Datos import historial_precios, rendimientos as rendimientos_diarios
+            rendimientos = rendimientos_diarios(historial_precios(self.tickers, periodo))
+        if isinstance(rendimientos, pd.DataFrame):
+            rendimientos = rendimientos[self.tickers]
+        self.R = np.asarray(rendimientos, dtype=float)
+        self.anualizar = anualizar
+        self.mu = self.R.mean(axis=0) * anualizar
+        cov, self.contraccion = ledoit_wolf(self.R)
+        self.cov = cov * anualizar
+        self.lo = np.zeros(n) if minimos is None else np.asarray(minimos, dtype=float) / 100
+        self.hi = np.ones(n) if maximos is None else np.asarray(maximos, dtype=float) / 100
+        if self.lo.sum() > 1 or self.hi.sum() < 1:
+            raise ValueError("Las bandas no admiten una cartera que sume 100%")
+        # Mayor autovalor de cov (iteración de potencia) para el paso del gradiente
+        v = np.ones(n) / np.sqrt(n)
+        for _ in range(100):
+            v = self.cov @ v
+            v /= np.linalg.norm(v)
+        self.lmax = float(v @ self.cov @ v) * 1.01
+
+    # ---------- Media-varianza ----------
+    def media_varianza(self, gamma, w0=None):
+        """argmax mu'w - gamma/2 w'Σw. gamma=inf equivale a mínima varianza."""
+        mu = np.zeros_like(self.mu) if np.isinf(gamma) else self.mu / gamma
+        w = qp_caja(self.cov, mu, self.lo, self.hi, w0)
+        return w if w is not None else self._fista(mu, w0)
+
+    def _fista(self, mu, w0=None, tol=1e-10, max_iter=20000):
+        paso = 1.0 / self.lmax
+        w = proyectar(np.full(len(mu), 1 / len(mu)) if w0 is None else w0, self.lo, self.hi)
+        y, t = w.copy(), 1.0
+        for _ in range(max_iter):
+            # gradiente de 1/2 w'Σw - mu'w / gamma
+            w_nuevo = proyectar(y - paso * (self.cov @ y - mu), self.lo, self.hi)
+            if (y - w_nuevo) @ (w_nuevo - w) > 0:
+                t = 1.0  # reinicio adaptativo
+            t_nuevo = (1 + np.sqrt(1 + 4 * t * t)) / 2
+            y = w_nuevo + (t - 1) / t_nuevo * (w_nuevo - w)
+            if np.max(np.abs(w_nuevo - w)) < tol:
+                w = w_nuevo
+                break
+            w, t = w_nuevo, t_nuevo
+        return w
+
+    def minima_varianza(self, w0=None):
+        return self._serie(self.media_varianza(np.inf, w0))
+
+    def metricas(self, w, tasa_libre=0.0):
+        retorno = float(self.mu @ w)
+        volatilidad = float(np.sqrt(w @ self.cov @ w))
+        return retorno, volatilidad, (retorno - tasa_libre) / volatilidad if volatilidad > 0 else np.nan
+
+    def frontera(self, n_puntos=50, gamma_min=0.1, gamma_max=1e6):
+        """N carteras eficientes, de mínima varianza a máximo retorno, con warm start en cadena."""
+        gammas = np.geomspace(gamma_max, gamma_min, n_puntos)
+        filas, pesos, w = [], [], None
+        for gamma in gammas:
+            w = self.media_varianza(gamma, w)
+            retorno, volatilidad, sharpe = self.metricas(w)
+            filas.append({"gamma": gamma, "retorno": retorno, "volatilidad": volatilidad, "sharpe": sharpe})
+            pesos.append(w)
+        return pd.DataFrame(filas), pd.DataFrame(pesos, columns=self.tickers)
+
+    def max_sharpe(self, tasa_libre=0.0, gamma_min=0.1, gamma_max=1e6, iteraciones=30):
+        """Sección áurea sobre log(gamma), reutilizando la última solución como punto de partida."""
+        a, b = np.log(gamma_min), np.log(gamma_max)
+        phi = (np.sqrt(5) - 1) / 2
+        w = None
+
+        def sharpe(lg):
+            nonlocal w
+            w = self.media_varianza(np.exp(lg), w)
+            return self.metricas(w, tasa_libre)[2], w
+
+        c, d = b - phi * (b - a), a + phi * (b - a)
+        (fc, wc), (fd, wd) = sharpe(c), sharpe(d)
+        for _ in range(iteraciones):
+            if fc > fd:
+                b, d, fd, wd = d, c, fc, wc
+                c = b - phi * (b - a)
+                fc, wc = sharpe(c)
+            else:
+                a, c, fc, wc = c, d, fd, wd
+                d = a + phi * (b - a)
+                fd, wd = sharpe(d)
+        return self._serie(wc if fc > fd else wd)
+
+    # ---------- CVaR ----------
+    def min_cvar(self, beta=0.95, retorno_min=None):
+        return self._serie(_resolver_cvar(self.R, self.lo, self.hi, beta, retorno_min, self.mu))
+
+    def frontera_cvar(self, n_puntos=20, beta=0.95, workers=None):
+        """Mínimo CVaR para N retornos objetivo entre el de mínimo CVaR y el máximo alcanzable, en paralelo."""
+        base = _resolver_cvar(self.R, self.lo, self.hi, beta, None, self.mu)
+        objetivos = np.linspace(self.mu @ base, self._max_retorno(), n_puntos)
+        args = [(self.R, self.lo, self.hi, beta, r, self.mu) for r in objetivos]
+        with ProcessPoolExecutor(workers) as pool:
+            pesos = list(pool.map(_resolver_cvar_args, args))
+        filas = [{"retorno_objetivo": r, "retorno": self.mu @ w, "cvar": cvar(self.R, w, beta)}
+                 for r, w in zip(objetivos, pesos)]
+        return pd.DataFrame(filas), pd.DataFrame(pesos, columns=self.tickers)
+
+    def _max_retorno(self):
+        # Greedy exacto para un LP de caja con suma 1: llenar primero los de mayor mu
+        w = self.lo.copy()
+        resto = 1 - w.sum()
+        for i in np.argsort(-self.mu):
+            extra = min(self.hi[i] - w[i], resto)
+            w[i] += extra
+            resto -= extra
+        return float(self.mu @ w)
+
+    def _serie(self, w):
+        return pd.Series(w, index=self.tickers)
+
+
+def cvar(R, w, beta=0.95):
+    """CVaR histórico (pérdida media en la cola 1 - beta) de la cartera w, diario."""
+    perdidas = -np.asarray(R) @ w
+    var = np.quantile(perdidas, beta)
+    return float(perdidas[perdidas >= var].mean())
+
+
+def _resolver_cvar(R, lo, hi, beta, retorno_min, mu):
+    """
+    min alpha + 1 / ((1 - beta) S) * sum(u)
+    s.a. u_s >= -r_s'w - alpha, u >= 0, sum(w) = 1, lo <= w <= hi, [mu'w >= retorno_min]
+    Variables: [w (n), alpha, u (S)].
+    """
+    S, n = R.shape
+    c = np.concatenate([np.zeros(n), [1.0], np.full(S, 1 / ((1 - beta) * S))])
+    # -R w - alpha - u <= 0
+    A_ub = sparse.hstack([sparse.csr_matrix(-R), -np.ones((S, 1)), -sparse.identity(S)], format="csr")
+    b_ub = np.zeros(S)
+    if retorno_min is not None:
+        fila = sparse.csr_matrix(np.concatenate([-mu, np.zeros(1 + S)]).reshape(1, -1))
+        A_ub = sparse.vstack([A_ub, fila], format="csr")
+        b_ub = np.append(b_ub, -retorno_min)
+    A_eq = sparse.csr_matrix(np.concatenate([np.ones(n), np.zeros(1 + S)]).reshape(1, -1))
+    bounds = list(zip(lo, hi)) + [(None, None)] + [(0, None)] * S
+    res = linprog(c, A_ub=A_ub, b_ub=b_ub, A_eq=A_eq, b_eq=[1.0], bounds=bounds, method="highs")
+    if not res.success:
+        raise RuntimeError(f"CVaR: {res.message}")
+    return res.x[:n]
+
+
+def _resolver_cvar_args(args):
+    return _resolver_cvar(*args)
+
+
+def a_cantidades(pesos, precios, presupuesto):
+    """Pesos -> cantidad de cada activo, en las mismas unidades que resolver_lp."""
+    return np.asarray(pesos) * presupuesto / np.asarray(precios, dtype=float)
+
+
+if __name__ == "__main__":
+    import time
+
+    # Datos sintéticos con estructura de factores: 1.000 activos, 2 años diarios
+    rng = np.random.default_rng(0)
+    n, T, k = 1000, 504, 5
+    cargas = rng.normal(0, 1, (n, k))
+    factores = rng.normal(0, 0.01, (T, k))
+    R = factores @ cargas.T * 0.5 + rng.normal(0, 0.015, (T, n)) + rng.normal(0.0003, 0.0006, n)
+    tickers = [f"A{i}" for i in range(n)]
+
+    inicio = time.perf_counter()
+    opt = OptimizadorRiesgo(tickers, R, minimos=np.zeros(n), maximos=np.full(n, 5.0))
+    print(f"Covarianza Ledoit-Wolf (contracción {opt.contraccion:.3f}): {time.perf_counter() - inicio:.2f}s")
+
+    inicio = time.perf_counter()
+    puntos, _ = opt.frontera(50)
+    print(f"Frontera media-varianza de 50 puntos, {n} activos: {time.perf_counter() - inicio:.2f}s")
+    print(puntos.iloc[::10].round(4).to_string(index=False))
+
+    inicio = time.perf_counter()
+    w = opt.max_sharpe()
+    print(f"Máximo Sharpe {opt.metricas(w.values)[2]:.3f} "
+          f"(mejor punto de la frontera {puntos['sharpe'].max():.3f}): {time.perf_counter() - inicio:.2f}s")
+
+    inicio = time.perf_counter()
+    w = opt.min_cvar(0.95)
+    print(f"Mínimo CVaR 95%: {cvar(R, w.values):.4f} diario, {time.perf_counter() - inicio:.2f}s")
+
+    # Desde el historial cacheado (Portafolio_Datos), sin red: se siembra la caché con cierres sintéticos
+    import os, tempfile
+    from Portafolio_Datos import CACHE_DIR, _ruta_cache, rendimientos
+    os.chdir(tempfile.mkdtemp())
+    chicos = tickers[:20]
+    cierres = pd.DataFrame(100 * np.cumprod(1 + R[:, :20], axis=0), columns=chicos,
+                           index=pd.bdate_range(end="2024-12-31", periods=T))
+    os.makedirs(CACHE_DIR)
+    cierres.to_pickle(_ruta_cache(chicos, "2y", "1d", CACHE_DIR))
+    opt = OptimizadorRiesgo(chicos, minimos=np.zeros(20), maximos=np.full(20, 20.0))
+    esperado = OptimizadorRiesgo(chicos, rendimientos(cierres), minimos=np.zeros(20), maximos=np.full(20, 20.0))
+    if not (np.allclose(opt.cov, esperado.cov) and len(opt.R) == T - 1):
+        raise AssertionError("El historial cacheado no da los mismos rendimientos")
+    print(f"Desde la caché de precios: {len(chicos)} activos, {len(opt.R)} días, "
+          f"mínima varianza {opt.metricas(opt.minima_varianza().values)[1]:.4f} anual")
@@ -0,0 +1,240 @@
+import pandas as pd
+import hashlib, sqlite3
+
+
+"""
+Almacén local (SQLite) de titulares y puntajes para el análisis de sentimiento.
+
+- articulos: un registro por (hash de URL/título, keyword).
+- keywords: por keyword, el tramo ya bajado completo: desde inicio_cubierto
+  hasta el último publishedAt. La próxima corrida pide a NewsAPI sólo desde
+  ahí en adelante, salvo que la ventana empiece antes del tramo (por
+  ejemplo, si se agrandó DIAS_RETROCESO): entonces pide la ventana entera.
+- puntajes: puntaje VADER por hash de título, así un titular nunca se
+  puntúa dos veces.
+
+Con esto, re-correr una ventana de 30 días cuesta sólo los artículos nuevos.
+"""
+
+RUTA_DB = "sentimiento.sqlite"
+
+
+def hash_texto(texto):
+    return hashlib.sha1(texto.encode("utf-8")).hexdigest()
+
+
+def id_articulo(art):
+    return hash_texto(art.get("url") or art.get("title") or "")
+
+
+class AlmacenArticulos:
+
+    def __init__(self, ruta=RUTA_DB):
+        self.con = sqlite3.connect(ruta)
+        self.con.execute("PRAGMA journal_mode=WAL")
+        self.con.executescript("""
+            CREATE TABLE IF NOT EXISTS articulos (
+                id TEXT, keyword TEXT, title TEXT, media TEXT, url TEXT, publishedAt TEXT,
+                PRIMARY KEY (id, keyword)
+            );
+            CREATE INDEX IF NOT EXISTS idx_articulos_kw_fecha ON articulos (keyword, publishedAt);
+            CREATE TABLE IF NOT EXISTS keywords (
+                keyword TEXT PRIMARY KEY, ultimo_publicado TEXT, inicio_cubierto TEXT
+            );
+            CREATE TABLE IF NOT EXISTS puntajes (
+                hash TEXT PRIMARY KEY, puntaje REAL
+            );
+        """)
+        # Bases creadas antes de inicio_cubierto: NULL = tramo desconocido, se vuelve a pedir la ventana
+        columnas = {fila[1] for fila in self.con.execute("PRAGMA table_info(keywords)")}
+        if "inicio_cubierto" not in columnas:
+            self.con.execute("ALTER TABLE keywords ADD COLUMN inicio_cubierto TEXT")
+
+    # ---------- Artículos ----------
+    def _tramos(self, keywords):
+        """{keyword: (inicio_cubierto, ultimo_publicado sin la Z)} de las keywords con marca."""
+        filas = self.con.execute(
+            f"""SELECT keyword, inicio_cubierto, ultimo_publicado FROM keywords
+                WHERE keyword IN ({','.join('?' * len(keywords))}) AND ultimo_publicado IS NOT NULL""",
+            list(keywords),
+        )
+        return {kw: (inicio, ultimo.rstrip("Z")) for kw, inicio, ultimo in filas}
+
+    def desde_por_keyword(self, keywords, fecha_inicio):
+        """
+        Para cada keyword, desde dónde pedir: el último publishedAt guardado si la ventana empieza
+        dentro del tramo cubierto; fecha_inicio si empieza antes, si no hay marca o si la marca es
+        anterior al inicio de la ventana.
+        """
+        tramos = self._tramos(keywords)
+        inicio = str(fecha_inicio)
+        desde = {}
+        for kw in keywords:
+            cubierto, ultimo = tramos.get(kw, (None, None))
+            desde[kw] = inicio if cubierto is None or inicio < cubierto else max(inicio, ultimo)
+        return desde
+
+    def guardar(self, articulos, completas=(), desde=None):
+        """
+        Inserta artículos nuevos (los repetidos se ignoran). Devuelve cuántos eran nuevos.
+        La marca de agua (último publishedAt) avanza sólo para las keywords de `completas`: si una
+        keyword quedó con páginas fallidas o cortadas, avanzarla saltearía para siempre lo que faltó.
+        desde: {keyword: fecha desde la que se pidió}; con él se extiende el tramo cubierto.
+        """
+        filas = [
+            (id_articulo(a), a["keyword"], a.get("title"), (a.get("source") or {}).get("name", ""),
+             a.get("url"), a.get("publishedAt"))
+            for a in articulos if a.get("title") and a.get("publishedAt")
+        ]
+        with self.con:
+            antes = self.con.total_changes
+            self.con.executemany("INSERT OR IGNORE INTO articulos VALUES (?, ?, ?, ?, ?, ?)", filas)
+            nuevos = self.con.total_changes - antes
+            completas = list(completas)   # se lee recién acá: el generador de artículos ya terminó
+            if completas:
+                tramos = self._tramos(completas)
+                ultimos = dict(self.con.execute(
+                    f"""SELECT keyword, MAX(publishedAt) FROM articulos
+                        WHERE keyword IN ({','.join('?' * len(completas))}) GROUP BY keyword""",
+                    completas,
+                ))
+                filas = []
+                for kw in completas:
+                    if not ultimos.get(kw):
+                        continue
+                    cubierto, ultimo = tramos.get(kw, (None, None))
+                    pedido = (desde or {}).get(kw)
+                    # El tramo sigue siendo contiguo si se pidió desde dentro de él; si no, empieza en lo pedido
+                    if cubierto is not None and pedido is not None and cubierto <= pedido <= ultimo:
+                        pedido = cubierto
+                    filas.append((kw, ultimos[kw], None if pedido is None else str(pedido)))
+                self.con.executemany("""
+                    INSERT INTO keywords (keyword, ultimo_publicado, inicio_cubierto) VALUES (?, ?, ?)
+                    ON CONFLICT(keyword) DO UPDATE SET ultimo_publicado = excluded.ultimo_publicado,
+                                                       inicio_cubierto = excluded.inicio_cubierto
+                """, filas)
+        return nuevos
+
+    def cargar(self, keywords, desde, hasta):
+        """DataFrame con title, media, publishedAt, keyword entre dos fechas (inclusive)."""
+        return pd.read_sql_query(
+            f"""SELECT title, media, publishedAt, keyword FROM articulos
+                WHERE keyword IN ({','.join('?' * len(keywords))})
+                  AND publishedAt >= ? AND substr(publishedAt, 1, 10) <= ?
+                ORDER BY publishedAt DESC""",
+            self.con, params=[*keywords, str(desde), str(hasta)],
+        )
+
+    # ---------- Puntajes ----------
+    def puntajes(self, titulos):
+        """{titulo: puntaje} para los títulos que ya tienen puntaje guardado."""
+        hashes = {hash_texto(t): t for t in titulos}
+        encontrados = {}
+        claves = list(hashes)
+        for i in range(0, len(claves), 900):  # límite de parámetros de SQLite
+            lote = claves[i:i + 900]
+            for h, p in self.con.execute(
+                f"SELECT hash, puntaje FROM puntajes WHERE hash IN ({','.join('?' * len(lote))})", lote
+            ):
+                encontrados[hashes[h]] = p
+        return encontrados
+
+    def guardar_puntajes(self, puntajes):
+        with self.con:
+            self.con.executemany(
+                "INSERT OR REPLACE INTO puntajes VALUES (?, ?)",
+                [(hash_texto(t), p) for t, p in puntajes.items() if p is not None],
+            )
+
+    def cerrar(self):
+        self.con.close()
+
+
+def actualizar(almacen, fetcher, keywords, fecha_inicio, fecha_fin, idioma="en"):
+    """
+    Baja sólo lo publicado después de lo ya guardado para cada keyword. Devuelve los artículos nuevos.
+    Las keywords con alguna página fallida o cortada por max_paginas no avanzan su marca de agua:
+    la próxima corrida las vuelve a pedir desde la marca anterior.
+    """
+    desde = almacen.desde_por_keyword(keywords, fecha_inicio)
+    completas = set()
+    articulos = fetcher.iterar_articulos(keywords, fecha_inicio, fecha_fin, idioma, desde, completas)
+    return almacen.guardar(articulos, completas, desde)
+
+
+def puntuar_con_cache(almacen, titulos, funcion_lote):
+    """
+    Puntajes para `titulos`, calculando sólo los que no están en el almacén.
+    funcion_lote recibe la lista de títulos faltantes y devuelve sus puntajes en orden.
+    """
+    unicos = list(dict.fromkeys(titulos))
+    puntajes = almacen.puntajes(unicos)
+    faltan = [t for t in unicos if t not in puntajes]
+    nuevos = dict(zip(faltan, funcion_lote(faltan))) if faltan else {}
+    almacen.guardar_puntajes(nuevos)
+    puntajes.update(nuevos)
+    return [puntajes.get(t) for t in titulos], len(faltan)
+
+
+if __name__ == "__main__":
+    # Benchmark contra el servidor mock: ventana de 30 días, primera corrida
+    # en frío y después una corrida por día nuevo.
+    from Sentimiento_Mock import ServidorMockNewsAPI
+    from Sentimiento_Fetch import FetcherNewsAPI
+    from Sentimiento_Scoring import PuntuadorVADER
+    from datetime import date, timedelta
+    import os, tempfile, time
+
+    puntuar = PuntuadorVADER(workers=1).puntuar
+
+    keywords = [f"TICKER{i} stock" for i in range(10)]
+    dias = 30
+    hoy = date.today()
+    servidor = ServidorMockNewsAPI(por_dia=30, latencia=0.02, hoy=hoy).iniciar()
+    ruta = os.path.join(tempfile.mkdtemp(), "bench.sqlite")
+
+    def corrida(fin):
+        almacen = AlmacenArticulos(ruta)
+        fetcher = FetcherNewsAPI("demo", url=servidor.url, por_segundo=500, max_paginas=20)
+        pedidos = servidor.pedidos
+        inicio = time.perf_counter()
+        nuevos = actualizar(almacen, fetcher, keywords, fin - timedelta(days=dias), fin)
+        df = almacen.cargar(keywords, fin - timedelta(days=dias), fin)
+        _, puntuados = puntuar_con_cache(almacen, df["title"].tolist(), puntuar)
+        dt = time.perf_counter() - inicio
+        fetcher.cerrar()
+        almacen.cerrar()
+        return dt, servidor.pedidos - pedidos, nuevos, puntuados, len(df)
+
+    print(f"{'corrida':<10}{'tiempo':>8}{'pedidos':>9}{'nuevos':>8}{'puntuados':>11}{'en ventana':>12}")
+    for n, fin in enumerate([hoy, hoy + timedelta(days=1), hoy + timedelta(days=2)]):
+        dt, pedidos, nuevos, puntuados, total = corrida(fin)
+        print(f"{'fría' if n == 0 else f'día +{n}':<10}{dt:>7.2f}s{pedidos:>9}{nuevos:>8}{puntuados:>11}{total:>12}")
+
+    # Una corrida cortada por max_paginas no avanza las marcas de agua
+    almacen = AlmacenArticulos(os.path.join(tempfile.mkdtemp(), "cortada.sqlite"))
+    fetcher = FetcherNewsAPI("demo", url=servidor.url, por_segundo=500, max_paginas=1)
+    inicio_ventana = hoy - timedelta(days=dias)
+    actualizar(almacen, fetcher, keywords, inicio_ventana, hoy)
+    assert almacen.desde_por_keyword(keywords, inicio_ventana) == {kw: str(inicio_ventana) for kw in keywords}
+    fetcher.max_paginas = 20
+    actualizar(almacen, fetcher, keywords, inicio_ventana, hoy)
+    assert all(d > str(inicio_ventana) for d in almacen.desde_por_keyword(keywords, inicio_ventana).values())
+    fetcher.cerrar()
+    almacen.cerrar()
+    print("Corrida cortada en 1 página: marcas de agua sin avanzar; completa: avanzan")
+
+    # Ventana agrandada hacia atrás (45 días en lugar de 30): se piden también los días viejos
+    almacen = AlmacenArticulos(ruta)
+    fetcher = FetcherNewsAPI("demo", url=servidor.url, por_segundo=500, max_paginas=20)
+    fin = hoy + timedelta(days=2)
+    ancha = fin - timedelta(days=45)
+    assert almacen.desde_por_keyword(keywords, ancha) == {kw: str(ancha) for kw in keywords}
+    viejos = actualizar(almacen, fetcher, keywords, ancha, fin)
+    assert viejos > 0 and len(almacen.cargar(keywords, ancha, fin)) > total
+    assert all(d > str(fin - timedelta(days=1)) for d in almacen.desde_por_keyword(keywords, ancha).values())
+    fetcher.cerrar()
+    almacen.cerrar()
+    print(f"Ventana agrandada a 45 días: {viejos} artículos viejos bajados, después sólo lo nuevo")
+
+    servidor.detener()
@@ -0,0 +1,189 @@
+import numpy as np
+import pandas as pd
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+import re
+
+
+"""
+Colapso de titulares casi duplicados con MinHash + LSH.
+
+drop_duplicates(subset="title") sólo saca copias exactas; la misma nota
+sindicada con cambios menores ("Alphabet shares rise..." / "Alphabet stock
+rises...") se contaba varias veces. Acá:
+
+1. Cada título se normaliza y se parte en shingles de k caracteres
+   (k=4: cada shingle son 4 bytes empaquetados en un uint32, sin hashing).
+2. Las firmas MinHash se calculan por lotes con numpy (minimum.reduceat).
+3. LSH por bandas: títulos que coinciden en alguna banda son candidatos;
+   dentro de cada cubeta se prueban todos los pares y se confirma el par si
+   la similitud estimada supera el umbral (así un título parecido a
+   cualquier miembro de la cubeta, no sólo al primero, entra en el cluster).
+4. Componentes conexas = clusters. Se conserva el primer título de cada
+   cluster (como drop_duplicates) y su tamaño.
+
+Todo es O(n) en la cantidad de títulos más los pares dentro de cada cubeta:
+no hay comparación de todos contra todos.
+"""
+
+_NO_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def normalizar(titulo, k=4):
+    texto = _NO_ALNUM.sub(" ", str(titulo).lower()).strip()
+    return texto.ljust(k)
+
+
+def parametros_lsh(num_perm, umbral):
+    """(bandas, filas) con bandas * filas <= num_perm cuyo umbral (1/b)^(1/r) queda más cerca del pedido."""
+    opciones = [(b, num_perm // b) for b in range(1, num_perm + 1) if num_perm // b >= 1]
+    return min(opciones, key=lambda br: abs((1 / br[0]) ** (1 / br[1]) - umbral))
+
+
+def shingles(textos, k=4):
+    """
+    Shingles de k bytes (k <= 4) de todos los textos, empaquetados en uint32.
+    Devuelve (valores, inicios): los shingles del texto i son valores[inicios[i]:inicios[i+1]].
+    """
+    codificados = [t.encode("utf-8") for t in textos]
+    largos = np.fromiter((len(c) for c in codificados), dtype=np.int64, count=len(codificados))
+    buf = np.frombuffer(b"".join(codificados), dtype=np.uint8).astype(np.uint32)
+
+    n_sh = largos - k + 1
+    valido = np.ones(len(buf) - k + 1, dtype=bool)
+    # Un shingle no puede cruzar el final de un texto
+    fin = np.cumsum(largos)
+    for j in range(1, k):
+        corte = fin - j
+        valido[corte[corte < len(valido)]] = False
+
+    valores = np.zeros(len(valido), dtype=np.uint32)
+    for j in range(k):
+        valores |= buf[j:j + len(valido)] << np.uint32(8 * j)
+    inicios = np.concatenate([[0], np.cumsum(n_sh)])
+    return valores[valido], inicios
+
+
+def firmas_minhash(textos, num_perm=64, k=4, seed=0, max_elementos=1 << 24):
+    """
+    Matriz (n_textos x num_perm) de firmas MinHash.
+    Se procesa por lotes de a lo sumo max_elementos valores (shingles x num_perm).
+    """
+    # Hash multiply-shift: h(x) = (a*x + b) >> 32 con aritmética uint64 que desborda
+    rng = np.random.default_rng(seed)
+    a = rng.integers(0, 1 << 63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+    b = rng.integers(0, 1 << 63, size=num_perm, dtype=np.uint64)
+
+    acumulado = np.cumsum([len(t) - k + 1 for t in textos])
+    firmas = np.empty((len(textos), num_perm), dtype=np.uint32)
+    i = 0
+    while i < len(textos):
+        base = acumulado[i - 1] if i else 0
+        j = max(i + 1, int(np.searchsorted(acumulado, base + max_elementos // num_perm, side="right")))
+        valores, inicios = shingles(textos[i:j], k)
+        h = ((a[:, None] * valores.astype(np.uint64) + b[:, None]) >> np.uint64(32)).astype(np.uint32)
+        firmas[i:j] = np.minimum.reduceat(h, inicios[:-1], axis=1).T
+        i = j
+    return firmas
+
+
+def clusters_casi_duplicados(titulos, umbral=0.5, num_perm=64, k=4, seed=0):
+    """Etiqueta de cluster por título (mismos números = casi duplicados)."""
+    textos = [normalizar(t, k) for t in titulos]
+    n = len(textos)
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+    firmas = firmas_minhash(textos, num_perm, k, seed)
+    bandas, filas = parametros_lsh(num_perm, umbral)
+    # Firmas idénticas van juntas sin comparar: el LSH corre sobre las firmas distintas
+    vista = firmas.view(np.dtype((np.void, firmas.dtype.itemsize * num_perm))).ravel()
+    _, unicas, copia_de = np.unique(vista, return_index=True, return_inverse=True)
+    copia_de = copia_de.ravel()
+    firmas = firmas[unicas]
+    m = len(firmas)
+
+    origen, destino = [], []
+    for banda in range(bandas):
+        bloque = np.ascontiguousarray(firmas[:, banda * filas:(banda + 1) * filas])
+        claves = bloque.view(np.dtype((np.void, bloque.dtype.itemsize * filas))).ravel()
+        _, cubeta, tamanos = np.unique(claves, return_inverse=True, return_counts=True)
+        cubeta = cubeta.ravel()
+        # Títulos ordenados por cubeta: los pares de una cubeta son (p, p + d) con d < lo que queda de ella
+        orden = np.argsort(cubeta, kind="stable")
+        inicio_cubeta = np.concatenate([[0], np.cumsum(tamanos)[:-1]])[cubeta[orden]]
+        restantes = inicio_cubeta + tamanos[cubeta[orden]] - 1 - np.arange(m)
+        activos = np.flatnonzero(restantes >= 1)
+        d = 1
+        while len(activos):
+            a, b = orden[activos], orden[activos + d]
+            # Confirmación: similitud de Jaccard estimada por la firma
+            ok = (firmas[a] == firmas[b]).mean(axis=1) >= umbral
+            origen.append(a[ok])
+            destino.append(b[ok])
+            d += 1
+            activos = activos[restantes[activos] >= d]
+
+    origen = np.concatenate(origen) if origen else np.empty(0, dtype=np.int64)
+    destino = np.concatenate(destino) if destino else np.empty(0, dtype=np.int64)
+
+    grafo = coo_matrix((np.ones(len(origen), dtype=np.int8), (origen, destino)), shape=(m, m))
+    _, etiquetas = connected_components(grafo, directed=False)
+    # Etiquetas en orden de primera aparición, como antes de agrupar las firmas idénticas
+    etiquetas = etiquetas[copia_de]
+    _, primera, etiquetas = np.unique(etiquetas, return_index=True, return_inverse=True)
+    return np.argsort(np.argsort(primera))[etiquetas.ravel()]
+
+
+def colapsar_casi_duplicados(df, columna="title", umbral=0.5, num_perm=64, k=4, seed=0):
+    """Un representante (el primero) por cluster de casi duplicados, con la columna tamano_cluster."""
+    etiquetas = clusters_casi_duplicados(df[columna].tolist(), umbral, num_perm, k, seed)
+    tamanos = np.bincount(etiquetas)
+    primeros = ~pd.Series(etiquetas).duplicated().to_numpy()
+    salida = df[primeros].copy()
+    salida["tamano_cluster"] = tamanos[etiquetas[primeros]]
+    return salida.reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    # Escalamiento: titulares sintéticos con variantes sindicadas
+    from Sentimiento_Mock import PALABRAS
+    import random, time
+
+    ejemplo = pd.DataFrame({"title": [
+        "Alphabet shares rise after strong earnings beat",
+        "Alphabet stock rises after strong earnings beat",
+        "Alphabet shares rise after strong earnings beat - Reuters",
+        "Tesla recalls 2 million vehicles over autopilot",
+    ]})
+    print(colapsar_casi_duplicados(ejemplo), "\n")
+
+    # El segundo no llega al umbral contra el primero (0.45), pero sí contra el tercero (0.53)
+    cadena = [
+        "Alphabet stock rises after earnings beat",
+        "Alphabet shares rise after strong earnings beat",
+        "Alphabet stock rises after strong earnings",
+    ]
+    assert clusters_casi_duplicados(cadena).tolist() == [0, 0, 0]
+
+    rnd = random.Random(0)
+    letras = "abcdefghijklmnopqrstuvwxyz"
+    vocabulario = PALABRAS + ["".join(rnd.choice(letras) for _ in range(rnd.randint(3, 9))) for _ in range(5000)]
+    variantes = [("shares", "stock"), ("rise", "rises"), ("beat", "beats"), ("", " - Reuters")]
+
+    def sintéticos(n):
+        # ~n/3 notas distintas, cada una repetida con ediciones menores
+        base = [" ".join(rnd.choice(vocabulario) for _ in range(8)) for _ in range(n // 3)]
+        salida = []
+        for _ in range(n):
+            t = rnd.choice(base)
+            viejo, nuevo = rnd.choice(variantes)
+            salida.append(t.replace(viejo, nuevo, 1) if viejo else t + nuevo)
+        return salida
+
+    for n in (10_000, 50_000, 100_000, 500_000):
+        titulos = sintéticos(n)
+        inicio = time.perf_counter()
+        etiquetas = clusters_casi_duplicados(titulos)
+        dt = time.perf_counter() - inicio
+        print(f"n={n:>7}  {dt:6.2f}s  {dt / n * 1e6:6.1f} µs/título  "
+              f"clusters={etiquetas.max() + 1} (notas distintas: {n // 3})")
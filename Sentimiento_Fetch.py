@@ -0,0 +1,210 @@
+import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import json, os, threading, time
+
+
+"""
+Extracción concurrente de titulares desde NewsAPI.
+
+Cada pedido (keyword x página) se lanza en un pool de hilos sobre una sola
+requests.Session con conexiones keep-alive reutilizables. Un limitador de
+tasa compartido respeta el máximo de pedidos por segundo, los 429/5xx se
+reintentan con backoff exponencial y los artículos se entregan a medida
+que llegan las páginas (iterar_articulos es un generador).
+
+La API key se toma de la variable de entorno NEWSAPI_KEY o de config.json
+({"newsapi_key": "..."}), nunca del código.
+"""
+
+URL_NEWSAPI = "https://newsapi.org/v2/everything"
+CONFIG_PATH = "config.json"
+PAGE_SIZE = 100
+REINTENTABLES = {429, 500, 502, 503, 504}
+MAX_RETRY_AFTER = 60    # segundos: tope de la espera que pide el servidor
+
+
+def cargar_api_key(ruta=CONFIG_PATH):
+    key = os.environ.get("NEWSAPI_KEY")
+    if key:
+        return key
+    if os.path.exists(ruta):
+        with open(ruta, encoding="utf-8") as f:
+            key = json.load(f).get("newsapi_key")
+        if key:
+            return key
+    raise RuntimeError(f"Falta la API key de NewsAPI: definí NEWSAPI_KEY o 'newsapi_key' en {ruta}")
+
+
+class LimitadorTasa:
+    """Token bucket compartido entre hilos: como mucho `por_segundo` pedidos por segundo."""
+
+    def __init__(self, por_segundo, rafaga=1):
+        self.intervalo = 1.0 / por_segundo
+        self.capacidad = rafaga
+        self.tokens = rafaga
+        self.ultimo = time.monotonic()
+        self.lock = threading.Lock()
+
+    def esperar(self):
+        while True:
+            with self.lock:
+                ahora = time.monotonic()
+                self.tokens = min(self.capacidad, self.tokens + (ahora - self.ultimo) / self.intervalo)
+                self.ultimo = ahora
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                falta = (1 - self.tokens) * self.intervalo
+            time.sleep(falta)
+
+
+class FetcherNewsAPI:
+
+    def __init__(self, api_key, url=URL_NEWSAPI, max_workers=8, por_segundo=5.0,
+                 reintentos=4, backoff=0.5, max_paginas=1, page_size=PAGE_SIZE, timeout=15):
+        self.api_key = api_key
+        self.url = url
+        self.max_workers = max_workers
+        self.limitador = LimitadorTasa(por_segundo, rafaga=max_workers)
+        self.reintentos = reintentos
+        self.backoff = backoff
+        self.max_paginas = max_paginas
+        self.page_size = page_size
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _pedir(self, params):
+        """GET con límite de tasa y reintentos. Devuelve el JSON de la respuesta."""
+        for intento in range(self.reintentos + 1):
+            self.limitador.esperar()
+            try:
+                resp = self.session.get(self.url, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if intento == self.reintentos:
+                    raise
+            else:
+                if resp.status_code not in REINTENTABLES or intento == self.reintentos:
+                    try:
+                        return resp.json()
+                    except ValueError:
+                        return {"status": "error", "message": f"HTTP {resp.status_code}"}
+                espera = resp.headers.get("Retry-After")
+                if espera is not None and espera.isdigit():
+                    time.sleep(min(int(espera), MAX_RETRY_AFTER))
+                    continue
+            time.sleep(self.backoff * 2 ** intento)
+
+    def _pagina(self, kw, pagina, desde, hasta, idioma):
+        params = {
+            "q": kw,
+            "from": desde,
+            "to": hasta,
+            "language": idioma,
+            "sortBy": "publishedAt",
+            "pageSize": self.page_size,
+            "page": pagina,
+            "apiKey": self.api_key,
+        }
+        data = self._pedir(params)
+        if data.get("status") != "ok":
+            return kw, pagina, None, data.get("message")
+        articulos = data.get("articles", [])
+        for art in articulos:
+            art["keyword"] = kw
+        return kw, pagina, articulos, data.get("totalResults", 0)
+
+    def iterar_paginas(self, keywords, desde, hasta, idioma="en", desde_por_kw=None, completas=None):
+        """
+        Genera (keyword, pagina, articulos, total_o_error) a medida que llegan.
+
+        Primero se piden las páginas 1 de todas las keywords en paralelo; cuando
+        una vuelve, se encolan sus páginas siguientes según totalResults.
+        desde_por_kw permite pedir cada keyword desde una fecha (u hora ISO) propia.
+        Si se pasa el set `completas`, se le agregan las keywords cuyas páginas
+        llegaron todas sin error y sin cortar en max_paginas.
+        """
+        hasta = str(hasta)
+        desde_por_kw = {kw: str((desde_por_kw or {}).get(kw, desde)) for kw in keywords}
+        faltan = {}          # keyword -> páginas encoladas que todavía no volvieron
+        incompletas = set()  # alguna página falló o totalResults no entraba en max_paginas
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            pedidos = {pool.submit(self._pagina, kw, 1, desde_por_kw[kw], hasta, idioma): (kw, 1) for kw in keywords}
+            pendientes = set(pedidos)
+            while pendientes:
+                listo = next(as_completed(pendientes))
+                pendientes.remove(listo)
+                try:
+                    kw, pagina, articulos, extra = listo.result()
+                except Exception as e:
+                    # Reintentos agotados o respuesta ilegible: error sólo para esta keyword
+                    kw, pagina = pedidos[listo]
+                    articulos, extra = None, f"{type(e).__name__}: {e}"
+                if articulos is None:
+                    incompletas.add(kw)
+                elif pagina == 1:
+                    total_paginas = -(-extra // self.page_size)
+                    if total_paginas > self.max_paginas:
+                        incompletas.add(kw)
+                    paginas = min(self.max_paginas, total_paginas)
+                    for p in range(2, paginas + 1):
+                        futuro = pool.submit(self._pagina, kw, p, desde_por_kw[kw], hasta, idioma)
+                        pedidos[futuro] = (kw, p)
+                        pendientes.add(futuro)
+                    faltan[kw] = paginas - 1
+                else:
+                    faltan[kw] -= 1
+                if completas is not None and faltan.get(kw) == 0 and kw not in incompletas:
+                    completas.add(kw)
+                yield kw, pagina, articulos, extra
+
+    def iterar_articulos(self, keywords, desde, hasta, idioma="en", desde_por_kw=None, completas=None):
+        for kw, pagina, articulos, extra in self.iterar_paginas(keywords, desde, hasta, idioma, desde_por_kw,
+                                                                completas):
+            if articulos is None:
+                print(f"❌ Error con '{kw}' (página {pagina}):", extra)
+                continue
+            yield from articulos
+
+    def cerrar(self):
+        self.session.close()
+
+
+if __name__ == "__main__":
+    # Comparación contra el servidor mock (sin red): un worker vs pool
+    from Sentimiento_Mock import ServidorMockNewsAPI
+    from datetime import date, timedelta
+
+    servidor = ServidorMockNewsAPI(por_dia=100, latencia=0.05, prob_429=0.02).iniciar()
+    keywords = [f"TICKER{i} stock" for i in range(50)]
+    hasta = date.today()
+    desde = hasta - timedelta(days=2)
+
+    for workers in (1, 8, 16):
+        fetcher = FetcherNewsAPI("demo", url=servidor.url, max_workers=workers,
+                                 por_segundo=200, max_paginas=3, backoff=0.05)
+        inicio = time.perf_counter()
+        n = sum(1 for _ in fetcher.iterar_articulos(keywords, desde, hasta))
+        dt = time.perf_counter() - inicio
+        fetcher.cerrar()
+        print(f"workers={workers:>2}  artículos={n}  {dt:.2f}s  ({n / dt:.0f} art/s)")
+
+    # Una keyword cuya página revienta no corta el resto ni queda como completa
+    class FetcherRoto(FetcherNewsAPI):
+        def _pagina(self, kw, pagina, desde, hasta, idioma):
+            if kw == keywords[0] and pagina == 2:
+                raise requests.ConnectionError("conexión caída")
+            return super()._pagina(kw, pagina, desde, hasta, idioma)
+
+    fetcher = FetcherRoto("demo", url=servidor.url, max_workers=8, por_segundo=200, max_paginas=3, backoff=0.05)
+    completas = set()
+    errores = [(kw, pagina) for kw, pagina, articulos, _ in
+               fetcher.iterar_paginas(keywords, desde, hasta, completas=completas) if articulos is None]
+    fetcher.cerrar()
+    print(f"errores={errores}  completas={len(completas)}/{len(keywords)}  rota completa={keywords[0] in completas}")
+
+    servidor.detener()
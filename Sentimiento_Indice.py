@@ -0,0 +1,264 @@
+import pandas as pd
+from datetime import datetime, timedelta, timezone
+import math, sqlite3, sys, time
+
+
+"""
+Índice de sentimiento en streaming para varios tickers a la vez.
+
+Cada artículo puntuado suma a un acumulador por (ticker, keyword, hora):
+cantidad, suma, suma de cuadrados y conteos positivos/negativos. El índice
+(media) y el z-score de cualquier ventana se obtienen sumando buckets, sin
+volver a recorrer artículos. Los buckets y los ids ya ingeridos se guardan
+en SQLite, así el estado sobrevive entre corridas y un artículo nunca se
+cuenta dos veces. Los ids sólo se guardan mientras su hora puede volver a
+leerse: al cerrar las horas anteriores a la ventana se borran, y desde ahí
+esos buckets no aceptan artículos. El costo de ingerir un artículo es constante.
+"""
+
+RUTA_DB = "sentimiento.sqlite"
+UMBRAL_POSITIVO = 0.05
+UMBRAL_NEGATIVO = -0.05
+
+# ticker -> keywords que lo siguen
+TICKERS = {
+    "GOOGL": ["GOOGL stock", "Alphabet earnings", "Alphabet results"],
+    "AAPL": ["AAPL stock", "Apple earnings", "Apple iPhone sales"],
+    "MSFT": ["MSFT stock", "Microsoft earnings", "Microsoft Azure"],
+    "NVDA": ["NVDA stock", "Nvidia earnings", "Nvidia chips"],
+}
+INTERVALO_MIN = 15
+VENTANA_HORAS = 24
+BASE_HORAS = 24 * 30
+
+
+def hora_epoch(publicado):
+    """Número de hora UTC (horas desde 1970) de un publishedAt ISO."""
+    if isinstance(publicado, str):
+        publicado = datetime.fromisoformat(publicado.replace("Z", "+00:00"))
+    if publicado.tzinfo is None:
+        publicado = publicado.replace(tzinfo=timezone.utc)
+    return int(publicado.timestamp() // 3600)
+
+
+class IndiceSentimiento:
+
+    def __init__(self, ruta=RUTA_DB):
+        self.con = sqlite3.connect(ruta)
+        self.con.executescript("""
+            CREATE TABLE IF NOT EXISTS indice_buckets (
+                ticker TEXT, keyword TEXT, hora INTEGER,
+                n INTEGER, suma REAL, suma2 REAL, pos INTEGER, neg INTEGER,
+                PRIMARY KEY (ticker, keyword, hora)
+            );
+            CREATE INDEX IF NOT EXISTS idx_indice_ticker_hora ON indice_buckets (ticker, hora);
+            CREATE TABLE IF NOT EXISTS indice_vistos (id TEXT PRIMARY KEY, hora INTEGER);
+            CREATE TABLE IF NOT EXISTS indice_meta (clave TEXT PRIMARY KEY, valor INTEGER);
+        """)
+        # Bases anteriores a la poda: sus ids quedan con hora NULL y no se borran
+        columnas = {fila[1] for fila in self.con.execute("PRAGMA table_info(indice_vistos)")}
+        if "hora" not in columnas:
+            self.con.execute("ALTER TABLE indice_vistos ADD COLUMN hora INTEGER")
+        self.con.execute("CREATE INDEX IF NOT EXISTS idx_indice_vistos_hora ON indice_vistos (hora)")
+        fila = self.con.execute("SELECT valor FROM indice_meta WHERE clave = 'horizonte'").fetchone()
+        self.horizonte = fila[0] if fila else 0    # primera hora abierta
+        self.pendientes = {}
+
+    # ---------- Ingesta ----------
+    def ingerir(self, ticker, keyword, publicado, puntaje, id_articulo=None):
+        """Suma un artículo a su bucket. Devuelve False si ya se había ingerido o su hora está cerrada."""
+        hora = hora_epoch(publicado)
+        if hora < self.horizonte:
+            return False
+        if id_articulo is not None:
+            cur = self.con.execute("INSERT OR IGNORE INTO indice_vistos VALUES (?, ?)", (id_articulo, hora))
+            if cur.rowcount == 0:
+                return False
+        clave = (ticker, keyword, hora)
+        acc = self.pendientes.get(clave)
+        if acc is None:
+            acc = self.pendientes[clave] = [0, 0.0, 0.0, 0, 0]
+        acc[0] += 1
+        acc[1] += puntaje
+        acc[2] += puntaje * puntaje
+        acc[3] += puntaje > UMBRAL_POSITIVO
+        acc[4] += puntaje < UMBRAL_NEGATIVO
+        return True
+
+    def guardar(self):
+        with self.con:
+            self.con.executemany("""
+                INSERT INTO indice_buckets VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(ticker, keyword, hora) DO UPDATE SET
+                    n = n + excluded.n, suma = suma + excluded.suma, suma2 = suma2 + excluded.suma2,
+                    pos = pos + excluded.pos, neg = neg + excluded.neg
+            """, [(*clave, *acc) for clave, acc in self.pendientes.items()])
+        self.pendientes = {}
+
+    def podar(self, hora):
+        """Cierra las horas anteriores a `hora`: borra sus ids vistos. Devuelve cuántos se borraron."""
+        if hora <= self.horizonte:
+            return 0
+        with self.con:
+            borrados = self.con.execute("DELETE FROM indice_vistos WHERE hora < ?", (hora,)).rowcount
+            self.con.execute("INSERT OR REPLACE INTO indice_meta VALUES ('horizonte', ?)", (hora,))
+        self.horizonte = hora
+        return borrados
+
+    # ---------- Consultas ----------
+    def _sumar(self, ticker, desde_hora, hasta_hora, keyword=None):
+        sql = """SELECT COALESCE(SUM(n), 0), COALESCE(SUM(suma), 0), COALESCE(SUM(suma2), 0),
+                        COALESCE(SUM(pos), 0), COALESCE(SUM(neg), 0)
+                 FROM indice_buckets WHERE ticker = ? AND hora >= ? AND hora < ?"""
+        params = [ticker, desde_hora, hasta_hora]
+        if keyword is not None:
+            sql += " AND keyword = ?"
+            params.append(keyword)
+        return self.con.execute(sql, params).fetchone()
+
+    def indice(self, ticker, desde, hasta, keyword=None):
+        """Media, desvío y proporciones de los artículos de [desde, hasta)."""
+        n, suma, suma2, pos, neg = self._sumar(ticker, hora_epoch(desde), hora_epoch(hasta), keyword)
+        if n == 0:
+            return {"n": 0, "media": None, "std": None, "pos": 0.0, "neg": 0.0}
+        media = suma / n
+        return {
+            "n": n,
+            "media": media,
+            "std": math.sqrt(max(suma2 / n - media * media, 0.0)),
+            "pos": pos / n,
+            "neg": neg / n,
+        }
+
+    def zscore(self, ticker, ventana_horas=VENTANA_HORAS, base_horas=BASE_HORAS, ahora=None, keyword=None):
+        """
+        z del sentimiento medio de las últimas `ventana_horas` contra las `base_horas`
+        anteriores: (media_ventana - media_base) / (std_base / sqrt(n_ventana)).
+        """
+        ahora = ahora or datetime.now(timezone.utc)
+        fin = hora_epoch(ahora) + 1
+        n_v, s_v, _, _, _ = self._sumar(ticker, fin - ventana_horas, fin, keyword)
+        n_b, s_b, s2_b, _, _ = self._sumar(ticker, fin - ventana_horas - base_horas, fin - ventana_horas, keyword)
+        if n_v == 0 or n_b < 2:
+            return None
+        media_b = s_b / n_b
+        std_b = math.sqrt(max(s2_b / n_b - media_b * media_b, 0.0))
+        if std_b == 0:
+            return None
+        return (s_v / n_v - media_b) / (std_b / math.sqrt(n_v))
+
+    def tabla(self, tickers, ventana_horas=VENTANA_HORAS, base_horas=BASE_HORAS, ahora=None):
+        ahora = ahora or datetime.now(timezone.utc)
+        filas = []
+        for ticker in tickers:
+            ind = self.indice(ticker, ahora - timedelta(hours=ventana_horas), ahora + timedelta(hours=1))
+            filas.append({
+                "ticker": ticker,
+                "articulos": ind["n"],
+                "indice": ind["media"],
+                "positivos_%": ind["pos"] * 100,
+                "negativos_%": ind["neg"] * 100,
+                "z": self.zscore(ticker, ventana_horas, base_horas, ahora),
+            })
+        return pd.DataFrame(filas).set_index("ticker")
+
+    def cerrar(self):
+        self.guardar()
+        self.con.close()
+
+
+# ---------------- STREAMING ----------------
+def ciclo(indice, almacen, fetcher, puntuador, tickers, dias=3, fin=None):
+    """Una pasada: baja lo nuevo de todas las keywords, lo puntúa y lo suma al índice."""
+    from Sentimiento_Cache import actualizar, puntuar_con_cache, hash_texto
+
+    ticker_de = {kw: t for t, kws in tickers.items() for kw in kws}
+    keywords = list(ticker_de)
+    fin = fin or datetime.now(timezone.utc).date()
+    inicio = fin - timedelta(days=dias)
+    # Todo lo nuevo es posterior a la marca previa de su keyword: cada una se lee desde la suya
+    marcas = almacen.desde_por_keyword(keywords, inicio)
+    nuevos = actualizar(almacen, fetcher, keywords, inicio, fin)
+
+    df = pd.concat([almacen.cargar([kw], marcas[kw], fin) for kw in keywords]).dropna()
+    puntajes, _ = puntuar_con_cache(almacen, df["title"].tolist(), puntuador.puntuar)
+    ingeridos = 0
+    for (titulo, _, publicado, kw), puntaje in zip(df.itertuples(index=False), puntajes):
+        if puntaje is not None:
+            ingeridos += indice.ingerir(ticker_de[kw], kw, publicado, puntaje, hash_texto(f"{kw}|{titulo}|{publicado}"))
+    indice.guardar()
+    # Ningún ciclo posterior relee antes del inicio de esta ventana
+    indice.podar(hora_epoch(str(inicio)))
+    return nuevos, ingeridos, len(df)
+
+
+def correr_streaming(tickers=TICKERS, intervalo_min=INTERVALO_MIN, url=None):
+    from Sentimiento_Fetch import FetcherNewsAPI, cargar_api_key
+    from Sentimiento_Cache import AlmacenArticulos
+    from Sentimiento_Scoring import PuntuadorVADER
+
+    indice = IndiceSentimiento(RUTA_DB)
+    almacen = AlmacenArticulos(RUTA_DB)
+    fetcher = FetcherNewsAPI(cargar_api_key(), **({"url": url} if url else {}))
+    puntuador = PuntuadorVADER()
+    try:
+        while True:
+            nuevos, ingeridos, _ = ciclo(indice, almacen, fetcher, puntuador, tickers)
+            print(f"\n🕒 {datetime.now():%Y-%m-%d %H:%M}  nuevos: {nuevos}  ingeridos: {ingeridos}")
+            print(indice.tabla(tickers).round(3))
+            time.sleep(intervalo_min * 60)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        puntuador.cerrar()
+        fetcher.cerrar()
+        almacen.cerrar()
+        indice.cerrar()
+
+
+if __name__ == "__main__":
+    if "--mock" in sys.argv:
+        # Costo de ingesta por artículo (debería ser constante) y consulta sin recorrer artículos
+        import os, random, tempfile
+        indice = IndiceSentimiento(os.path.join(tempfile.mkdtemp(), "indice.sqlite"))
+        rnd = random.Random(0)
+        ahora = datetime.now(timezone.utc)
+        total = 0
+        for lote in (10_000, 100_000, 400_000):
+            inicio = time.perf_counter()
+            for i in range(lote):
+                t = rnd.choice(list(TICKERS))
+                publicado = ahora - timedelta(minutes=rnd.randint(0, 60 * 24 * 60))
+                indice.ingerir(t, TICKERS[t][0], publicado, rnd.uniform(-1, 1), f"art{total + i}")
+            indice.guardar()
+            dt = time.perf_counter() - inicio
+            total += lote
+            inicio = time.perf_counter()
+            tabla = indice.tabla(TICKERS, ahora=ahora)
+            dq = time.perf_counter() - inicio
+            print(f"{lote:>7} artículos: {dt / lote * 1e6:5.1f} µs/artículo   "
+                  f"consulta de {len(TICKERS)} tickers: {dq * 1000:.1f} ms (acumulado {total})")
+        print(tabla.round(3))
+
+        # Ciclos contra el servidor mock: cada keyword se relee desde su marca y los ids viejos se podan
+        from Sentimiento_Mock import ServidorMockNewsAPI
+        from Sentimiento_Fetch import FetcherNewsAPI
+        from Sentimiento_Cache import AlmacenArticulos
+        from Sentimiento_Scoring import PuntuadorVADER
+        hoy = ahora.date()
+        servidor = ServidorMockNewsAPI(por_dia=40, hoy=hoy).iniciar()
+        ruta = os.path.join(tempfile.mkdtemp(), "streaming.sqlite")
+        indice, almacen = IndiceSentimiento(ruta), AlmacenArticulos(ruta)
+        fetcher = FetcherNewsAPI("demo", url=servidor.url, por_segundo=500, max_paginas=20)
+        puntuador = PuntuadorVADER(workers=1)
+        for n, fin in enumerate([hoy, hoy, hoy + timedelta(days=1), hoy + timedelta(days=2)]):
+            nuevos, ingeridos, releidos = ciclo(indice, almacen, fetcher, puntuador, TICKERS, fin=fin)
+            vistos = indice.con.execute("SELECT COUNT(*) FROM indice_vistos").fetchone()[0]
+            print(f"ciclo {n}: nuevos {nuevos:>5}  releídos {releidos:>5}  ingeridos {ingeridos:>5}  ids vistos {vistos:>5}")
+        puntuador.cerrar()
+        fetcher.cerrar()
+        almacen.cerrar()
+        indice.cerrar()
+        servidor.detener()
+    else:
+        correr_streaming()
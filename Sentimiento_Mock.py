@@ -0,0 +1,101 @@
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+from datetime import datetime, timedelta
+import json, random, threading, time
+
+
+"""
+Servidor local que imita /v2/everything de NewsAPI, para probar y medir el
+pipeline de sentimiento sin red ni API key.
+
+Genera `por_dia` titulares determinísticos por keyword y día, respeta
+from/to/page/pageSize, y puede simular latencia y respuestas 429.
+
+    servidor = ServidorMockNewsAPI(por_dia=50, latencia=0.05)
+    servidor.iniciar()
+    fetcher = FetcherNewsAPI("demo", url=servidor.url)
+"""
+
+PALABRAS = ["shares", "rise", "fall", "beat", "miss", "strong", "weak", "earnings",
+            "growth", "record", "slump", "rally", "cut", "upgrade", "downgrade", "guidance"]
+
+
+class ServidorMockNewsAPI:
+
+    def __init__(self, por_dia=20, latencia=0.0, prob_429=0.0, hoy=None, puerto=0):
+        self.por_dia = por_dia
+        self.latencia = latencia
+        self.prob_429 = prob_429
+        self.hoy = hoy or datetime.today().date()
+        self.pedidos = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", puerto), self._handler())
+        self._httpd.daemon_threads = True
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._httpd.server_address[1]}/v2/everything"
+
+    def articulos(self, kw, desde, hasta):
+        """Artículos de `kw` entre dos fechas (inclusive), del más nuevo al más viejo."""
+        salida = []
+        dia = hasta
+        while dia >= desde:
+            for i in range(self.por_dia - 1, -1, -1):
+                rnd = random.Random(f"{kw}|{dia}|{i}")
+                publicado = datetime(dia.year, dia.month, dia.day) + timedelta(seconds=86399 * (i + 1) // (self.por_dia + 1))
+                salida.append({
+                    "source": {"id": None, "name": f"Medio {rnd.randint(1, 20)}"},
+                    "title": f"{kw} " + " ".join(rnd.choice(PALABRAS) for _ in range(6)),
+                    "url": f"https://noticias.example/{kw.replace(' ', '-')}/{dia}/{i}",
+                    "publishedAt": publicado.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                })
+            dia -= timedelta(days=1)
+        return salida
+
+    def _handler(self):
+        servidor = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with servidor._lock:
+                    servidor.pedidos += 1
+                if servidor.latencia:
+                    time.sleep(servidor.latencia)
+                if servidor.prob_429 and random.random() < servidor.prob_429:
+                    return self._responder(429, {"status": "error", "code": "rateLimited"})
+
+                q = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+                desde = datetime.fromisoformat(q.get("from", str(servidor.hoy))[:19]).date()
+                hasta = datetime.fromisoformat(q.get("to", str(servidor.hoy))[:19]).date()
+                # NewsAPI acepta timestamps en "from": se filtra por publishedAt exacto
+                arts = [a for a in servidor.articulos(q["q"], desde, hasta)
+                        if a["publishedAt"][:19] >= q.get("from", "")[:19]]
+                size = int(q.get("pageSize", 100))
+                page = int(q.get("page", 1))
+                self._responder(200, {
+                    "status": "ok",
+                    "totalResults": len(arts),
+                    "articles": arts[(page - 1) * size: page * size],
+                })
+
+            def _responder(self, codigo, cuerpo):
+                datos = json.dumps(cuerpo).encode("utf-8")
+                self.send_response(codigo)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(datos)))
+                self.end_headers()
+                self.wfile.write(datos)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def iniciar(self):
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def detener(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
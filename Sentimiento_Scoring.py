@@ -0,0 +1,128 @@
+from nltk.sentiment import SentimentIntensityAnalyzer
+from concurrent.futures import ProcessPoolExecutor
+from collections import OrderedDict
+import nltk, os
+
+
+"""
+Puntaje VADER por lotes.
+
+1. Los títulos se normalizan (espacios) y se deduplican: cada texto distinto
+   se puntúa una sola vez.
+2. Un LRU en memoria guarda los puntajes ya calculados.
+3. Lo que falta se reparte en bloques entre procesos; cada worker arma su
+   SentimentIntensityAnalyzer una sola vez, leyendo el léxico de un path local.
+
+Los puntajes son idénticos a sia.polarity_scores(titulo)["compound"]:
+VADER tokeniza con split(), así que colapsar espacios no cambia el resultado.
+"""
+
+LEXICON_LOCAL = os.environ.get("VADER_LEXICON", "vader_lexicon.txt")
+
+_sia = None  # analizador del proceso (uno por worker)
+
+
+def ruta_lexicon(ruta=LEXICON_LOCAL):
+    """URL del léxico: el archivo local si existe; si no, el de nltk_data (se baja sólo si falta)."""
+    if os.path.exists(ruta):
+        return "file:" + os.path.abspath(ruta)
+    try:
+        nltk.data.find("sentiment/vader_lexicon.zip")
+    except LookupError:
+        nltk.download("vader_lexicon", quiet=True)
+    return "sentiment/vader_lexicon.zip/vader_lexicon/vader_lexicon.txt"
+
+
+def normalizar(texto):
+    return " ".join(texto.split())
+
+
+def _iniciar_worker(lexicon):
+    global _sia
+    _sia = SentimentIntensityAnalyzer(lexicon_file=lexicon)
+
+
+def _puntuar_bloque(textos):
+    return [_sia.polarity_scores(t)["compound"] for t in textos]
+
+
+class PuntuadorVADER:
+
+    def __init__(self, lexicon=None, workers=None, tam_bloque=2000, min_paralelo=20000, max_cache=500_000):
+        self.lexicon = lexicon or ruta_lexicon()
+        self.workers = workers or os.cpu_count()
+        self.tam_bloque = tam_bloque
+        self.min_paralelo = min_paralelo
+        self.max_cache = max_cache
+        self.cache = OrderedDict()
+        self._pool = None
+
+    def _calcular(self, textos):
+        if len(textos) < self.min_paralelo or self.workers == 1:
+            if _sia is None:
+                _iniciar_worker(self.lexicon)
+            return _puntuar_bloque(textos)
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(self.workers, initializer=_iniciar_worker, initargs=(self.lexicon,))
+        bloques = [textos[i:i + self.tam_bloque] for i in range(0, len(textos), self.tam_bloque)]
+        return [p for bloque in self._pool.map(_puntuar_bloque, bloques) for p in bloque]
+
+    def puntuar(self, titulos):
+        """Lista de puntajes alineada con `titulos`; None para valores que no son texto."""
+        normalizados = [normalizar(t) if isinstance(t, str) else None for t in titulos]
+
+        faltan = []
+        for t in dict.fromkeys(normalizados):
+            if t is None:
+                continue
+            if t in self.cache:
+                self.cache.move_to_end(t)
+            else:
+                faltan.append(t)
+
+        nuevos = dict(zip(faltan, self._calcular(faltan)))
+        salida = [None if t is None else nuevos.get(t, self.cache.get(t)) for t in normalizados]
+
+        self.cache.update(nuevos)
+        while len(self.cache) > self.max_cache:
+            self.cache.popitem(last=False)
+        return salida
+
+    def cerrar(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+if __name__ == "__main__":
+    # Benchmark: 100k titulares (con repetidos) contra df["title"].apply(vader_sentiment)
+    from Sentimiento_Mock import PALABRAS
+    import pandas as pd
+    import random, time
+
+    rnd = random.Random(0)
+    extras = ["good", "bad", "great", "terrible", "NOT", "!!!", "?", "but", "very", "no"]
+    base = [" ".join(rnd.choice(PALABRAS + extras) for _ in range(rnd.randint(5, 12))) for _ in range(70_000)]
+    titulos = pd.Series([rnd.choice(base).replace(" ", rnd.choice([" ", "  "]), 1) + rnd.choice(["", " "])
+                         for _ in range(100_000)])
+
+    sia = SentimentIntensityAnalyzer(lexicon_file=ruta_lexicon())
+
+    def vader_sentiment(text):
+        try:
+            return sia.polarity_scores(text)["compound"]
+        except:
+            return None
+
+    inicio = time.perf_counter()
+    esperado = titulos.apply(vader_sentiment).tolist()
+    dt = time.perf_counter() - inicio
+    print(f"apply actual         {dt:6.2f}s  {len(titulos) / dt:9.0f} titulares/s")
+
+    for workers in sorted({1, 2, os.cpu_count()}):
+        puntuador = PuntuadorVADER(workers=workers)
+        inicio = time.perf_counter()
+        obtenido = puntuador.puntuar(titulos.tolist())
+        dt = time.perf_counter() - inicio
+        puntuador.cerrar()
+        print(f"lotes workers={workers:<3}   {dt:6.2f}s  {len(titulos) / dt:9.0f} titulares/s  idénticos={obtenido == esperado}")
@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+import time
+from numpy.lib.stride_tricks import sliding_window_view
+from TimesFM_Batch import CONFIG, TAM_LOTE, pronosticar_lote
+
+
+"""
+Backtest de TimesFM con orígenes móviles, por lotes.
+
+TimesFM_Original.py compara un único pronóstico contra df_test a ojo. Acá
+se eligen muchos orígenes a lo largo de la historia de uno o varios
+tickers; en cada origen el contexto es la cola de max_context=160 días y
+el objetivo los `horizonte` días siguientes.
+
+Todas las ventanas (orígenes x tickers) se apilan en una matriz y se mandan
+a model.forecast en lotes grandes; no hay loop por ticker ni por origen.
+Con las mismas ventanas se evalúan dos referencias:
+
+- ingenuo: el último cierre repetido.
+- EMA200: la EMA de 200 ruedas (la del gráfico del script) al origen, plana.
+
+Métricas por paso del horizonte: MAE, MAPE, acierto direccional (signo de
+pronóstico - último cierre contra signo de real - último cierre; queda
+vacío para pronósticos planos) y pérdida pinball promedio sobre los
+cuantiles q10..q90 (sólo TimesFM).
+"""
+
+CUANTILES_NIVEL = np.arange(1, 10) / 10
+
+
+def ventanas(series, horizonte, max_context=CONFIG["max_context"], cada=5, desde=None):
+    """
+    Contextos, objetivos y metadatos de todos los orígenes de todas las series.
+    series: dict ticker -> Series o arreglo de cierres. Un origen cada `cada` ruedas,
+    desde que hay `desde` (por defecto max_context) días de historia.
+    Devuelve (contextos (N, max_context), objetivos (N, horizonte), ema (N,), meta DataFrame).
+    """
+    desde = max_context if desde is None else desde
+    if desde < max_context:
+        # Con menos historia que max_context el índice origen - max_context sería negativo y
+        # sliding_window_view lo tomaría desde el final: el contexto vería el futuro.
+        raise ValueError(f"desde={desde} tiene que ser al menos max_context={max_context}")
+    contextos, objetivos, ema, meta = [], [], [], []
+    for ticker, serie in series.items():
+        s = pd.Series(serie).dropna().astype(np.float32)
+        x = s.to_numpy()
+        if len(x) < desde + horizonte:
+            continue
+        origenes = np.arange(desde, len(x) - horizonte + 1, cada)
+        # Ventana de largo max_context + horizonte que arranca en origen - max_context
+        todas = sliding_window_view(x, max_context + horizonte)[origenes - max_context]
+        contextos.append(todas[:, :max_context])
+        objetivos.append(todas[:, max_context:])
+        # EMA del script (adjust=False): en el origen sólo usa datos anteriores
+        ema.append(s.ewm(span=200, adjust=False).mean().to_numpy()[origenes - 1])
+        fechas = s.index[origenes] if isinstance(s.index, pd.DatetimeIndex) else origenes
+        meta.append(pd.DataFrame({"ticker": ticker, "origen": fechas}))
+    if not contextos:
+        raise ValueError("Ninguna serie tiene historia suficiente para el backtest")
+    return (np.concatenate(contextos), np.concatenate(objetivos), np.concatenate(ema),
+            pd.concat(meta, ignore_index=True))
+
+
+def metricas(pred, real, ultimo, cuantiles=None):
+    """Métricas por paso (columnas de pred/real). Devuelve un DataFrame indexado por paso."""
+    error = pred - real
+    # Dirección: sólo cuenta donde el pronóstico se mueve (el ingenuo nunca lo hace)
+    movimiento = np.sign(pred - ultimo[:, None])
+    acierto = np.where(movimiento != 0, movimiento == np.sign(real - ultimo[:, None]), np.nan)
+    with np.errstate(invalid="ignore"):
+        direccion = np.nanmean(acierto, axis=0) * 100 if np.any(movimiento) else np.full(pred.shape[1], np.nan)
+    tabla = pd.DataFrame({
+        "mae": np.abs(error).mean(axis=0),
+        "mape": (np.abs(error) / np.abs(real)).mean(axis=0) * 100,
+        "direccion": direccion,
+    }, index=pd.RangeIndex(1, pred.shape[1] + 1, name="paso"))
+    if cuantiles is not None:
+        # pinball(q) = max(q * (y - yq), (q - 1) * (y - yq)), promedio sobre cuantiles y orígenes
+        d = real[:, :, None] - cuantiles
+        tabla["pinball"] = np.maximum(CUANTILES_NIVEL * d, (CUANTILES_NIVEL - 1) * d).mean(axis=(0, 2))
+    else:
+        tabla["pinball"] = np.nan
+    return tabla
+
+
+def backtest(model, series, horizonte=20, max_context=CONFIG["max_context"], max_horizon=CONFIG["max_horizon"],
+             cada=5, tam_lote=TAM_LOTE * 4):
+    """
+    Pronostica todas las ventanas en lotes de tam_lote y compara contra las referencias.
+    Devuelve (metricas: modelo x paso, detalle: una fila por ventana con el error medio de cada modelo).
+    """
+    contextos, objetivos, ema, meta = ventanas(series, horizonte, max_context, cada)
+    n = len(contextos)
+    pf = np.empty((n, horizonte), dtype=np.float32)
+    qf = np.empty((n, horizonte, 10), dtype=np.float32)
+    for i in range(0, n, tam_lote):
+        pf[i:i + tam_lote], qf[i:i + tam_lote] = pronosticar_lote(
+            model, list(contextos[i:i + tam_lote]), horizonte, max_context, max_horizon)
+
+    ultimo = contextos[:, -1]
+    predicciones = {
+        "timesfm": (pf, qf[:, :, 1:]),
+        "ingenuo": (np.repeat(ultimo[:, None], horizonte, axis=1), None),
+        "ema200": (np.repeat(ema[:, None], horizonte, axis=1), None),
+    }
+    tablas = []
+    detalle = meta.copy()
+    for nombre, (pred, cuantiles) in predicciones.items():
+        tablas.append(metricas(pred, objetivos, ultimo, cuantiles).assign(modelo=nombre))
+        detalle[f"mae_{nombre}"] = np.abs(pred - objetivos).mean(axis=1)
+    resumen = pd.concat(tablas).reset_index().set_index(["modelo", "paso"])
+    return resumen, detalle
+
+
+if __name__ == "__main__":
+    from TimesFM_Batch import ModeloStub
+
+    # 50 tickers sintéticos, 4 años de ruedas, horizonte de 20 y un origen cada 5 ruedas
+    rng = np.random.default_rng(0)
+    fechas = pd.bdate_range(end="2024-12-31", periods=1000)
+    series = {f"T{i}": pd.Series(100 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, 1000))), index=fechas)
+              for i in range(50)}
+
+    # Orígenes de 5 tickers uno por uno (como el script) contra apilados en lotes
+    pocos = dict(list(series.items())[:5])
+    for tam in (1, 256):
+        inicio = time.perf_counter()
+        resumen, _ = backtest(ModeloStub(), pocos, tam_lote=tam)
+        print(f"5 tickers, tam_lote={tam:>3}: {time.perf_counter() - inicio:.2f}s")
+
+    inicio = time.perf_counter()
+    model = ModeloStub()
+    resumen, detalle = backtest(model, series)
+    print(f"{len(series)} tickers, {len(detalle)} ventanas, {model.llamadas} llamadas a forecast: "
+          f"{time.perf_counter() - inicio:.2f}s\n")
+    print(resumen.loc[(slice(None), [1, 5, 10, 20]), :].round(3).to_string())
+    print("\nMAE medio por ticker (primeros 5):")
+    print(detalle.groupby("ticker")[["mae_timesfm", "mae_ingenuo", "mae_ema200"]].mean().head().round(3))
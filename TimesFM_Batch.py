@@ -0,0 +1,189 @@
+import numpy as np
+import pandas as pd
+import argparse, time
+
+
+"""
+Pronóstico TimesFM de un universo completo de tickers, por lotes.
+
+TimesFM_Original.py pronostica un ticker por vez (inputs=[input_segment],
+lote de 1) y arma el horizonte de 252 días con un while de bloques de 90.
+Acá:
+
+- Las series se cortan en lotes de `tam_lote` y el modelo se compila con
+  per_core_batch_size=tam_lote: forecast parte `inputs` en tandas de ese
+  tamaño, así que con el valor por defecto (1) un lote de 64 series seguía
+  corriendo de a una por el modelo. No se agrupan por largo: TimesFM
+  rellena cada contexto hasta max_context, así que un lote cuesta lo mismo
+  con series cortas o largas.
+- Cada lote va en una sola llamada a model.forecast. El horizonte largo se
+  encadena para todo el lote a la vez: cada bloque de max_horizon se agrega
+  al contexto de todas las series y se vuelve a llamar.
+- Se devuelven el punto y los cuantiles (qf, que el script descartaba) en
+  una tabla larga: ticker, paso, fecha, punto, q10 ... q90.
+
+ModeloStub imita la interfaz forecast(horizon, inputs) -> (pf, qf) sin
+torch ni descargas, para probar en CPU. Sus tiempos son simulados; el
+benchmark contra el modelo real es `python TimesFM_Batch.py --real`.
+"""
+
+CONFIG = dict(
+    max_context=160,
+    max_horizon=90,     # límite de horizontes en cada llamada
+    normalize_inputs=True,
+    use_continuous_quantile_head=True,
+    force_flip_invariance=False,
+    infer_is_positive=True,
+    fix_quantile_crossing=True,
+)
+CUANTILES = [f"q{q}" for q in range(10, 100, 10)]   # qf[..., 1:]; qf[..., 0] es la media
+TAM_LOTE = 64
+
+
+def cargar_modelo(config=CONFIG, checkpoint="google/timesfm-2.5-200m-pytorch", tam_lote=TAM_LOTE):
+    """Modelo TimesFM compilado con la configuración del script y per_core_batch_size=tam_lote."""
+    import torch
+    import timesfm
+    torch.set_float32_matmul_precision("high")
+    model = timesfm.TimesFM_2p5_200M_torch.from_pretrained(checkpoint)
+    model.compile(timesfm.ForecastConfig(**{**config, "per_core_batch_size": tam_lote}))
+    return model
+
+
+class ModeloStub:
+    """
+    Reemplazo determinístico de TimesFM para pruebas: deriva de los últimos retornos y
+    cuantiles normales con la volatilidad reciente. Como el modelo compilado, parte inputs
+    en tandas de per_core_batch_size y simula por tanda un costo fijo más uno proporcional
+    a la tanda rellenada (per_core_batch_size x max_context).
+    """
+
+    Z = np.array([-1.2816, -0.8416, -0.5244, -0.2533, 0.0, 0.2533, 0.5244, 0.8416, 1.2816])
+
+    def __init__(self, max_context=160, per_core_batch_size=TAM_LOTE, costo_llamada=0.01, costo_punto=2e-7):
+        self.max_context = max_context
+        self.per_core_batch_size = per_core_batch_size
+        self.costo_llamada = costo_llamada
+        self.costo_punto = costo_punto
+        self.llamadas = 0
+
+    def forecast(self, horizon, inputs):
+        self.llamadas += 1
+        tandas = -(-len(inputs) // self.per_core_batch_size)
+        time.sleep(tandas * (self.costo_llamada + self.costo_punto * self.per_core_batch_size * self.max_context))
+        pf = np.empty((len(inputs), horizon), dtype=np.float32)
+        qf = np.empty((len(inputs), horizon, 10), dtype=np.float32)
+        pasos = np.arange(1, horizon + 1)
+        for i, x in enumerate(inputs):
+            x = np.asarray(x[-self.max_context:], dtype=np.float64)
+            r = np.diff(np.log(np.maximum(x, 1e-9)))[-20:] if len(x) > 1 else np.zeros(1)
+            deriva, vol = r.mean(), r.std() + 1e-4
+            pf[i] = x[-1] * np.exp(deriva * pasos * 0.5)
+            qf[i, :, 0] = pf[i]
+            qf[i, :, 1:] = pf[i][:, None] * np.exp(self.Z[None, :] * vol * np.sqrt(pasos)[:, None])
+        return pf, qf
+
+
+def _a_arreglo(serie):
+    valores = serie.to_numpy() if isinstance(serie, pd.Series) else np.asarray(serie)
+    valores = valores.astype(np.float32)
+    return valores[~np.isnan(valores)]
+
+
+def _fechas(serie, horizonte):
+    if isinstance(serie, pd.Series) and isinstance(serie.index, pd.DatetimeIndex) and len(serie):
+        return pd.bdate_range(serie.index[-1] + pd.offsets.BDay(1), periods=horizonte)
+    return None
+
+
+def pronosticar_lote(model, contextos, horizonte, max_context=CONFIG["max_context"],
+                     max_horizon=CONFIG["max_horizon"]):
+    """
+    Horizonte encadenado para un lote: (pf, qf) de forma (B, horizonte) y (B, horizonte, 10).
+    Cada bloque predicho se agrega al contexto de todas las series del lote.
+    """
+    contextos = [np.asarray(c, dtype=np.float32) for c in contextos]
+    bloques_pf, bloques_qf = [], []
+    hecho = 0
+    while hecho < horizonte:
+        h = min(horizonte - hecho, max_horizon)
+        pf, qf = model.forecast(horizon=h, inputs=[c[-max_context:] for c in contextos])
+        pf, qf = np.asarray(pf)[:, :h], np.asarray(qf)[:, :h]
+        bloques_pf.append(pf)
+        bloques_qf.append(qf)
+        contextos = [np.concatenate([c[-max_context:], p]) for c, p in zip(contextos, pf)]
+        hecho += h
+    return np.concatenate(bloques_pf, axis=1), np.concatenate(bloques_qf, axis=1)
+
+
+def pronosticar(model, series, horizonte, max_context=CONFIG["max_context"], max_horizon=CONFIG["max_horizon"],
+                tam_lote=TAM_LOTE):
+    """
+    series: dict ticker -> Series (o arreglo) de cierres. Devuelve una fila por (ticker, paso)
+    con la fecha hábil (si la serie tiene índice de fechas), el punto y los cuantiles.
+    tam_lote debería ser el per_core_batch_size con que se compiló el modelo (cargar_modelo).
+    """
+    tickers = list(series)
+    arreglos = [_a_arreglo(series[t]) for t in tickers]
+    vacias = [t for t, a in zip(tickers, arreglos) if len(a) == 0]
+    if vacias:
+        raise ValueError(f"Series sin datos: {', '.join(map(str, vacias))}")
+
+    pf = np.empty((len(tickers), horizonte), dtype=np.float32)
+    qf = np.empty((len(tickers), horizonte, 10), dtype=np.float32)
+    for i in range(0, len(tickers), tam_lote):
+        pf[i:i + tam_lote], qf[i:i + tam_lote] = pronosticar_lote(model, arreglos[i:i + tam_lote], horizonte,
+                                                                  max_context, max_horizon)
+
+    fechas = []
+    for t in tickers:
+        f = _fechas(series[t], horizonte)
+        fechas.append(f.to_numpy() if f is not None else np.full(horizonte, np.datetime64("NaT"), dtype="datetime64[ns]"))
+
+    tabla = pd.DataFrame({
+        "ticker": np.repeat(np.array(tickers, dtype=object), horizonte),
+        "paso": np.tile(np.arange(1, horizonte + 1), len(tickers)),
+        "fecha": np.concatenate(fechas) if fechas else np.empty(0, dtype="datetime64[ns]"),
+        "punto": pf.ravel(),
+    })
+    for j, nombre in enumerate(CUANTILES, start=1):
+        tabla[nombre] = qf[:, :, j].ravel()
+    return tabla
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de pronóstico por lotes")
+    parser.add_argument("--real", action="store_true",
+                        help="TimesFM real (torch + timesfm + checkpoint) en lugar de ModeloStub")
+    parser.add_argument("--series", type=int, default=512)
+    parser.add_argument("--lotes", nargs="+", type=int, default=[1, 8, 32, 128, 512])
+    args = parser.parse_args()
+
+    def modelo(tam):
+        # Un modelo compilado por tamaño de lote: per_core_batch_size queda fijo al compilar
+        return cargar_modelo(tam_lote=tam) if args.real else ModeloStub(per_core_batch_size=tam)
+
+    # Universo sintético: series con historias de distinto largo (altas recientes incluidas)
+    rng = np.random.default_rng(0)
+    n, horizonte = args.series, 252
+    largos = np.where(rng.random(n) < 0.2, rng.integers(20, 160, n), rng.integers(160, 1300, n))
+    fechas = pd.bdate_range(end="2024-12-31", periods=largos.max())
+    series = {
+        f"T{i}": pd.Series(100 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, l))), index=fechas[-l:])
+        for i, l in enumerate(largos)
+    }
+
+    # Un lote de 1 reproduce el loop del script; un lote de 16 tiene que dar lo mismo
+    pocas = dict(list(series.items())[:16])
+    referencia = pronosticar(modelo(1), pocas, horizonte, tam_lote=1)
+    lote = pronosticar(modelo(16), pocas, horizonte, tam_lote=16)
+    print(f"Diferencia lote 1 vs lote 16: {np.abs(referencia[['punto'] + CUANTILES].to_numpy() - lote[['punto'] + CUANTILES].to_numpy()).max():.1e}")
+    print(lote.head(3).to_string(index=False, float_format="%.3f"), "\n")
+
+    for tam in args.lotes:
+        model = modelo(tam)
+        pronosticar_lote(model, [series["T0"].to_numpy()] * min(tam, n), horizonte)     # calentamiento
+        inicio = time.perf_counter()
+        tabla = pronosticar(model, series, horizonte, tam_lote=tam)
+        dt = time.perf_counter() - inicio
+        print(f"tam_lote={tam:>3}: {n / dt:7.1f} series/s  ({len(tabla)} filas)")
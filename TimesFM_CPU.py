@@ -0,0 +1,185 @@
+import numpy as np
+import pandas as pd
+import argparse, multiprocessing, resource, time
+from concurrent.futures import ProcessPoolExecutor
+from TimesFM_Batch import CONFIG, TAM_LOTE, pronosticar_lote
+
+
+"""
+Inferencia de TimesFM en CPU: int8 dinámico, bf16 y cantidad de hilos.
+
+En producción no hay GPU, y torch.set_float32_matmul_precision("high") del
+script no cambia nada en CPU. Modos:
+
+- fp32: el modelo tal cual.
+- int8: torch.ao.quantization.quantize_dynamic sobre las capas nn.Linear
+  (pesos en int8, activaciones cuantizadas al vuelo). Se aplica en el lugar
+  a model.model, el TimesFM_2p5_200M_torch_module que guarda el wrapper de
+  timesfm, antes de model.compile. El checkpoint se carga con
+  torch_compile=False: así forward queda ligado al módulo cuantizado.
+- bf16: forecast dentro de torch.autocast("cpu", dtype=torch.bfloat16);
+  conviene en CPUs con AVX512-BF16 / AMX.
+
+`hilos` fija torch.set_num_threads (intra-op).
+
+El benchmark corre cada combinación modo x hilos en un proceso nuevo (el
+pico de memoria de ru_maxrss es por proceso) sobre el mismo conjunto fijo
+de series. Reporta latencia por lote, pico de memoria y el desvío del
+pronóstico contra fp32, para elegir el modo de cada despliegue:
+
+    python TimesFM_CPU.py --modos fp32 int8 bf16 --hilos 1 4 8
+
+Con --sin-checkpoint se usa la misma arquitectura con pesos aleatorios
+(sin descargar nada): latencia y memoria valen igual, pero el desvío
+contra fp32 sólo es representativo con el checkpoint real.
+"""
+
+MODOS = ("fp32", "int8", "bf16")
+
+
+def _modulo(model):
+    """El TimesFM_2p5_200M_torch_module que TimesFM_2p5_200M_torch guarda en `model`."""
+    import torch
+    modulo = getattr(model, "model", None)
+    if not isinstance(modulo, torch.nn.Module):
+        raise TypeError(f"{type(model).__name__}.model no es un torch.nn.Module: "
+                        "esta versión de timesfm no es compatible con TimesFM_CPU")
+    return modulo
+
+
+def fijar_hilos(hilos):
+    import torch
+    if hilos:
+        torch.set_num_threads(hilos)
+
+
+class ModeloCPU:
+    """Envuelve un modelo TimesFM ya compilado; forecast corre en inference_mode (y autocast en bf16)."""
+
+    def __init__(self, model, modo="fp32"):
+        if modo not in MODOS:
+            raise ValueError(f"Modo desconocido: {modo} (opciones: {', '.join(MODOS)})")
+        self.model = model
+        self.modo = modo
+
+    def forecast(self, horizon, inputs):
+        import torch
+        with torch.inference_mode():
+            if self.modo == "bf16":
+                with torch.autocast("cpu", dtype=torch.bfloat16):
+                    pf, qf = self.model.forecast(horizon=horizon, inputs=inputs)
+            else:
+                pf, qf = self.model.forecast(horizon=horizon, inputs=inputs)
+        return np.asarray(pf, dtype=np.float32), np.asarray(qf, dtype=np.float32)
+
+
+def cargar_modelo_cpu(modo="int8", hilos=None, config=CONFIG, checkpoint="google/timesfm-2.5-200m-pytorch",
+                      tam_lote=TAM_LOTE):
+    """
+    Como TimesFM_Batch.cargar_modelo, pero en CPU con el modo y los hilos pedidos.
+    checkpoint=None: la arquitectura con pesos aleatorios (para medir sin descargar el checkpoint).
+    """
+    if modo not in MODOS:
+        raise ValueError(f"Modo desconocido: {modo} (opciones: {', '.join(MODOS)})")
+    import torch
+    import timesfm
+    fijar_hilos(hilos)
+    if checkpoint is None:
+        model = timesfm.TimesFM_2p5_200M_torch(torch_compile=False)
+    else:
+        model = timesfm.TimesFM_2p5_200M_torch.from_pretrained(checkpoint, torch_compile=False)
+    modulo = _modulo(model)
+    # El módulo elige cuda si la ve; forecast manda los datos a modulo.device
+    modulo.device, modulo.device_count = torch.device("cpu"), 1
+    modulo.to("cpu").eval()
+    if modo == "int8":
+        torch.ao.quantization.quantize_dynamic(modulo, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+    model.compile(timesfm.ForecastConfig(**{**config, "per_core_batch_size": tam_lote}))
+    return ModeloCPU(model, modo)
+
+
+# ---------------- BENCHMARK ----------------
+def series_fijas(n=64, largo=160, seed=0):
+    """Conjunto fijo de series (precios con volatilidad y tendencia variadas) para comparar modos."""
+    rng = np.random.default_rng(seed)
+    vol = rng.uniform(0.005, 0.04, (n, 1))
+    tendencia = rng.normal(0.0005, 0.001, (n, 1))
+    return (100 * np.exp(np.cumsum(rng.normal(0, 1, (n, largo)) * vol + tendencia, axis=1))).astype(np.float32)
+
+
+def _medir(args):
+    """Corre en un proceso nuevo: carga, calienta y mide. Devuelve latencias, pico de memoria y pronósticos."""
+    modo, hilos, series, horizonte, tam_lote, repeticiones, stub, checkpoint = args
+    inicio = time.perf_counter()
+    if stub:
+        from TimesFM_Batch import ModeloStub
+        model = ModeloStub(per_core_batch_size=tam_lote)
+    else:
+        model = cargar_modelo_cpu(modo, hilos, checkpoint=checkpoint, tam_lote=tam_lote)
+    carga = time.perf_counter() - inicio
+
+    lotes = [list(series[i:i + tam_lote]) for i in range(0, len(series), tam_lote)]
+    pronosticar_lote(model, lotes[0], horizonte)     # calentamiento
+    latencias, pf, qf = [], [], []
+    for r in range(repeticiones):
+        for lote in lotes:
+            inicio = time.perf_counter()
+            p, q = pronosticar_lote(model, lote, horizonte)
+            latencias.append(time.perf_counter() - inicio)
+            if r == 0:
+                pf.append(p)
+                qf.append(q)
+    pico_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024     # KB en Linux
+    return {"carga_s": carga, "latencias": latencias, "pico_mb": pico_mb,
+            "pf": np.concatenate(pf), "qf": np.concatenate(qf)}
+
+
+def comparar(modos=MODOS, hilos=(1, 4), n_series=64, horizonte=90, tam_lote=32, repeticiones=3, stub=False,
+             checkpoint="google/timesfm-2.5-200m-pytorch"):
+    """Tabla modo x hilos con latencia por lote, pico de memoria y desvío contra fp32 (mismos hilos)."""
+    series = series_fijas(n_series)
+    filas, referencia = [], {}
+    contexto = multiprocessing.get_context("spawn")
+    for h in hilos:
+        # fp32 primero: es la referencia del desvío
+        for modo in sorted(modos, key=lambda m: m != "fp32"):
+            with ProcessPoolExecutor(1, mp_context=contexto) as pool:
+                r = pool.submit(_medir, (modo, h, series, horizonte, tam_lote, repeticiones, stub,
+                                            checkpoint)).result()
+            lat = np.array(r["latencias"]) * 1000
+            fila = {
+                "modo": modo, "hilos": h, "carga_s": r["carga_s"],
+                "lote_ms_p50": np.percentile(lat, 50), "lote_ms_p95": np.percentile(lat, 95),
+                "series_por_s": tam_lote / (lat.mean() / 1000),
+                "pico_mb": r["pico_mb"],
+            }
+            if modo == "fp32":
+                referencia[h] = r
+            if h in referencia:
+                base = referencia[h]
+                rel = np.abs(r["pf"] - base["pf"]) / np.abs(base["pf"])
+                fila["desvio_medio_%"] = rel.mean() * 100
+                fila["desvio_max_%"] = rel.max() * 100
+                fila["desvio_cuantiles_%"] = (np.abs(r["qf"] - base["qf"]) / np.abs(base["qf"])).mean() * 100
+            filas.append(fila)
+    return pd.DataFrame(filas)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de TimesFM en CPU por modo y cantidad de hilos")
+    parser.add_argument("--modos", nargs="+", default=list(MODOS), choices=MODOS)
+    parser.add_argument("--hilos", nargs="+", type=int, default=[1, 4])
+    parser.add_argument("--series", type=int, default=64)
+    parser.add_argument("--horizonte", type=int, default=90)
+    parser.add_argument("--lote", type=int, default=32)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--stub", action="store_true",
+                        help="ModeloStub en lugar de TimesFM: prueba el arnés, los modos no cambian nada")
+    parser.add_argument("--sin-checkpoint", action="store_true",
+                        help="arquitectura de TimesFM con pesos aleatorios: latencia y memoria reales, desvío no")
+    args = parser.parse_args()
+
+    tabla = comparar(args.modos, args.hilos, args.series, args.horizonte, args.lote, args.repeticiones, args.stub,
+                     None if args.sin_checkpoint else "google/timesfm-2.5-200m-pytorch")
+    pd.set_option("display.width", 200)
+    print(tabla.round(3).to_string(index=False))
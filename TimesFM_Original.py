@@ -1,9 +1,9 @@
 from matplotlib import pyplot as plt
 import torch
 import numpy as np
-import timesfm
 import yfinance as yf
 import pandas as pd
+from TimesFM_Batch import cargar_modelo, pronosticar
 
 """***********
 
@@ -32,20 +32,9 @@ train_series = df_train["Close"].values.astype(np.float32)
 # ---------------------------
 # 2) Modelo TimesFM
 # ---------------------------
-torch.set_float32_matmul_precision("high")
-model = timesfm.TimesFM_2p5_200M_torch.from_pretrained("google/timesfm-2.5-200m-pytorch")
-
-model.compile(
-    timesfm.ForecastConfig(
-        max_context=160,
-        max_horizon=90,   # límite de horizontes en cada llamada
-        normalize_inputs=True,
-        use_continuous_quantile_head=True,
-        force_flip_invariance=False,
-        infer_is_positive=True,
-        fix_quantile_crossing=True,
-    )
-)
+# Misma configuración que antes (max_context=160, max_horizon=90), ver TimesFM_Batch.CONFIG.
+# Un solo ticker: lote de 1, el modelo rellena cada llamada hasta per_core_batch_size.
+model = cargar_modelo(tam_lote=1)
 
 # ---------------------------
 # 3) Forecast encadenado para 2025
@@ -53,21 +42,11 @@ model.compile(
 future_idx = pd.bdate_range("2025-01-01", "2025-10-31")  # ~252 días hábiles
 target_days = len(future_idx)
 
-context = train_series.tolist()
-remaining = target_days
-all_preds = []
-
+# El horizonte se encadena en bloques de 90 dentro de pronosticar; qf queda en las columnas q10..q90
 with torch.no_grad():
-    while remaining > 0:
-        horizon = min(remaining, 90)  # máximo 90 por bloque
-        input_segment = np.array(context[-160:], dtype=np.float32)  # recorte al contexto permitido
-        pf, qf = model.forecast(horizon=horizon, inputs=[input_segment])
-        pred_chunk = np.asarray(pf)[0]  # batch=1
-        all_preds.extend(pred_chunk.tolist())
-        context.extend(pred_chunk.tolist())  # extender contexto con predicción
-        remaining -= horizon
-
-forecast_series = pd.Series(all_preds, index=future_idx)
+    pronostico = pronosticar(model, {ticker: train_series}, target_days, tam_lote=1)
+
+forecast_series = pd.Series(pronostico["punto"].to_numpy(), index=future_idx)
 
 # ---------------------------
 # 4) EMA 200
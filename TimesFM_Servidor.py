@@ -0,0 +1,275 @@
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from collections import OrderedDict, deque
+import numpy as np
+import pandas as pd
+import argparse, hashlib, json, threading, time, urllib.request
+from TimesFM_Batch import CONFIG, CUANTILES, cargar_modelo, pronosticar
+
+
+"""
+Servidor local de pronósticos TimesFM, con el modelo cargado una sola vez.
+
+Cada corrida de TimesFM_Original.py paga from_pretrained + compile antes
+del primer pronóstico. Este proceso los hace al arrancar y después atiende
+pedidos HTTP en 127.0.0.1:
+
+    POST /forecast  {"horizonte": 252,
+                     "series": {"GGAL": {"valores": [...], "ultima_fecha": "2024-12-30"}}}
+    GET  /stats     pedidos, aciertos de caché, latencias
+
+Los resultados se guardan en una caché LRU por serie con clave
+(hash de los valores, última fecha, ForecastConfig, horizonte): si la serie
+no cambió, la respuesta sale de memoria sin tocar el modelo. Las series
+que faltan en la caché se pronostican juntas, por lotes (TimesFM_Batch).
+
+    python TimesFM_Servidor.py --puerto 8765
+    python TimesFM_Servidor.py --modo int8 --hilos 8   # CPU, ver TimesFM_CPU.py
+    python TimesFM_Servidor.py --stub --bench     # sin torch ni red
+"""
+
+PUERTO = 8765
+MAX_CACHE = 10_000
+MAX_LATENCIAS = 10_000    # ventana de /stats
+
+
+class ServidorTimesFM:
+
+    def __init__(self, model, config=CONFIG, puerto=PUERTO, max_cache=MAX_CACHE):
+        self.model = model
+        self.config = dict(config)
+        self.huella_config = hashlib.sha1(json.dumps(self.config, sort_keys=True).encode()).hexdigest()[:16]
+        self.max_cache = max_cache
+        self.cache = OrderedDict()
+        self.pedidos = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self.latencias = deque(maxlen=MAX_LATENCIAS)
+        self._lock_cache = threading.Lock()
+        self._lock_modelo = threading.Lock()    # el modelo no se comparte entre hilos
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", puerto), self._handler())
+        self._httpd.daemon_threads = True
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._httpd.server_address[1]}"
+
+    def clave(self, valores, ultima_fecha, horizonte):
+        huella = hashlib.sha1(np.ascontiguousarray(valores, dtype=np.float32).tobytes()).hexdigest()
+        return huella, ultima_fecha, self.huella_config, int(horizonte)
+
+    def pronosticar(self, series, horizonte):
+        """
+        series: dict ticker -> {"valores": [...], "ultima_fecha": "AAAA-MM-DD" opcional}.
+        Devuelve dict ticker -> resultado ya serializado en JSON (así se guarda en la caché).
+        """
+        claves, faltan = {}, {}
+        salida = {}
+        with self._lock_cache:
+            for ticker, s in series.items():
+                valores = np.asarray(s["valores"], dtype=np.float32)
+                ultima = s.get("ultima_fecha")
+                claves[ticker] = self.clave(valores, ultima, horizonte)
+                if claves[ticker] in self.cache:
+                    self.cache.move_to_end(claves[ticker])
+                    salida[ticker] = self.cache[claves[ticker]]
+                    self.aciertos += 1
+                else:
+                    # Para las fechas del pronóstico sólo importa la última
+                    faltan[ticker] = (pd.Series(valores, index=pd.bdate_range(end=ultima, periods=len(valores)))
+                                      if ultima else valores)
+                    self.fallos += 1
+
+        if faltan:
+            with self._lock_modelo:
+                tabla = pronosticar(self.model, faltan, horizonte,
+                                    self.config["max_context"], self.config["max_horizon"])
+            with self._lock_cache:
+                for ticker, grupo in tabla.groupby("ticker", sort=False):
+                    resultado = json.dumps({
+                        "fechas": None if grupo["fecha"].isna().all() else grupo["fecha"].dt.strftime("%Y-%m-%d").tolist(),
+                        "punto": grupo["punto"].round(4).tolist(),
+                        **{q: grupo[q].round(4).tolist() for q in CUANTILES},
+                    })
+                    salida[ticker] = self.cache[claves[ticker]] = resultado
+                while len(self.cache) > self.max_cache:
+                    self.cache.popitem(last=False)
+        return {t: salida[t] for t in series}
+
+    def estadisticas(self):
+        with self._lock_cache:
+            lat = np.array(self.latencias) * 1000
+            consultas = self.aciertos + self.fallos
+            return {
+                "pedidos": self.pedidos,
+                "series_pedidas": consultas,
+                "aciertos_cache": self.aciertos,
+                "tasa_aciertos": self.aciertos / consultas if consultas else None,
+                "en_cache": len(self.cache),
+                "latencia_ms": {
+                    "media": float(lat.mean()) if len(lat) else None,
+                    "p50": float(np.percentile(lat, 50)) if len(lat) else None,
+                    "p95": float(np.percentile(lat, 95)) if len(lat) else None,
+                },
+            }
+
+    def _handler(self):
+        servidor = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") == "/stats":
+                    return self._responder(200, servidor.estadisticas())
+                self._responder(404, {"error": "ruta desconocida"})
+
+            def do_POST(self):
+                if self.path.rstrip("/") != "/forecast":
+                    return self._responder(404, {"error": "ruta desconocida"})
+                inicio = time.perf_counter()
+                try:
+                    pedido = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                    resultado = servidor.pronosticar(pedido["series"], int(pedido["horizonte"]))
+                except (KeyError, ValueError, TypeError) as e:
+                    return self._responder(400, {"error": str(e)})
+                except Exception as e:
+                    # Falla del modelo: el cliente recibe JSON, no una conexión cortada
+                    return self._responder(500, {"error": f"{type(e).__name__}: {e}"})
+                # Los fragmentos de la caché ya son JSON: se concatenan sin volver a serializar
+                cuerpo = ", ".join(f"{json.dumps(t)}: {r}" for t, r in resultado.items())
+                self._responder(200, f'{{"series": {{{cuerpo}}}}}')
+                with servidor._lock_cache:
+                    servidor.pedidos += 1
+                    servidor.latencias.append(time.perf_counter() - inicio)
+
+            def _responder(self, codigo, cuerpo):
+                datos = (cuerpo if isinstance(cuerpo, str) else json.dumps(cuerpo)).encode()
+                self.send_response(codigo)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(datos)))
+                self.end_headers()
+                self.wfile.write(datos)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def iniciar(self):
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def servir(self):
+        self._httpd.serve_forever()
+
+    def detener(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+class ClienteTimesFM:
+
+    def __init__(self, url=f"http://127.0.0.1:{PUERTO}", timeout=300):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def pronosticar(self, series, horizonte):
+        """series: dict ticker -> Series de cierres (o arreglo). Devuelve la misma tabla que TimesFM_Batch.pronosticar."""
+        cuerpo = {"horizonte": horizonte, "series": {}}
+        for ticker, s in series.items():
+            s = s.dropna() if isinstance(s, pd.Series) else pd.Series(np.asarray(s, dtype=float)).dropna()
+            ultima = f"{s.index[-1]:%Y-%m-%d}" if isinstance(s.index, pd.DatetimeIndex) and len(s) else None
+            cuerpo["series"][ticker] = {"valores": s.to_numpy(dtype=np.float32).tolist(), "ultima_fecha": ultima}
+        pedido = urllib.request.Request(f"{self.url}/forecast", data=json.dumps(cuerpo).encode(),
+                                        headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(pedido, timeout=self.timeout) as r:
+            respuesta = json.loads(r.read())["series"]
+
+        tickers = list(respuesta)
+        tabla = pd.DataFrame({
+            "ticker": np.repeat(np.array(tickers, dtype=object), horizonte),
+            "paso": np.tile(np.arange(1, horizonte + 1), len(tickers)),
+            "fecha": pd.to_datetime(np.concatenate([
+                res["fechas"] if res["fechas"] else [None] * horizonte for res in respuesta.values()
+            ]), format="%Y-%m-%d"),
+            "punto": np.concatenate([res["punto"] for res in respuesta.values()]),
+        })
+        for q in CUANTILES:
+            tabla[q] = np.concatenate([res[q] for res in respuesta.values()])
+        return tabla
+
+    def estadisticas(self):
+        with urllib.request.urlopen(f"{self.url}/stats", timeout=self.timeout) as r:
+            return json.loads(r.read())
+
+
+def benchmark(servidor):
+    """Pedidos repetidos de un universo que cambia poco: latencia y tasa de aciertos."""
+    rng = np.random.default_rng(0)
+    fechas = pd.bdate_range(end="2024-12-31", periods=1000)
+    series = {f"T{i}": pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.02, 1000))), index=fechas)
+              for i in range(100)}
+    cliente = ClienteTimesFM(servidor.url)
+
+    def pedir(etiqueta, subset):
+        inicio = time.perf_counter()
+        tabla = cliente.pronosticar(subset, 252)
+        print(f"{etiqueta:<42} {len(subset):>4} series  {(time.perf_counter() - inicio) * 1000:8.1f} ms")
+        return tabla
+
+    primera = pedir("Primer pedido (caché vacía)", series)
+    repetida = pedir("Mismo pedido", series)
+    assert primera.equals(repetida)
+    pedir("Un ticker", {"T7": series["T7"]})
+    # Llega un cierre nuevo para 10 tickers: sólo esos pasan por el modelo
+    dia = fechas[-1] + pd.offsets.BDay(1)
+    for i in range(10):
+        s = series[f"T{i}"]
+        series[f"T{i}"] = pd.concat([s, pd.Series([s.iloc[-1] * 1.01], index=[dia])])
+    pedir("Después de un cierre nuevo en 10 tickers", series)
+    for _ in range(19):
+        cliente.pronosticar(series, 252)
+    pedir("Mismo pedido (20 veces más)", series)
+    print(json.dumps(cliente.estadisticas(), indent=2))
+
+    # Si el modelo revienta, el cliente recibe un 500 con el error en JSON
+    modelo, servidor.model = servidor.model, None
+    try:
+        cliente.pronosticar({"NUEVA": series["T0"] * 2}, 252)
+    except urllib.error.HTTPError as e:
+        print(f"Modelo caído: HTTP {e.code} {json.loads(e.read())}")
+    finally:
+        servidor.model = modelo
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor local de pronósticos TimesFM")
+    parser.add_argument("--puerto", type=int, default=PUERTO)
+    parser.add_argument("--max-cache", type=int, default=MAX_CACHE)
+    parser.add_argument("--stub", action="store_true", help="ModeloStub en lugar de TimesFM (sin torch ni red)")
+    parser.add_argument("--modo", choices=["fp32", "int8", "bf16"],
+                        help="inferencia en CPU con este modo (ver TimesFM_CPU.py)")
+    parser.add_argument("--hilos", type=int, help="hilos intra-op de torch en CPU")
+    parser.add_argument("--bench", action="store_true", help="levanta el servidor y corre el benchmark")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    if args.stub:
+        from TimesFM_Batch import ModeloStub
+        model = ModeloStub()
+    elif args.modo or args.hilos:
+        from TimesFM_CPU import cargar_modelo_cpu
+        model = cargar_modelo_cpu(args.modo or "fp32", args.hilos)
+    else:
+        model = cargar_modelo()
+    print(f"Modelo listo en {time.perf_counter() - inicio:.1f}s")
+
+    servidor = ServidorTimesFM(model, puerto=0 if args.bench else args.puerto, max_cache=args.max_cache)
+    if args.bench:
+        servidor.iniciar()
+        benchmark(servidor)
+        servidor.detener()
+    else:
+        print(f"Escuchando en {servidor.url}")
+        try:
+            servidor.servir()
+        except KeyboardInterrupt:
+            servidor.detener()